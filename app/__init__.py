@@ -1,20 +1,41 @@
+import os
 from flask import Flask, jsonify
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_swagger_ui import get_swaggerui_blueprint
-from .extensions import ma, limiter, cache
+from .extensions import ma, limiter, cache, migrate
 from .models import db
+from .utils.json_provider import FastJSONProvider
+from .utils.db_pool import use_instrumented_pool, configure_engine
+from .utils.sql_stats import init_sql_stats
+from .utils.metrics import init_metrics
+from .utils.compression import init_compression
 from .blueprints.customers import customers_bp
 from .blueprints.mechanics import mechanics_bp
 from .blueprints.service_tickets import service_tickets_bp
 from .blueprints.inventory import inventory_bp
+from .blueprints.internal import internal_bp
+from .blueprints.batch import batch_bp
+from .blueprints.search import search_bp
 
 
 def create_app(config_name):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(f"config.{config_name}")
 
+    if app.config.get('PROXY_FIX_X_FOR'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
     #initialize extensions
+    use_instrumented_pool(app)
     db.init_app(app)
+    with app.app_context():
+        configure_engine(app, db.engine)
+        init_sql_stats(app, db.engine)
+    migrate.init_app(app, db, directory=os.path.join(os.path.dirname(app.root_path), 'migrations'))
     ma.init_app(app)
+    init_metrics(app)
+    init_compression(app)
     limiter.init_app(app)
     cache.init_app(app)
     
@@ -41,7 +62,8 @@ def create_app(config_name):
                 "customers": "/customers/",
                 "mechanics": "/mechanics/",
                 "service_tickets": "/service_tickets/",
-                "inventory": "/inventory/"
+                "inventory": "/inventory/",
+                "search": "/search?q="
             }
         }
 
@@ -50,6 +72,9 @@ def create_app(config_name):
     app.register_blueprint(mechanics_bp, url_prefix='/mechanics')
     app.register_blueprint(service_tickets_bp, url_prefix='/service_tickets')
     app.register_blueprint(inventory_bp, url_prefix='/inventory')
+    app.register_blueprint(internal_bp, url_prefix='/internal')
+    app.register_blueprint(batch_bp, url_prefix='/batch')
+    app.register_blueprint(search_bp, url_prefix='/search')
         
     
     return app
\ No newline at end of file
@@ -0,0 +1,108 @@
+from flask import current_app, jsonify, request
+from flask.globals import app_ctx
+from werkzeug.test import EnvironBuilder
+from app.extensions import db
+from . import batch_bp
+
+BATCH_MAX_REQUESTS = 50
+# Passed on from the batch to every sub-request that doesn't set its own
+INHERITED_HEADERS = ('Authorization',)
+# Meaningless once the body is embedded in the batch response
+DROPPED_HEADERS = frozenset({'Content-Length', 'Content-Type'})
+# Not passed to sub-requests: bodies are embedded as JSON, and the batch
+# response as a whole is compressed for the caller instead
+STRIPPED_REQUEST_HEADERS = frozenset({'accept-encoding'})
+# Marks a sub-request's environ. run_batch refuses those after routing, so no
+# spelling of the path (/%62atch, /batch#x, ...) can nest a batch.
+SUB_REQUEST = 'mechanic_shop.batch_sub_request'
+
+
+def _error(status, message):
+    return {"status": status, "headers": {}, "body": {"error": message}}
+
+
+def _check(entry):
+    """An error message when a batch entry can't be dispatched, otherwise None."""
+    if not isinstance(entry, dict):
+        return "Each request must be an object"
+    method, path, headers = entry.get('method', 'GET'), entry.get('path'), entry.get('headers', {})
+    if not isinstance(method, str) or not isinstance(path, str) or not path.startswith('/'):
+        return "Each request needs a method and a path starting with /"
+    if not isinstance(headers, dict) or not all(isinstance(v, str) for v in headers.values()):
+        return "headers must be an object of strings"
+    return None
+
+
+def _environ(entry):
+    headers = {name: request.headers[name] for name in INHERITED_HEADERS if name in request.headers}
+    headers.update((name, value) for name, value in entry.get('headers', {}).items()
+                   if name.lower() not in STRIPPED_REQUEST_HEADERS)
+    builder = EnvironBuilder(
+        path=entry['path'],
+        method=entry.get('method', 'GET').upper(),
+        base_url=request.host_url,
+        headers=headers,
+        json=entry.get('body'),
+        # Sub-requests count against the caller's own rate-limit bucket
+        environ_base={'REMOTE_ADDR': request.remote_addr, SUB_REQUEST: True},
+    )
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+
+def _result(response):
+    headers = {name: value for name, value in response.headers if name not in DROPPED_HEADERS}
+    if response.is_json:
+        body = response.get_json()
+    else:
+        body = response.get_data(as_text=True) or None
+    response.close()
+    return {"status": response.status_code, "headers": headers, "body": body}
+
+
+def dispatch(entry):
+    """
+    Run one sub-request through the normal request cycle: routing, the
+    before/after request hooks (so it is rate limited, cached and measured
+    like a direct call) and the view. It gets its own request context and
+    `g` but stays in the batch's app context, so every sub-request uses the
+    same database session, and independent reads the same connection.
+    """
+    app = current_app._get_current_object()
+    ctx = app_ctx._get_current_object()
+    outer_g, ctx.g = ctx.g, app.app_ctx_globals_class()
+    try:
+        with app.request_context(_environ(entry)):
+            try:
+                response = app.full_dispatch_request()
+                if response.status_code >= 500:
+                    db.session.rollback()
+                # Reading the body back can fail too; that stays this entry's error
+                return _result(response)
+            except Exception:
+                app.logger.exception("Batch sub-request %s %s failed", entry.get('method', 'GET'), entry['path'])
+                db.session.rollback()
+                return _error(500, "Internal Server Error")
+    finally:
+        ctx.g = outer_g
+
+
+# Run several API calls in one round trip
+@batch_bp.route('', methods=['POST'])
+def run_batch():
+    if request.environ.get(SUB_REQUEST):
+        return jsonify({"error": "Batches can't be nested"}), 400
+    entries = request.get_json(silent=True)
+    if not isinstance(entries, list):
+        return jsonify({"error": "Body must be a JSON array of requests"}), 400
+    max_requests = current_app.config.get('BATCH_MAX_REQUESTS', BATCH_MAX_REQUESTS)
+    if len(entries) > max_requests:
+        return jsonify({"error": f"At most {max_requests} requests per batch"}), 413
+
+    results = []
+    for entry in entries:
+        message = _check(entry)
+        results.append(_error(400, message) if message else dispatch(entry))
+    return jsonify(results), 200
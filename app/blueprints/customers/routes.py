@@ -1,17 +1,25 @@
-from .schemas import customer_schema, customers_schema, login_schema
+from .schemas import customer_schema, login_schema, customers_serializer
 from flask import request, jsonify
 from marshmallow import ValidationError
 from sqlalchemy import select
 from app.models import Customer, ServiceTicket
 from . import customers_bp
 from app.blueprints.customers import customers_bp
-from app.extensions import limiter, cache, db
+from app.extensions import limiter, db
 from app.utils.util import encode_token, token_required
+from app.utils.pagination import paginate
+from app.utils.caching import cached_list, invalidate
+from app.utils.conditional import conditional, row_response
+from app.utils.serializers import parse_fields, only_fields, load_only_options
+from app.utils.bulk import bulk_import, read_records, BulkError
+
+# One bucket for single and bulk creates, so uploads can't multiply the allowance
+CREATE_LIMIT = "6 per hour"
 
 #Endpoints
 #Create new customer
 @customers_bp.route('/', methods=['POST'])  
-@limiter.limit("6 per hour")
+@limiter.shared_limit(CREATE_LIMIT, scope="customer-create")
 def add_customer():
     """
     Create a new customer
@@ -86,28 +94,51 @@ def add_customer():
     new_customer = Customer(**customer_data)
     db.session.add(new_customer)
     db.session.commit()
+    invalidate('customers')
     return customer_schema.jsonify(new_customer), 201
 
+# Bulk-create customers from a JSON array or CSV upload
+@customers_bp.route('/bulk', methods=['POST'])
+@limiter.shared_limit(CREATE_LIMIT, scope="customer-create")
+def bulk_add_customers():
+    try:
+        report = bulk_import(db.session, Customer, customer_schema, read_records(), unique=('email',))
+    except BulkError as e:
+        return jsonify({"error": str(e)}), 400
+    if report['inserted']:
+        invalidate('customers')
+    # 201 when every row went in; otherwise the report lists what didn't
+    return jsonify(report), 201 if not report['errors'] else 200
+
 #Read all customers
 @customers_bp.route('/', methods=['GET'])
-@cache.cached(timeout=60)
+@cached_list('customers')
+@conditional(('customer',))
 def get_customers():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
-    query = select(Customer)
-    customers = db.session.execute(query).scalars().all()
-    start = (page - 1) * per_page
-    end = start + per_page
-    paginated = customers[start:end]
-    return customers_schema.jsonify(paginated)
+    try:
+        serializer = customers_serializer.only(parse_fields(customer_schema, request.args.get('fields')))
+        rows, next_cursor = paginate(db.session, serializer.select(), Customer.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = jsonify(serializer.dump_rows(rows))
+    if next_cursor:
+        # Clients pass this back as ?after= to fetch the next page by keyset
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 #Read a specific customer by ID
 @customers_bp.route('/<int:customer_id>', methods=['GET'])
 def get_customer(customer_id):
-    customer = db.session.get(Customer, customer_id)
+    try:
+        fields = parse_fields(customer_schema, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    customer = db.session.get(Customer, customer_id,
+                              options=load_only_options(customer_schema, fields, 'updated_at'))
     if customer:
-        return customer_schema.jsonify(customer), 200
+        return row_response(customer, lambda: only_fields(customer_schema, fields).jsonify(customer))
     return jsonify({"message": "Customer not found"}), 404
 
 # Update customer by ID
@@ -130,6 +161,7 @@ def update_customer(customer_id, customer_id_from_token):
         setattr(customer, key, value)
 
     db.session.commit()
+    invalidate('customers')
     return customer_schema.jsonify(customer), 200
 
 # Delete a customer by ID
@@ -157,6 +189,7 @@ def delete_customer_by_id(customer_id, customer_id_from_token):
     # Delete the customer from the database
     db.session.delete(customer)
     db.session.commit()
+    invalidate('customers')
     # Return a 200 OK response with a JSON message indicating success
     return jsonify({"message": "Customer deleted successfully"}), 200
 
@@ -283,8 +316,12 @@ def get_my_tickets(customer_id_from_token):
               example: "Token is missing!"
     """
     # Query all service tickets for this customer
-    query = select(ServiceTicket).where(ServiceTicket.customer_id == customer_id_from_token)
-    tickets = db.session.execute(query).scalars().all()
-    from app.blueprints.service_tickets.schemas import service_tickets_schema
-    return service_tickets_schema.jsonify(tickets), 200
+    from app.blueprints.service_tickets.schemas import service_ticket_schema, service_tickets_serializer
+    try:
+        serializer = service_tickets_serializer.only(parse_fields(service_ticket_schema, request.args.get('fields')))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    query = serializer.select().where(ServiceTicket.customer_id == customer_id_from_token)
+    tickets = db.session.execute(query).all()
+    return jsonify(serializer.dump_rows(tickets)), 200
 
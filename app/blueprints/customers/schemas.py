@@ -1,11 +1,13 @@
 from app.extensions import ma
 from app.models import Customer
+from app.utils.serializers import RowSerializer
 
 # Marshmallow Schemas
 
 class CustomerSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Customer
+        dump_only = ('updated_at',)
 
 class LoginSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -15,4 +17,5 @@ class LoginSchema(ma.SQLAlchemyAutoSchema):
 customer_schema = CustomerSchema()
 customers_schema = CustomerSchema(many=True)
 login_schema = LoginSchema()
+customers_serializer = RowSerializer(customers_schema)
 
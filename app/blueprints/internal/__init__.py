@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+internal_bp = Blueprint('internal', __name__)
+
+from . import routes, commands
\ No newline at end of file
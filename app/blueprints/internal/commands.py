@@ -0,0 +1,22 @@
+import sys
+import click
+from flask import current_app
+from app.utils.query_plans import check_query_plans, UnsupportedDialect
+from . import internal_bp
+
+# flask internal check-queries
+@internal_bp.cli.command('check-queries')
+def check_queries():
+    """EXPLAIN each endpoint's queries and fail on unexpected full table scans."""
+    try:
+        failures = check_query_plans(current_app._get_current_object())
+    except UnsupportedDialect as e:
+        raise click.ClickException(str(e))
+    for probe, table, statement in failures:
+        if table is None:
+            click.echo(f"NO QUERIES captured for {probe}", err=True)
+            continue
+        click.echo(f"FULL SCAN of {table} in {probe}:\n    {' '.join(statement.split())}", err=True)
+    if failures:
+        sys.exit(1)
+    click.echo("All probed queries use an index")
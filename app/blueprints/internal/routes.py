@@ -0,0 +1,18 @@
+from flask import jsonify
+from app.models import db
+from app.utils.caching import cache_stats
+from app.utils.db_pool import pool_stats
+from app.utils.util import internal_only
+from . import internal_bp
+
+# Cache statistics for the worker that serves the request
+@internal_bp.route('/cache', methods=['GET'])
+@internal_only
+def get_cache_stats():
+    return jsonify(cache_stats()), 200
+
+# Connection pool state and checkout latency for the serving worker
+@internal_bp.route('/pool', methods=['GET'])
+@internal_only
+def get_pool_stats():
+    return jsonify(pool_stats(db.engine)), 200
@@ -1,8 +1,12 @@
 from flask import request, jsonify
 from app.models import db, Inventory
 from . import inventory_bp
-from .schemas import inventory_schema, inventories_schema
+from .schemas import inventory_schema, inventories_serializer
 from marshmallow import ValidationError
+from app.utils.caching import cached_list, invalidate
+from app.utils.conditional import conditional, row_response
+from app.utils.serializers import parse_fields, only_fields, load_only_options
+from app.utils.bulk import bulk_import, read_records, BulkError
 
 @inventory_bp.route('/', methods=['POST'])
 def add_inventory():
@@ -13,19 +17,43 @@ def add_inventory():
     part = Inventory(**data)
     db.session.add(part)
     db.session.commit()
+    invalidate('inventory')
     return inventory_schema.jsonify(part), 201
 
+# Bulk-create parts from a JSON array or CSV upload
+@inventory_bp.route('/bulk', methods=['POST'])
+def bulk_add_inventory():
+    try:
+        report = bulk_import(db.session, Inventory, inventory_schema, read_records())
+    except BulkError as e:
+        return jsonify({"error": str(e)}), 400
+    if report['inserted']:
+        invalidate('inventory')
+    # 201 when every row went in; otherwise the report lists what didn't
+    return jsonify(report), 201 if not report['errors'] else 200
+
 @inventory_bp.route('/', methods=['GET'])
+@cached_list('inventory')
+@conditional(('inventory',))
 def get_inventory():
-    parts = Inventory.query.all()
-    return inventories_schema.jsonify(parts), 200
+    try:
+        serializer = inventories_serializer.only(parse_fields(inventory_schema, request.args.get('fields')))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    parts = db.session.execute(serializer.select()).all()
+    return jsonify(serializer.dump_rows(parts)), 200
 
 @inventory_bp.route('/<int:part_id>', methods=['GET'])
 def get_inventory_by_id(part_id):
-    part = Inventory.query.get(part_id)
+    try:
+        fields = parse_fields(inventory_schema, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    part = db.session.get(Inventory, part_id, options=load_only_options(inventory_schema, fields, 'updated_at'))
     if not part:
         return jsonify({"error": "Part not found"}), 404
-    return inventory_schema.jsonify(part), 200
+    return row_response(part, lambda: only_fields(inventory_schema, fields).jsonify(part))
 
 @inventory_bp.route('/<int:part_id>', methods=['PUT'])
 def update_inventory(part_id):
@@ -39,6 +67,7 @@ def update_inventory(part_id):
     for key, value in data.items():
         setattr(part, key, value)
     db.session.commit()
+    invalidate('inventory')
     return inventory_schema.jsonify(part), 200
 
 @inventory_bp.route('/<int:part_id>', methods=['DELETE'])
@@ -48,5 +77,6 @@ def delete_inventory(part_id):
         return jsonify({"error": "Part not found"}), 404
     db.session.delete(part)
     db.session.commit()
+    invalidate('inventory')
     return jsonify({"message": "Part deleted successfully"}), 200
     return jsonify({"message": "Part deleted"}), 200
\ No newline at end of file
@@ -1,9 +1,12 @@
 from app.extensions import ma
 from app.models import Inventory
+from app.utils.serializers import RowSerializer
 
 class InventorySchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Inventory
+        dump_only = ('updated_at',)
 
 inventory_schema = InventorySchema()
-inventories_schema = InventorySchema(many=True)
\ No newline at end of file
+inventories_schema = InventorySchema(many=True)
+inventories_serializer = RowSerializer(inventories_schema)
@@ -0,0 +1,14 @@
+import click
+from app.models import db
+from app.utils.caching import invalidate
+from app.utils.workload import refresh_ticket_counts
+from . import mechanics_bp
+
+# flask mechanics reconcile-counts
+@mechanics_bp.cli.command('reconcile-counts')
+def reconcile_counts():
+    """Rebuild every mechanic's ticket_count from service_mechanic."""
+    refresh_ticket_counts(db.session)
+    db.session.commit()
+    invalidate('mechanics')
+    click.echo("Mechanic ticket counts rebuilt")
@@ -1,9 +1,12 @@
 from flask import request, jsonify
 from marshmallow import ValidationError
-from sqlalchemy import select, func
-from app.models import db, Mechanic, ServiceMechanic
+from app.models import db, Mechanic
 from . import mechanics_bp
-from .schemas import mechanic_schema, mechanics_schema
+from .schemas import mechanic_schema, mechanics_serializer
+from app.utils.caching import cached_list, invalidate
+from app.utils.conditional import conditional, row_response
+from app.utils.serializers import parse_fields, only_fields, load_only_options
+from app.utils.bulk import bulk_import, read_records, BulkError
 
 # Create a new Mechanic
 @mechanics_bp.route('/', methods=['POST'])
@@ -81,22 +84,45 @@ def add_mechanic():
     new_mechanic = Mechanic(**mechanic_data)
     db.session.add(new_mechanic)
     db.session.commit()
+    invalidate('mechanics')
     return mechanic_schema.jsonify(new_mechanic), 201
 
+# Bulk-create mechanics from a JSON array or CSV upload
+@mechanics_bp.route('/bulk', methods=['POST'])
+def bulk_add_mechanics():
+    try:
+        report = bulk_import(db.session, Mechanic, mechanic_schema, read_records(), unique=('email',))
+    except BulkError as e:
+        return jsonify({"error": str(e)}), 400
+    if report['inserted']:
+        invalidate('mechanics')
+    # 201 when every row went in; otherwise the report lists what didn't
+    return jsonify(report), 201 if not report['errors'] else 200
+
 # Get all Mechanics
 @mechanics_bp.route('/', methods=['GET'])
+@cached_list('mechanics')
+@conditional(('mechanic',))
 def get_mechanics():
-    query = select(Mechanic)
-    mechanics = db.session.execute(query).scalars().all()
-    return mechanics_schema.jsonify(mechanics)
+    try:
+        serializer = mechanics_serializer.only(parse_fields(mechanic_schema, request.args.get('fields')))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    mechanics = db.session.execute(serializer.select()).all()
+    return jsonify(serializer.dump_rows(mechanics))
 
 # Get Mechanic by ID
 @mechanics_bp.route('/<int:id>', methods=['GET'])
 def get_mechanic(id):
-    mechanic = db.session.get(Mechanic, id)
+    try:
+        fields = parse_fields(mechanic_schema, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    mechanic = db.session.get(Mechanic, id, options=load_only_options(mechanic_schema, fields, 'updated_at'))
     if not mechanic:
         return jsonify({"error": "Mechanic not found"}), 404
-    return mechanic_schema.jsonify(mechanic), 200
+    return row_response(mechanic, lambda: only_fields(mechanic_schema, fields).jsonify(mechanic))
 
 # Update Mechanic by ID
 @mechanics_bp.route('/<int:id>', methods=['PUT'])
@@ -114,6 +140,7 @@ def update_mechanic(id):
         setattr(mechanic, key, value)
 
     db.session.commit()
+    invalidate('mechanics')
     return mechanic_schema.jsonify(mechanic), 200
 
 # Delete Mechanic by ID
@@ -125,18 +152,27 @@ def delete_mechanic(id):
 
     db.session.delete(mechanic)
     db.session.commit()
+    invalidate('mechanics')
     return jsonify({"message": "Mechanic deleted successfully"}), 200
 
 
 # Most active Mechanics
 @mechanics_bp.route('/most-active', methods=['GET'])
+@cached_list('mechanics', 'tickets')
+@conditional(('mechanic',))
 def most_active_mechanics():
-    results = (
-        db.session.query(Mechanic, func.count(ServiceMechanic.ticket_id).label('ticket_count'))
-        .outerjoin(ServiceMechanic, Mechanic.id == ServiceMechanic.mechanic_id)
-        .group_by(Mechanic.id)
-        .order_by(func.count(ServiceMechanic.ticket_id).desc())
-        .all()
-    )
-    mechanics = [row[0] for row in results]
-    return mechanics_schema.jsonify(mechanics), 200
\ No newline at end of file
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    try:
+        serializer = mechanics_serializer.only(parse_fields(mechanic_schema, request.args.get('fields')))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ticket_count is maintained on write and indexed, so this is an index scan
+    # that stops after `limit` rows instead of a join + group by over every assignment
+    query = serializer.select().order_by(Mechanic.ticket_count.desc(), Mechanic.id)
+    if limit:
+        query = query.limit(limit)
+    mechanics = db.session.execute(query).all()
+    return jsonify(serializer.dump_rows(mechanics)), 200
\ No newline at end of file
@@ -1,9 +1,13 @@
 from app.extensions import ma
 from app.models import Mechanic
+from app.utils.serializers import RowSerializer
 
 class MechanicSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Mechanic
+        exclude = ('ticket_count',)
+        dump_only = ('updated_at',)
 
 mechanic_schema = MechanicSchema()
-mechanics_schema = MechanicSchema(many=True)
\ No newline at end of file
+mechanics_schema = MechanicSchema(many=True)
+mechanics_serializer = RowSerializer(mechanics_schema)
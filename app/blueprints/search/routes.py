@@ -0,0 +1,71 @@
+from flask import request, jsonify
+from app.models import db
+from app.blueprints.customers.schemas import customer_schema, customers_serializer
+from app.blueprints.service_tickets.schemas import service_tickets_serializer
+from app.blueprints.inventory.schemas import inventories_serializer
+from app.utils.caching import cached_list
+from app.utils.conditional import conditional
+from app.utils.search import SOURCES, parse_query, search
+from . import search_bp
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# How each type's records are rendered in results; customers without the password
+SERIALIZERS = {
+    'customers': customers_serializer.only(frozenset(customer_schema.dump_fields) - {'password'}),
+    'service_tickets': service_tickets_serializer,
+    'inventory': inventories_serializer,
+}
+
+
+def parse_types(value):
+    """Split ?type=a,b into a set of SOURCES keys, all of them when absent; ValueError for unknown types."""
+    if not value:
+        return set(SOURCES)
+    types = {part.strip() for part in value.split(',') if part.strip()}
+    unknown = types - SOURCES.keys()
+    if unknown:
+        raise ValueError(f"Unknown type: {', '.join(sorted(unknown))}")
+    return types
+
+
+def search_tables():
+    try:
+        types = parse_types(request.args.get('type'))
+    except ValueError:
+        types = SOURCES.keys()  # the view rejects it
+    return tuple(SOURCES[kind][0].name for kind in sorted(types))
+
+
+def _records(hits):
+    """Each hit's row, in one query per type present."""
+    ids = {}
+    for kind, row_id, _ in hits:
+        ids.setdefault(kind, []).append(row_id)
+    records = {}
+    for kind, kind_ids in ids.items():
+        serializer = SERIALIZERS[kind]
+        table = SOURCES[kind][0]
+        rows = db.session.execute(serializer.select().where(table.c.id.in_(kind_ids))).all()
+        records.update(((kind, record['id']), record) for record in serializer.dump_rows(rows))
+    return records
+
+
+# Ranked full-text search over customers, service descriptions and parts
+@search_bp.route('', methods=['GET'])
+@cached_list('customers', 'tickets', 'inventory')
+@conditional(search_tables)
+def search_records():
+    try:
+        terms = parse_query(request.args.get('q'))
+        types = parse_types(request.args.get('type'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    if limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    hits = search(db.session, terms, types, min(limit, MAX_LIMIT))
+    records = _records(hits)
+    return jsonify([{"type": kind, "id": row_id, "rank": round(rank, 6), "record": records[kind, row_id]}
+                    for kind, row_id, rank in hits if (kind, row_id) in records])
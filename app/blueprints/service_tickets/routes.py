@@ -1,9 +1,22 @@
-from flask import request, jsonify
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import current_app, request, jsonify, Response, stream_with_context
 from marshmallow import ValidationError
-from sqlalchemy import select
-from app.models import db, ServiceTicket, Mechanic, Inventory, ServiceMechanic
+from sqlalchemy import select, delete, insert
+from sqlalchemy.exc import IntegrityError
+from app.models import db, Customer, ServiceTicket, Mechanic, ServiceMechanic, ServicePart, Inventory
 from . import service_tickets_bp
-from .schemas import service_ticket_schema, service_tickets_schema
+from .schemas import (service_ticket_schema, service_tickets_serializer,
+                      detail_schema, include_options, include_tables, include_tags, parse_includes)
+from app.utils.caching import cached_list, invalidate
+from app.utils.conditional import conditional
+from app.utils.serializers import parse_fields, load_only_options
+from app.utils.pagination import paginate
+from app.utils.junctions import insert_ignore, link, unlink, MissingParent
+from app.utils.workload import adjust_ticket_counts, count_assignments
 
 # Create a new Service Ticket
 @service_tickets_bp.route('/', methods=['POST'])
@@ -16,77 +29,314 @@ def add_service_ticket():
     new_ticket = ServiceTicket(**ticket_data)
     db.session.add(new_ticket)
     db.session.commit()
+    invalidate('tickets')
     return service_ticket_schema.jsonify(new_ticket), 201
 
+BATCH_MAX_TICKETS = 500
+# Per-ticket association lists in a batch entry, and the column each id must exist in
+BATCH_LINKS = {'mechanic_ids': Mechanic.id, 'part_ids': Inventory.id}
+
+def _existing_ids(column, ids):
+    if not ids:
+        return set()
+    return set(db.session.execute(select(column).where(column.in_(ids))).scalars())
+
+def _insert_tickets(rows):
+    """Insert ticket rows in as few statements as the database allows; returns their ids in order."""
+    dialect = db.session.get_bind().dialect
+    if dialect.name == 'sqlite':
+        # A single multi-row INSERT holds SQLite's write lock from start to end,
+        # so the rowids it assigns are consecutive, ending at lastrowid
+        last_id = db.session.execute(insert(ServiceTicket).values(rows)).lastrowid
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        # Postgres: batched INSERT .. RETURNING, matched back to the input order
+        return db.session.scalars(
+            insert(ServiceTicket).returning(ServiceTicket.id, sort_by_parameter_order=True), rows).all()
+    # MySQL has no RETURNING; the ORM reads each new id as it inserts
+    tickets = [ServiceTicket(**row) for row in rows]
+    db.session.add_all(tickets)
+    db.session.flush()
+    return [ticket.id for ticket in tickets]
+
+# Create many Service Tickets with their mechanics and parts in one transaction
+@service_tickets_bp.route('/batch', methods=['POST'])
+def add_service_tickets_batch():
+    entries = request.get_json(silent=True)
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        return jsonify({"error": "Body must be a JSON array of tickets"}), 400
+    max_tickets = current_app.config.get('BATCH_MAX_TICKETS', BATCH_MAX_TICKETS)
+    if len(entries) > max_tickets:
+        return jsonify({"error": f"At most {max_tickets} tickets per batch"}), 413
+
+    errors = {}
+    links = []
+    for index, entry in enumerate(entries):
+        entry_links = {}
+        for key in BATCH_LINKS:
+            ids = entry.get(key, [])
+            if not isinstance(ids, list) or not all(type(i) is int for i in ids):
+                errors.setdefault(index, {})[key] = ["Must be a list of integers"]
+                ids = []
+            entry_links[key] = list(dict.fromkeys(ids))
+        links.append(entry_links)
+    try:
+        rows = service_ticket_schema.load(
+            [{k: v for k, v in entry.items() if k not in BATCH_LINKS} for entry in entries], many=True)
+    except ValidationError as e:
+        rows = e.valid_data
+        for index, messages in e.messages.items():
+            errors.setdefault(index, {}).update(messages)
+
+    # One query per referenced table checks every id in the batch
+    customers = _existing_ids(Customer.id, {row['customer_id'] for row in rows if 'customer_id' in row})
+    known = {key: _existing_ids(column, {i for entry_links in links for i in entry_links[key]})
+             for key, column in BATCH_LINKS.items()}
+    for index, (row, entry_links) in enumerate(zip(rows, links)):
+        if index in errors:
+            continue
+        if row['customer_id'] not in customers:
+            errors.setdefault(index, {})['customer_id'] = ["Customer not found"]
+        for key, ids in entry_links.items():
+            missing = [i for i in ids if i not in known[key]]
+            if missing:
+                errors.setdefault(index, {})[key] = [f"Not found: {', '.join(map(str, missing))}"]
+    if errors:
+        # All or nothing: nothing is written unless every ticket is valid
+        return jsonify({"errors": [{"index": index, "errors": messages}
+                                   for index, messages in sorted(errors.items())]}), 400
+    if not rows:
+        return jsonify({"ids": []}), 201
+
+    try:
+        ids = _insert_tickets(rows)
+        mechanic_rows = [{"ticket_id": ticket_id, "mechanic_id": mechanic_id}
+                         for ticket_id, entry_links in zip(ids, links) for mechanic_id in entry_links['mechanic_ids']]
+        part_rows = [{"service_ticket_id": ticket_id, "inventory_id": part_id}
+                     for ticket_id, entry_links in zip(ids, links) for part_id in entry_links['part_ids']]
+        if mechanic_rows:
+            db.session.execute(insert(ServiceMechanic), mechanic_rows)
+        if part_rows:
+            db.session.execute(insert(ServicePart), part_rows)
+        # Every assignment row is new, so each adds one to its mechanic
+        adjust_ticket_counts(db.session, Counter(row['mechanic_id'] for row in mechanic_rows))
+        db.session.commit()
+    except IntegrityError:
+        # A customer, mechanic or part was deleted after the checks above
+        db.session.rollback()
+        return jsonify({"error": "A referenced customer, mechanic or part no longer exists"}), 409
+
+    invalidate('tickets', *(['mechanics'] if mechanic_rows else []), *(['inventory'] if part_rows else []))
+    return jsonify({"ids": ids}), 201
+
 # Assign Mechanic to Service Ticket
 @service_tickets_bp.route('/<int:ticket_id>/assign-mechanic/<int:mechanic_id>', methods=['PUT'])
 def assign_mechanic(ticket_id, mechanic_id):
-    ticket = db.session.get(ServiceTicket, ticket_id)
-    mechanic = db.session.get(Mechanic, mechanic_id)
-    if not ticket or not mechanic:
+    # Foreign keys reject a missing ticket or mechanic, so no pre-reads are needed
+    try:
+        inserted = link(db.session, ServiceMechanic, returning=ServiceMechanic.mechanic_id,
+                        ticket_id=ticket_id, mechanic_id=mechanic_id)
+    except MissingParent:
         return jsonify({"error": "Ticket or Mechanic not found"}), 404
-
-    # Check if mechanic is already assigned
-    existing_assignment = db.session.query(ServiceMechanic).filter_by(
-        ticket_id=ticket.id,
-        mechanic_id=mechanic.id
-    ).first()
-    
-    if not existing_assignment:
-        service_mechanic = ServiceMechanic()
-        service_mechanic.ticket_id = ticket.id
-        service_mechanic.mechanic_id = mechanic.id
-        db.session.add(service_mechanic)
-        db.session.commit()
+    count_assignments(db.session, inserted, [], [mechanic_id])
+    db.session.commit()
+    invalidate('tickets', 'mechanics')
+    ticket = db.session.get(ServiceTicket, ticket_id)
     return service_ticket_schema.jsonify(ticket), 200
 
 # Remove Mechanic from Service Ticket
 @service_tickets_bp.route('/<int:ticket_id>/remove-mechanic/<int:mechanic_id>', methods=['PUT'])
 def remove_mechanic(ticket_id, mechanic_id):
+    removed = unlink(db.session, ServiceMechanic, ticket_id=ticket_id, mechanic_id=mechanic_id)
+    if removed:
+        adjust_ticket_counts(db.session, {mechanic_id: -1})
+    db.session.commit()
     ticket = db.session.get(ServiceTicket, ticket_id)
     if not ticket:
         return jsonify({"error": "Ticket not found"}), 404
-
-    # Find the ServiceMechanic association
-    service_mechanic = db.session.query(ServiceMechanic).filter_by(
-        ticket_id=ticket.id,
-        mechanic_id=mechanic_id
-    ).first()
-    
-    if not service_mechanic:
+    if not removed:
         return jsonify({"error": "Mechanic not assigned to this ticket"}), 404
 
-    # Remove the association from the session
-    db.session.delete(service_mechanic)
-    db.session.commit()
+    invalidate('tickets', 'mechanics')
     return service_ticket_schema.jsonify(ticket), 200
 
-# Get all Service Tickets
+def _parse_date_bound(value, end=False):
+    # A bare date as the upper bound means "through the end of that day"
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+# Orderings an index can serve, by ?sort= name (prefix - for descending); the
+# ticket id breaks ties, None meaning the id alone
+TICKET_SORTS = {'id': None, 'service_date': ServiceTicket.service_date}
+# Junction tables the filters read, so the list ETag changes when they do
+FILTER_TABLES = {'mechanic_id': 'service_mechanic', 'part_id': 'service_part'}
+# and the cache tags whose writes change those junction rows (deleting a
+# mechanic or part removes its assignments)
+FILTER_TAGS = {'mechanic_id': 'mechanics', 'part_id': 'inventory'}
+
+def parse_sort(value):
+    """Split ?sort= into (column or None, descending), raising ValueError for sorts not in TICKET_SORTS."""
+    value = value or 'id'
+    descending = value.startswith('-')
+    name = value[1:] if descending else value
+    if name not in TICKET_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(sorted(TICKET_SORTS))}, optionally prefixed with -")
+    return TICKET_SORTS[name], descending
+
+def _int_arg(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+def filter_tickets(query):
+    """
+    Narrow a ticket select() by ?customer_id=, ?vin=, ?from=, ?to=, ?mechanic_id=
+    and ?part_id=, raising ValueError for malformed values. Every filter is an
+    equality or range on an indexed column; mechanic and part filters join the
+    junction table on its reverse-lookup index, one row per ticket at most.
+    """
+    customer_id, mechanic_id, part_id = _int_arg('customer_id'), _int_arg('mechanic_id'), _int_arg('part_id')
+    try:
+        start = _parse_date_bound(request.args['from']) if request.args.get('from') else None
+        end = _parse_date_bound(request.args['to'], end=True) if request.args.get('to') else None
+    except ValueError:
+        raise ValueError("from and to must be ISO 8601 dates")
+
+    if customer_id is not None:
+        query = query.where(ServiceTicket.customer_id == customer_id)
+    if request.args.get('vin'):
+        query = query.where(ServiceTicket.VIN == request.args['vin'])
+    if start is not None:
+        query = query.where(ServiceTicket.service_date >= start)
+    if end is not None:
+        query = query.where(ServiceTicket.service_date < end)
+    if mechanic_id is not None:
+        query = query.join(ServiceMechanic, ServiceMechanic.ticket_id == ServiceTicket.id) \
+                     .where(ServiceMechanic.mechanic_id == mechanic_id)
+    if part_id is not None:
+        query = query.join(ServicePart, ServicePart.service_ticket_id == ServiceTicket.id) \
+                     .where(ServicePart.inventory_id == part_id)
+    return query
+
+def list_tables():
+    """Tables behind GET /service_tickets/ for the current ?include= and filters."""
+    tables = include_tables(request.args.get('include'))
+    return tables + tuple(table for name, table in FILTER_TABLES.items()
+                          if request.args.get(name) and table not in tables)
+
+def list_tags():
+    """Cache tags for GET /service_tickets/: tickets plus whatever ?include= and the filters read."""
+    tags = include_tags(request.args.get('include'))
+    return tags + tuple(tag for name, tag in FILTER_TAGS.items() if request.args.get(name) and tag not in tags)
+
+# Get Service Tickets, filtered, sorted and paginated
 @service_tickets_bp.route('/', methods=['GET'])
+@cached_list(list_tags)
+@conditional(list_tables)
 def get_service_tickets():
-    query = select(ServiceTicket)
-    tickets = db.session.execute(query).scalars().all()
-    return service_tickets_schema.jsonify(tickets)
+    try:
+        includes = parse_includes(request.args.get('include'))
+        fields = parse_fields(service_ticket_schema, request.args.get('fields'))
+        sort_column, descending = parse_sort(request.args.get('sort'))
+
+        if includes:
+            extra = (sort_column.key,) if sort_column is not None else ()
+            query = select(ServiceTicket).options(*include_options(includes),
+                                                  *load_only_options(service_ticket_schema, fields, *extra))
+            tickets, next_cursor = paginate(db.session, filter_tickets(query), ServiceTicket.id,
+                                            sort_column, descending)
+            response = detail_schema(includes, many=True, fields=fields).jsonify(tickets)
+        else:
+            serializer = service_tickets_serializer.only(fields)
+            rows, next_cursor = paginate(db.session, filter_tickets(serializer.select()), ServiceTicket.id,
+                                         sort_column, descending)
+            response = jsonify(serializer.dump_rows(rows))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if next_cursor:
+        # Clients pass this back as ?after= to fetch the next page by keyset
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+# Get a Service Ticket with its customer, mechanics and parts
+@service_tickets_bp.route('/<int:ticket_id>', methods=['GET'])
+@conditional(lambda: include_tables(request.args.get('include', 'customer,mechanics,parts')))
+def get_service_ticket(ticket_id):
+    try:
+        includes = parse_includes(request.args.get('include', 'customer,mechanics,parts'))
+        fields = parse_fields(service_ticket_schema, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    options = include_options(includes) + load_only_options(service_ticket_schema, fields)
+    ticket = db.session.get(ServiceTicket, ticket_id, options=options)
+    if not ticket:
+        return jsonify({"error": "Ticket not found"}), 404
+    return detail_schema(includes, fields=fields).jsonify(ticket), 200
+
+EXPORT_COLUMNS = ('id', 'VIN', 'service_date', 'service_desc', 'customer_id')
+EXPORT_BATCH_SIZE = 1000
+
+# Export Service Tickets as NDJSON or CSV
+@service_tickets_bp.route('/export', methods=['GET'])
+def export_service_tickets():
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    table = ServiceTicket.__table__
+    query = select(*(table.c[name] for name in EXPORT_COLUMNS)).order_by(table.c.id)
+    try:
+        if request.args.get('from'):
+            query = query.where(table.c.service_date >= _parse_date_bound(request.args['from']))
+        if request.args.get('to'):
+            query = query.where(table.c.service_date < _parse_date_bound(request.args['to'], end=True))
+    except ValueError:
+        return jsonify({"error": "from and to must be ISO 8601 dates"}), 400
+
+    def generate():
+        # yield_per streams from a server-side cursor, so only one batch of rows
+        # is ever held in memory no matter how many tickets match
+        result = db.session.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == 'csv':
+            writer.writerow(EXPORT_COLUMNS)
+        for rows in result.partitions():
+            for row in rows:
+                record = row._asdict()
+                record['service_date'] = record['service_date'].isoformat()
+                if export_format == 'csv':
+                    writer.writerow(record.values())
+                else:
+                    buffer.write(json.dumps(record))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=service_tickets.{export_format}'
+    return response
 
 # Inventory Management for Service Tickets
 @service_tickets_bp.route('/<int:ticket_id>/add-part/<int:part_id>', methods=['PUT'])
 def add_part_to_ticket(ticket_id, part_id):
-    ticket = db.session.get(ServiceTicket, ticket_id)
-    part = db.session.get(Inventory, part_id)
-    if not ticket or not part:
+    try:
+        link(db.session, ServicePart, service_ticket_id=ticket_id, inventory_id=part_id)
+    except MissingParent:
         return jsonify({"error": "Ticket or part not found"}), 404
-    
-    # Check if part is already associated with the ticket using the junction table
-    from app.models import ServicePart
-    existing_part = db.session.query(ServicePart).filter_by(
-        service_ticket_id=ticket.id,
-        inventory_id=part.id
-    ).first()
-    
-    if not existing_part:
-        ticket.parts.append(part)
-        db.session.commit()
-    
+    db.session.commit()
+    invalidate('tickets', 'inventory')
     return jsonify({"message": "Part added to ticket"}), 200
 
 @service_tickets_bp.route('/<int:ticket_id>/edit', methods=['PUT'])
@@ -97,35 +347,56 @@ def edit_ticket_mechanics(ticket_id):
         
     add_ids = data.get('add_ids', [])
     remove_ids = data.get('remove_ids', [])
+    for ids in (add_ids, remove_ids):
+        if not isinstance(ids, list) or not all(type(i) is int for i in ids):
+            return jsonify({"error": "add_ids and remove_ids must be lists of integers"}), 400
+    add_ids = list(dict.fromkeys(add_ids))
 
     ticket = db.session.get(ServiceTicket, ticket_id)
     if not ticket:
         return jsonify({"error": "Ticket not found"}), 404
 
-    # Remove mechanics
-    for mech_id in remove_ids:
-        # Query the ServiceMechanic association directly
-        assoc = db.session.query(ServiceMechanic).filter_by(
-            ticket_id=ticket.id, 
-            mechanic_id=mech_id
-        ).first()
-        if assoc:
-            db.session.delete(assoc)
-
-    # Add mechanics
+    # One query tells us which ids are real mechanics and which are already assigned
+    requested = set(add_ids) | set(remove_ids)
+    rows = db.session.execute(
+        select(Mechanic.id, ServiceMechanic.ticket_id)
+        .outerjoin(ServiceMechanic, (ServiceMechanic.mechanic_id == Mechanic.id)
+                   & (ServiceMechanic.ticket_id == ticket.id))
+        .where(Mechanic.id.in_(requested))
+    ).all() if requested else []
+    assigned = {mech_id: current is not None for mech_id, current in rows}
+
+    # Remove mechanics in one statement
+    removed = sorted(i for i in set(remove_ids) if assigned.get(i))
+    deleted = []
+    if remove_ids:
+        stmt = delete(ServiceMechanic).where(ServiceMechanic.ticket_id == ticket.id,
+                                             ServiceMechanic.mechanic_id.in_(remove_ids))
+        if db.session.get_bind().dialect.delete_returning:
+            deleted = db.session.execute(stmt.returning(ServiceMechanic.mechanic_id)).scalars().all()
+        else:
+            db.session.execute(stmt)
+            deleted = None
+
+    # Add mechanics in one multi-row insert
+    added, skipped, unknown = [], [], []
     for mech_id in add_ids:
-        mechanic = db.session.get(Mechanic, mech_id)
-        # Check if association already exists
-        existing_assoc = db.session.query(ServiceMechanic).filter_by(
-            ticket_id=ticket.id, 
-            mechanic_id=mech_id
-        ).first()
-        
-        if mechanic and not existing_assoc:
-            service_mechanic = ServiceMechanic()
-            service_mechanic.ticket_id = ticket.id
-            service_mechanic.mechanic_id = mechanic.id
-            db.session.add(service_mechanic)
+        if mech_id not in assigned:
+            unknown.append(mech_id)
+        elif assigned[mech_id] and mech_id not in removed:
+            skipped.append(mech_id)
+        else:
+            added.append(mech_id)
+    inserted = insert_ignore(db.session, ServiceMechanic,
+                             [{"ticket_id": ticket.id, "mechanic_id": mech_id} for mech_id in added],
+                             returning=ServiceMechanic.mechanic_id)
+    # Counted from the rows the statements actually wrote, which concurrent
+    # edits of the same ticket can make differ from added/removed above
+    count_assignments(db.session, inserted, deleted, set(added) | set(removed))
 
+    # Dump before commit so the expired ticket isn't reloaded just to render it
+    response = service_ticket_schema.dump(ticket)
+    response.update({"added": added, "removed": removed, "skipped": skipped, "unknown": unknown})
     db.session.commit()
-    return service_ticket_schema.jsonify(ticket), 200
\ No newline at end of file
+    invalidate('tickets', 'mechanics')
+    return jsonify(response), 200
\ No newline at end of file
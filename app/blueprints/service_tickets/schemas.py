@@ -1,11 +1,79 @@
+from functools import lru_cache
+from marshmallow import fields
+from sqlalchemy.orm import joinedload, selectinload
 from app.extensions import ma
-from app.models import ServiceTicket
+from app.models import ServiceTicket, ServiceMechanic
+from app.utils.serializers import RowSerializer
+from app.blueprints.customers.schemas import CustomerSchema
+from app.blueprints.mechanics.schemas import mechanics_schema
+from app.blueprints.inventory.schemas import InventorySchema
 
 class ServiceTicketSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = ServiceTicket
         include_fk = True
+        dump_only = ('updated_at',)
+
+class ServiceTicketDetailSchema(ServiceTicketSchema):
+    customer = fields.Nested(CustomerSchema, exclude=('password',))
+    # ticket.mechanics holds ServiceMechanic rows; render the mechanics behind them
+    mechanics = fields.Method('dump_mechanics')
+    parts = fields.Nested(InventorySchema, many=True)
+
+    def dump_mechanics(self, ticket):
+        # The shared mechanics schema, not a new one per ticket
+        return mechanics_schema.dump([assignment.mechanic for assignment in ticket.mechanics])
+
+# Loader options that fetch each relation in a fixed number of queries
+# regardless of how many tickets are on the page
+INCLUDE_OPTIONS = {
+    'customer': (joinedload(ServiceTicket.customer),),
+    'mechanics': (selectinload(ServiceTicket.mechanics).joinedload(ServiceMechanic.mechanic),),
+    'parts': (selectinload(ServiceTicket.parts),),
+}
+
+# Tables each relation is read from, for the ETag of a response that includes it
+INCLUDE_TABLES = {
+    'customer': ('customer',),
+    'mechanics': ('service_mechanic', 'mechanic'),
+    'parts': ('service_part', 'inventory'),
+}
+
+# Response-cache tags of the resources each relation embeds
+INCLUDE_TAGS = {
+    'customer': 'customers',
+    'mechanics': 'mechanics',
+    'parts': 'inventory',
+}
+
+def parse_includes(value):
+    """Split ?include=a,b into a frozenset, raising ValueError for unknown relations."""
+    includes = frozenset(part.strip() for part in (value or '').split(',') if part.strip())
+    unknown = includes - INCLUDE_OPTIONS.keys()
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(sorted(unknown))}")
+    return includes
+
+def include_tables(value):
+    """Tables behind a ticket response with ?include=value; unknown names are left to the view to reject."""
+    names = {part.strip() for part in (value or '').split(',')}
+    return ('service_ticket',) + tuple(t for name in sorted(names & INCLUDE_TABLES.keys()) for t in INCLUDE_TABLES[name])
+
+def include_tags(value):
+    """Cache tags for a ticket response with ?include=value; like include_tables(), unknown names are ignored."""
+    names = {part.strip() for part in (value or '').split(',')}
+    return ('tickets',) + tuple(INCLUDE_TAGS[name] for name in sorted(names & INCLUDE_TAGS.keys()))
+
+def include_options(includes):
+    return [option for name in sorted(includes) for option in INCLUDE_OPTIONS[name]]
+
+@lru_cache(maxsize=None)
+def detail_schema(includes, many=False, fields=None):
+    """Schema rendering only the requested relations and ?fields=; one instance per combination."""
+    only = None if fields is None else tuple(sorted(fields | includes))
+    return ServiceTicketDetailSchema(many=many, only=only, exclude=tuple(INCLUDE_OPTIONS.keys() - includes))
 
         
 service_ticket_schema = ServiceTicketSchema()
-service_tickets_schema = ServiceTicketSchema(many=True)
\ No newline at end of file
+service_tickets_schema = ServiceTicketSchema(many=True)
+service_tickets_serializer = RowSerializer(service_tickets_schema)
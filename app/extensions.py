@@ -1,12 +1,16 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from flask_caching import Cache
+from flask_migrate import Migrate
+from app.utils.util import rate_limit_key
+from app.utils import ratelimit  # registers the mmap:// limiter storage
 
 db = SQLAlchemy() 
+migrate = Migrate()
 ma = Marshmallow()
-limiter = Limiter(key_func=get_remote_address)
-cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
+limiter = Limiter(key_func=rate_limit_key)
+# Backend comes from CACHE_TYPE in config so production can use a shared store
+cache = Cache()
 
 
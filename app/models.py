@@ -1,5 +1,33 @@
+import sqlite3
+from datetime import datetime, timezone
+from sqlalchemy import event, insert
+from sqlalchemy.dialects import mysql
+from sqlalchemy.engine import Engine
 from app.extensions import db
 
+
+# SQLite ignores foreign keys unless asked; the junction endpoints rely on them
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Microseconds on MySQL too, whose DATETIME otherwise rounds to the second and
+# would give two writes in the same second the same timestamp
+Timestamp = db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
+def updated_at_column():
+    return db.Column(Timestamp, nullable=False, default=utcnow, onupdate=utcnow)
+
+
 # --- Customer Model ---
 class Customer(db.Model):
     __tablename__ = 'customer'
@@ -8,16 +36,18 @@ class Customer(db.Model):
     email = db.Column(db.String(100), unique=True, nullable=False)
     phone = db.Column(db.String(15), nullable=False)
     password = db.Column(db.String(255), nullable=False)
+    updated_at = updated_at_column()
     tickets = db.relationship("ServiceTicket", back_populates="customer")
 
 # --- ServiceTicket Model ---
 class ServiceTicket(db.Model):
     __tablename__ = 'service_ticket'
     id = db.Column(db.Integer, primary_key=True)
-    VIN = db.Column(db.String(50), nullable=False)
-    service_date = db.Column(db.DateTime, nullable=False)
+    VIN = db.Column(db.String(50), nullable=False, index=True)
+    service_date = db.Column(db.DateTime, nullable=False, index=True)
     service_desc = db.Column(db.String(255), nullable=False)
-    customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=False, index=True)
+    updated_at = updated_at_column()
     customer = db.relationship("Customer", back_populates="tickets")
     mechanics = db.relationship("ServiceMechanic", back_populates="ticket")
     parts = db.relationship('Inventory', secondary='service_part', back_populates='tickets')
@@ -30,13 +60,22 @@ class Mechanic(db.Model):
     email = db.Column(db.String(100), unique=True, nullable=False)
     phone = db.Column(db.String(15), nullable=False)
     salary = db.Column(db.Float, nullable=False)
+    # Denormalized count of service_mechanic rows, kept current by the ticket routes
+    ticket_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = updated_at_column()
     tickets = db.relationship("ServiceMechanic", back_populates="mechanic")
 
+    __table_args__ = (
+        db.Index('ix_mechanic_ticket_count', ticket_count.desc(), 'id'),
+    )
+
 # --- ServiceMechanic Junction Table ---
 class ServiceMechanic(db.Model):
     __tablename__ = 'service_mechanic'
     ticket_id = db.Column(db.Integer, db.ForeignKey('service_ticket.id'), primary_key=True)
-    mechanic_id = db.Column(db.Integer, db.ForeignKey('mechanic.id'), primary_key=True)
+    # Reverse lookups (a mechanic's tickets) can't use the (ticket_id, mechanic_id) PK
+    mechanic_id = db.Column(db.Integer, db.ForeignKey('mechanic.id'), primary_key=True, index=True)
+    updated_at = updated_at_column()
     ticket = db.relationship("ServiceTicket", back_populates="mechanics")
     mechanic = db.relationship("Mechanic", back_populates="tickets")
 
@@ -44,7 +83,8 @@ class ServiceMechanic(db.Model):
 class ServicePart(db.Model):
     __tablename__ = 'service_part'
     service_ticket_id = db.Column(db.Integer, db.ForeignKey('service_ticket.id'), primary_key=True)
-    inventory_id = db.Column(db.Integer, db.ForeignKey('inventory.id'), primary_key=True)
+    inventory_id = db.Column(db.Integer, db.ForeignKey('inventory.id'), primary_key=True, index=True)
+    updated_at = updated_at_column()
 
 # --- Inventory Model ---
 class Inventory(db.Model):
@@ -52,8 +92,25 @@ class Inventory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     price = db.Column(db.Float, nullable=False)
+    updated_at = updated_at_column()
     tickets = db.relationship(
         'ServiceTicket',
         secondary='service_part',
         back_populates='parts'
-    )
\ No newline at end of file
+    )
+
+# --- TableVersion ---
+# One row per table, bumped in the same transaction as any write to that table
+# (see app/utils/conditional.py). Lets list endpoints build ETags from a
+# primary-key lookup instead of scanning the rows they describe.
+class TableVersion(db.Model):
+    __tablename__ = 'table_version'
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = updated_at_column()
+
+
+@event.listens_for(TableVersion.__table__, "after_create")
+def _seed_table_versions(target, connection, **kw):
+    names = [table.name for table in db.metadata.sorted_tables if table is not target]
+    connection.execute(insert(target), [{"name": name, "version": 0, "updated_at": utcnow()} for name in names])
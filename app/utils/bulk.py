@@ -0,0 +1,92 @@
+import csv
+import io
+from itertools import islice
+from flask import current_app, request
+from marshmallow import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class BulkError(ValueError):
+    """Raised when the request body as a whole can't be read as rows."""
+
+
+def read_records():
+    """
+    Rows from the request body: a JSON array of objects, or CSV with a header
+    row when sent as text/csv. CSV is read from the stream a line at a time,
+    so a large upload is never held in memory as a whole.
+    """
+    if request.mimetype == 'text/csv':
+        return csv.DictReader(io.TextIOWrapper(request.stream, encoding='utf-8', newline=''))
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise BulkError("Body must be a JSON array of objects or text/csv")
+    return iter(data)
+
+
+def _duplicates(session, model, column, rows, seen):
+    """Indexes of rows whose value for a unique column is taken, in the table or earlier in the upload."""
+    values = {row[column] for row in rows.values()}
+    attribute = getattr(model, column)
+    taken = set(session.execute(select(attribute).where(attribute.in_(values))).scalars()) | seen
+    duplicates = []
+    for index, row in rows.items():
+        if row[column] in taken:
+            duplicates.append(index)
+        taken.add(row[column])
+    seen.update(row[column] for row in rows.values())
+    return duplicates
+
+
+def bulk_import(session, model, schema, records, unique=()):
+    """
+    Validate and insert records BULK_CHUNK_SIZE at a time: one schema.load()
+    and one executemany INSERT per chunk, each chunk committed on its own so
+    a bad row never rolls back the others. Values of the `unique` columns
+    are checked against the table and the rest of the upload first.
+
+    Returns {"received", "inserted", "errors"}, errors being
+    [{"index": n, "errors": {...}}] with n counting data rows from 0.
+    """
+    chunk_size = current_app.config.get('BULK_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    received = inserted = 0
+    errors = []
+    seen = {column: set() for column in unique}
+
+    while True:
+        try:
+            chunk = list(islice(records, chunk_size))
+        except (csv.Error, UnicodeDecodeError) as e:
+            errors.append({"index": received, "errors": {"_schema": [f"Unreadable CSV: {e}"]}})
+            break
+        if not chunk:
+            break
+        start, received = received, received + len(chunk)
+
+        try:
+            loaded = schema.load(chunk, many=True)
+            invalid = {}
+        except ValidationError as e:
+            loaded, invalid = e.valid_data, e.messages
+        rows = {start + i: row for i, row in enumerate(loaded) if i not in invalid}
+        for column in unique:
+            for index in _duplicates(session, model, column, rows, seen[column]):
+                invalid.setdefault(index - start, {})[column] = [f"{column.capitalize()} already exists"]
+                del rows[index]
+
+        if rows:
+            try:
+                session.execute(insert(model), list(rows.values()))
+                session.commit()
+                inserted += len(rows)
+            except IntegrityError as e:
+                # A concurrent write took a unique value after the check above
+                session.rollback()
+                for index in rows:
+                    invalid[index - start] = {"_schema": [f"Rejected by the database: {e.orig}"]}
+        errors.extend({"index": start + i, "errors": messages} for i, messages in sorted(invalid.items()))
+
+    return {"received": received, "inserted": inserted, "errors": errors}
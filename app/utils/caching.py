@@ -0,0 +1,119 @@
+import os
+import secrets
+import threading
+from collections import defaultdict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request, current_app
+from app.extensions import cache
+from app.utils.compression import compress, negotiate
+from app.utils.metrics import record_cache
+
+DEFAULT_TIMEOUT = 60
+TAG_VERSION_PREFIX = "tag-version:"
+# WSGI environ key that makes cached_list views skip the cache entirely
+CACHE_BYPASS = "app.cache_bypass"
+
+# Hit/miss counts for this worker process only, keyed by endpoint
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+_stats_lock = threading.Lock()
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[request.endpoint][outcome] += 1
+    record_cache("hit" if outcome == "hits" else "miss")
+
+
+def cache_stats():
+    """Snapshot of this worker's cache hit/miss counters."""
+    with _stats_lock:
+        endpoints = {endpoint: dict(counts) for endpoint, counts in _stats.items()}
+    hits = sum(c["hits"] for c in endpoints.values())
+    misses = sum(c["misses"] for c in endpoints.values())
+    return {
+        "pid": os.getpid(),
+        "backend": current_app.config.get("CACHE_TYPE"),
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        "endpoints": endpoints,
+    }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _tag_key(tag):
+    return f"{TAG_VERSION_PREFIX}{tag}"
+
+
+def _new_version():
+    # Random rather than a counter: a plain set needs no atomic increment,
+    # which FileSystemCache doesn't have, and never repeats an older version
+    return secrets.token_hex(8)
+
+
+def _tag_versions(tags):
+    """Current version of each tag, seeding any that is missing (never written, or evicted)."""
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(*keys)
+    for i, version in enumerate(versions):
+        if version is None:
+            cache.add(keys[i], _new_version(), timeout=0)
+            versions[i] = cache.get(keys[i])
+    return versions
+
+
+def invalidate(*tags):
+    """
+    Give every tag a new version so entries cached under the old one are never
+    read again. Concurrent invalidations each write a new version, so neither
+    can be lost the way a read-modify-write increment can.
+    """
+    cache.set_many({_tag_key(tag): _new_version() for tag in tags}, timeout=0)
+
+
+def make_cache_key(tags):
+    # Sorting makes ?page=2&per_page=5 and ?per_page=5&page=2 share one entry
+    args = sorted((k, v) for k, v in request.args.items(multi=True) if v != "")
+    versions = ".".join(str(v) for v in _tag_versions(tags))
+    # One entry per content encoding, each holding the bytes that go on the wire
+    return f"view:{request.path}?{urlencode(args)}@{versions}:{negotiate() or 'identity'}"
+
+
+def cached_list(*tags, timeout=DEFAULT_TIMEOUT):
+    """
+    Cache a GET view's successful responses, keyed on the path, the normalized
+    query string, the negotiated content encoding and the current version of
+    each resource tag. Bodies are stored compressed so hits skip compression.
+    Write routes call invalidate() with the same tags so the next read misses.
+    A single function in place of the tags returns them for the current request,
+    for responses whose query string decides which resources they embed.
+    Requests whose environ sets CACHE_BYPASS always run the view.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if request.environ.get(CACHE_BYPASS):
+                return compress(current_app.make_response(f(*args, **kwargs)))
+            key = make_cache_key(tags[0]() if len(tags) == 1 and callable(tags[0]) else tags)
+            hit = cache.get(key)
+            if hit is not None:
+                _record("hits")
+                body, status, headers = hit
+                response = current_app.response_class(body, status=status, headers=headers)
+                # Entries carry the ETag they were built with, so a revalidation
+                # can be answered with a 304 straight from the cache
+                return response.make_conditional(request)
+
+            _record("misses")
+            response = compress(current_app.make_response(f(*args, **kwargs)))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(key, (response.get_data(), response.status_code, list(response.headers)),
+                          timeout=timeout)
+            return response
+        return decorated
+    return decorator
@@ -0,0 +1,81 @@
+import gzip
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional, responses are gzipped only without it
+    brotli = None
+
+# In order of preference when the client accepts several equally
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json", "application/yaml", "text/csv", "text/html", "text/plain",
+})
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVELS = {"gzip": 6, "br": 4}
+
+
+def available_encodings():
+    return tuple(encoding for encoding in ENCODINGS if encoding != "br" or brotli is not None)
+
+
+def negotiate():
+    """The best encoding the current request accepts, or None for identity."""
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encode(data, encoding, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compression_level(encoding):
+    """gzip level (1-9) or brotli quality (0-11) from COMPRESS_LEVEL / COMPRESS_BROTLI_QUALITY."""
+    key = "COMPRESS_BROTLI_QUALITY" if encoding == "br" else "COMPRESS_LEVEL"
+    return current_app.config.get(key, DEFAULT_LEVELS[encoding])
+
+
+def etag_variants(etag):
+    """Every ETag a representation built with `etag` may carry after compress()."""
+    return [etag] + [f"{etag}-{encoding}" for encoding in ENCODINGS]
+
+
+def compress(response):
+    """
+    Compress a response body for the client's Accept-Encoding when it is at
+    least COMPRESS_MIN_SIZE bytes. Already-encoded, streamed and file responses
+    are left alone, so calling this twice is harmless.
+    """
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    data = response.get_data()
+    if len(data) < current_app.config.get("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate()
+    if encoding is None:
+        return response
+    response.set_data(encode(data, encoding, compression_level(encoding)))
+    response.headers["Content-Encoding"] = encoding
+    # Each encoding is a different representation and needs its own strong ETag
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+
+def init_compression(app):
+    """
+    Compress responses on the way out. Call after init_metrics so the size
+    histogram records the bytes actually sent.
+    """
+    app.after_request(compress)
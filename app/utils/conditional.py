@@ -0,0 +1,140 @@
+import hashlib
+from functools import wraps
+from itertools import chain
+from urllib.parse import urlencode
+from flask import request, current_app
+from sqlalchemy import event, inspect, select, update
+from werkzeug.http import is_resource_modified
+from app.models import db, TableVersion, utcnow
+from app.utils.compression import etag_variants
+
+WRITTEN_TABLES = "written_tables"
+
+
+# --- Table versions ---
+# Every table a transaction writes to gets its table_version row bumped just
+# before COMMIT, so list ETags change on inserts, updates and deletes alike.
+# ORM flushes and Core DML run through the session are both tracked.
+#
+# The bump row-locks each written table's counter until COMMIT, so concurrent
+# writers to one table queue there for about one commit; on SQLite, which has
+# a single writer anyway, it is one more statement in the write transaction.
+# It is the last statement, in sorted name order, so it cannot deadlock. A
+# bump after commit would still take the same lock, and a crash in between
+# would leave the old ETag on new data.
+
+def _written(session):
+    return session.info.setdefault(WRITTEN_TABLES, set())
+
+
+@event.listens_for(db.session, "after_flush")
+def _track_flush(session, flush_context):
+    written = _written(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        mapper = inspect(obj).mapper
+        written.update(table.name for table in mapper.tables)
+        # Collection changes and cascaded deletes write the association table
+        written.update(rel.secondary.name for rel in mapper.relationships if rel.secondary is not None)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _track_dml(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        table = state.statement.table
+        if table.name != TableVersion.__tablename__:
+            _written(state.session).add(table.name)
+
+
+@event.listens_for(db.session, "before_commit")
+def _bump_versions(session):
+    session.flush()
+    written = session.info.pop(WRITTEN_TABLES, None)
+    if written:
+        session.execute(
+            update(TableVersion)
+            .where(TableVersion.name.in_(sorted(written)))
+            .values(version=TableVersion.version + 1, updated_at=utcnow())
+        )
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _forget_writes(session, previous_transaction):
+    session.info.pop(WRITTEN_TABLES, None)
+
+
+# --- Validators ---
+
+def _etag(*parts):
+    return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _representation():
+    # Same normalization as the response cache: order and empty values don't matter
+    args = sorted((k, v) for k, v in request.args.items(multi=True) if v != "")
+    return f"{request.path}?{urlencode(args)}"
+
+
+def table_validators(tables):
+    """ETag and Last-Modified for the current URL, from one primary-key lookup."""
+    rows = db.session.execute(
+        select(TableVersion.name, TableVersion.version, TableVersion.updated_at)
+        .where(TableVersion.name.in_(tables))
+    ).all()
+    etag = _etag(_representation(), *sorted(f"{name}:{version}" for name, version, _ in rows))
+    return etag, max((updated_at for _, _, updated_at in rows), default=None)
+
+
+def row_validators(obj):
+    """ETag and Last-Modified for a single row, from its updated_at."""
+    state = inspect(obj)
+    return _etag(_representation(), state.mapper.local_table.name, *state.identity,
+                 obj.updated_at.isoformat()), obj.updated_at
+
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Clients may keep a copy but must revalidate it; a 304 is cheap
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag, last_modified):
+    """A 304 response if the client's copy is current, otherwise None."""
+    # The client may hold a compressed copy, whose ETag has the encoding appended
+    for variant in etag_variants(etag):
+        if not is_resource_modified(request.environ, etag=variant, last_modified=last_modified):
+            return set_validators(current_app.response_class(status=304), variant, last_modified)
+    return None
+
+
+def row_response(obj, render):
+    """Respond with a single row, or a 304 before render() runs if the client's copy is current."""
+    etag, last_modified = row_validators(obj)
+    response = not_modified(etag, last_modified)
+    if response is None:
+        response = set_validators(current_app.make_response(render()), etag, last_modified)
+    return response
+
+
+def conditional(tables):
+    """
+    Answer If-None-Match / If-Modified-Since from the table versions before the
+    view runs, so an unchanged list costs one small query and no row loading.
+    `tables` is a tuple of table names or a function returning one.
+    Goes under @cached_list so the validators are cached with the response.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            etag, last_modified = table_validators(tables() if callable(tables) else tables)
+            response = not_modified(etag, last_modified)
+            if response is not None:
+                return response
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                set_validators(response, etag, last_modified)
+            return response
+        return decorated
+    return decorator
@@ -0,0 +1,124 @@
+import bisect
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+CHECKOUT_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+
+class PoolMetrics:
+    """Per-process counters and checkout latency histogram for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.buckets = [0] * len(CHECKOUT_BUCKETS_MS)
+            self.checkout_total_ms = 0.0
+            self.counters = {"checkouts": 0, "checkins": 0, "connects": 0, "invalidations": 0}
+
+    def observe_checkout(self, elapsed_ms):
+        index = bisect.bisect_left(CHECKOUT_BUCKETS_MS, elapsed_ms)
+        with self._lock:
+            self.buckets[index] += 1
+            self.checkout_total_ms += elapsed_ms
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _quantile(self, buckets, q):
+        total = sum(buckets)
+        if not total:
+            return None
+        running = 0
+        for bound, count in zip(CHECKOUT_BUCKETS_MS, buckets):
+            running += count
+            if running >= q * total:
+                return bound if bound != float('inf') else CHECKOUT_BUCKETS_MS[-2]
+
+    def snapshot(self):
+        with self._lock:
+            buckets = list(self.buckets)
+            total_ms = self.checkout_total_ms
+            counters = dict(self.counters)
+        observed = sum(buckets)
+        return {
+            **counters,
+            "checkout_ms": {
+                "count": observed,
+                "mean": round(total_ms / observed, 3) if observed else None,
+                "p50": self._quantile(buckets, 0.50),
+                "p95": self._quantile(buckets, 0.95),
+                "p99": self._quantile(buckets, 0.99),
+                "buckets": {("+Inf" if b == float('inf') else str(b)): c
+                            for b, c in zip(CHECKOUT_BUCKETS_MS, buckets)},
+            },
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout, including any wait for a free connection."""
+
+    # Log under sqlalchemy.pool like the stock pools; by default the logger
+    # would be named after this module and inherit the debug-mode app logger
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.InstrumentedQueuePool"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_metrics.observe_checkout((time.perf_counter() - start) * 1000)
+
+
+def use_instrumented_pool(app):
+    """Before db.init_app: swap in the timed pool where a QueuePool would be used."""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if not uri or not app.config.get('DB_POOL_METRICS'):
+        return
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return  # in-memory SQLite needs its single static connection
+    # Copy so the config class's dict is never mutated
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def _sqlite_wal(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers in other workers proceed while one worker writes
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def configure_engine(app, engine):
+    """After db.init_app: pool event counters and per-backend connection setup."""
+    if app.config.get('DB_POOL_METRICS'):
+        event.listen(engine, 'connect', lambda *args: pool_metrics.count("connects"))
+        event.listen(engine, 'checkout', lambda *args: pool_metrics.count("checkouts"))
+        event.listen(engine, 'checkin', lambda *args: pool_metrics.count("checkins"))
+        event.listen(engine, 'invalidate', lambda *args: pool_metrics.count("invalidations"))
+    if app.config.get('SQLITE_WAL') and engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _sqlite_wal)
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {"pid": os.getpid(), "pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(size=pool.size(), checked_in=pool.checkedin(),
+                     checked_out=pool.checkedout(), overflow=pool.overflow())
+    stats.update(pool_metrics.snapshot())
+    return stats
@@ -0,0 +1,60 @@
+from sqlalchemy import insert, delete
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+
+class MissingParent(LookupError):
+    """Raised when a junction row points at a ticket, mechanic or part that doesn't exist."""
+
+
+def insert_ignore(session, model, rows, returning=None):
+    """
+    Insert junction rows in one multi-row INSERT, silently skipping any that
+    already exist (ON CONFLICT DO NOTHING on SQLite/Postgres, ON DUPLICATE KEY
+    UPDATE on MySQL). Only duplicates are ignored; foreign key violations
+    still raise IntegrityError. Returns the database's rowcount.
+
+    With a `returning` column, returns that column of each row actually
+    inserted instead, or None where the database can't say which (MySQL has
+    no RETURNING, and its driver counts a skipped duplicate as affected).
+    """
+    if not rows:
+        return 0 if returning is None else []
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        stmt = sqlite.insert(model).on_conflict_do_nothing()
+    elif dialect == 'postgresql':
+        stmt = postgresql.insert(model).on_conflict_do_nothing()
+    elif dialect in ('mysql', 'mariadb'):
+        # INSERT IGNORE would also swallow FK errors, so no-op the duplicate instead
+        pk = model.__table__.primary_key.columns[0]
+        stmt = mysql.insert(model).on_duplicate_key_update({pk.name: pk})
+    else:
+        stmt = insert(model)
+    if returning is None:
+        return session.execute(stmt.values(rows)).rowcount
+    if dialect not in ('sqlite', 'postgresql'):
+        session.execute(stmt.values(rows))
+        return None
+    return session.execute(stmt.values(rows).returning(returning)).scalars().all()
+
+
+def link(session, model, returning=None, **keys):
+    """
+    Idempotently create one junction row in a single statement, without
+    reading either parent first. Relies on the foreign keys to reject missing
+    parents, rolling back and raising MissingParent when they do. Returns
+    what insert_ignore() does.
+    """
+    try:
+        return insert_ignore(session, model, [keys], returning=returning)
+    except IntegrityError:
+        session.rollback()
+        raise MissingParent(keys)
+
+
+def unlink(session, model, **keys):
+    """Delete one junction row in a single statement. Returns False if it didn't exist."""
+    table = model.__table__
+    stmt = delete(table).where(*(table.c[name] == value for name, value in keys.items()))
+    return session.execute(stmt).rowcount > 0
@@ -0,0 +1,72 @@
+import os
+import time
+from flask import g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter,
+                               Histogram, generate_latest, multiprocess)
+from app.utils.util import internal_only
+
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set before the app is imported
+# (see gunicorn.conf.py); every worker then writes its samples to mmap'd files
+# there and /metrics sums them, whichever worker serves the scrape.
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+REQUESTS = Counter('http_requests_total', 'Requests handled',
+                   ['endpoint', 'method', 'status'])
+LATENCY = Histogram('http_request_duration_seconds', 'Time to build the response',
+                    ['endpoint', 'method'], buckets=LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Response body size',
+                          ['endpoint'], buckets=SIZE_BUCKETS)
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cached view lookups',
+                         ['endpoint', 'result'])
+RATE_LIMITED = Counter('rate_limit_rejections_total', 'Requests rejected by the rate limiter',
+                       ['endpoint'])
+
+
+def _endpoint():
+    # Unmatched URLs share one label so scanners can't create unbounded series
+    return request.endpoint or 'unmatched'
+
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _observe(response):
+    start = g.pop('metrics_start', None)
+    endpoint = _endpoint()
+    REQUESTS.labels(endpoint, request.method, response.status_code).inc()
+    if start is not None:
+        LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - start)
+    if response.content_length is not None:
+        RESPONSE_SIZE.labels(endpoint).observe(response.content_length)
+    if response.status_code == 429:
+        RATE_LIMITED.labels(endpoint).inc()
+    return response
+
+
+def record_cache(outcome):
+    """Count a cache 'hit' or 'miss' for the current endpoint."""
+    CACHE_REQUESTS.labels(_endpoint(), outcome).inc()
+
+
+@internal_only
+def metrics_view():
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+
+def init_metrics(app):
+    """
+    Time every request and serve the totals at /metrics. Call before the
+    limiter is initialised so rejected requests are timed too.
+    """
+    app.before_request(_start_timer)
+    app.after_request(_observe)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
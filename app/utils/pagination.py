@@ -0,0 +1,119 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def _cursor_prefix(sort_column, descending):
+    return ('-' if descending else '') + (sort_column.key if sort_column is not None else 'id')
+
+
+def encode_cursor(last_id, sort_column=None, sort_value=None, descending=False):
+    """
+    Turn the last row of a page into an opaque cursor string: its primary key,
+    plus its sort value when the page is ordered by another column.
+    """
+    prefix = _cursor_prefix(sort_column, descending)
+    if sort_column is None:
+        raw = f"{prefix}:{last_id}"
+    else:
+        if isinstance(sort_value, datetime):
+            sort_value = sort_value.isoformat()
+        raw = f"{prefix}:{json.dumps([sort_value, last_id])}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort_column=None, descending=False):
+    """
+    Reverse encode_cursor, raising PaginationError for anything malformed or
+    made for a different ordering. Returns the id, or (sort value, id).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded).decode().partition(":")
+        if prefix != _cursor_prefix(sort_column, descending):
+            raise ValueError(cursor)
+        if sort_column is None:
+            return int(value)
+        sort_value, last_id = json.loads(value)
+        python_type = sort_column.type.python_type
+        if python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        elif not isinstance(sort_value, python_type):
+            raise ValueError(cursor)
+        return sort_value, int(last_id)
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise PaginationError("Invalid cursor")
+
+
+def _selects_entity(query):
+    # select(Model) pages ORM objects; select(Model.a, Model.b) pages plain rows
+    descriptions = query.column_descriptions
+    return len(descriptions) == 1 and descriptions[0]['expr'] is descriptions[0]['entity']
+
+
+def _after(key_column, sort_column, descending, position):
+    """WHERE clause for rows after `position` in (sort_column, key_column) order."""
+    if sort_column is None:
+        return key_column < position if descending else key_column > position
+    sort_value, last_id = position
+    # The first comparison alone can use the sort column's index; the rest
+    # settles ties on it by primary key
+    if descending:
+        return and_(sort_column <= sort_value, or_(sort_column < sort_value, key_column < last_id))
+    return and_(sort_column >= sort_value, or_(sort_column > sort_value, key_column > last_id))
+
+
+def paginate(session, query, key_column, sort_column=None, descending=False):
+    """
+    Apply pagination from the current request's query string to a select().
+
+    Supports two modes, both resolved in SQL rather than by slicing in Python:
+      - ?page=&per_page=  LIMIT/OFFSET, fine for the first few pages
+      - ?after=<cursor>   keyset pagination, constant cost at any depth
+
+    Rows are ordered by sort_column when given, then by key_column, which
+    breaks ties so every row has one place in the order; descending reverses
+    both. Returns (items, next_cursor); items are ORM objects or rows
+    depending on the select, and next_cursor is None on the last page.
+    """
+    per_page = request.args.get('per_page', DEFAULT_PER_PAGE, type=int)
+    if per_page < 1:
+        raise PaginationError("per_page must be a positive integer")
+    per_page = min(per_page, MAX_PER_PAGE)
+
+    entity = _selects_entity(query)
+    if sort_column is not None and not entity and not query.selected_columns.contains_column(sort_column):
+        # Needed to build the cursor; serializers ignore columns past their own
+        query = query.add_columns(sort_column)
+    order = (sort_column, key_column) if sort_column is not None else (key_column,)
+    query = query.order_by(*(column.desc() if descending else column for column in order))
+    after = request.args.get('after')
+    if after:
+        query = query.where(_after(key_column, sort_column, descending,
+                                   decode_cursor(after, sort_column, descending)))
+    else:
+        page = request.args.get('page', 1, type=int)
+        if page < 1:
+            raise PaginationError("page must be a positive integer")
+        query = query.offset((page - 1) * per_page)
+
+    # Fetch one extra row to learn whether another page exists
+    result = session.execute(query.limit(per_page + 1))
+    items = result.unique().scalars().all() if entity else result.all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        sort_value = getattr(last, sort_column.key) if sort_column is not None else None
+        next_cursor = encode_cursor(getattr(last, key_column.key), sort_column, sort_value, descending)
+    return items, next_cursor
@@ -0,0 +1,136 @@
+import json
+import re
+from datetime import datetime
+from sqlalchemy import event, text
+from app.extensions import db
+from app.models import ServiceTicket
+from app.utils.caching import CACHE_BYPASS
+from app.utils.pagination import encode_cursor
+from app.utils.util import encode_token
+
+# Read-only requests that exercise each hot query, with the tables each one is
+# allowed to scan in full. Unbounded listings scan their own table by design;
+# everything else must be answered from an index.
+PROBES = (
+    ('/customers/?per_page=10', {'customer'}),
+    (f'/customers/?after={encode_cursor(1)}', set()),
+    ('/customers/1', set()),
+    ('/customers/my-tickets', set()),
+    ('/mechanics/1', set()),
+    ('/mechanics/most-active?limit=10', set()),
+    ('/inventory/1', set()),
+    ('/service_tickets/1', set()),
+    ('/service_tickets/?per_page=10', {'service_ticket'}),
+    ('/service_tickets/?customer_id=1&sort=-service_date', set()),
+    ('/service_tickets/?vin=1HGCM82633A004352', set()),
+    ('/service_tickets/?from=2024-01-01&to=2024-01-31&sort=service_date', set()),
+    (f'/service_tickets/?sort=-service_date&after={encode_cursor(1, ServiceTicket.service_date, datetime(2024, 1, 31), True)}', set()),
+    ('/service_tickets/?mechanic_id=1', set()),
+    ('/service_tickets/?part_id=1&sort=-service_date', set()),
+    # Without FTS5 or tsvector the in-process index reads each table in full
+    # when it rebuilds; with them, only the full-text index is searched
+    ('/search?q=brake', {'customer', 'service_ticket', 'inventory'}),
+    ('/service_tickets/export?from=2024-01-01&to=2024-01-31', set()),
+)
+
+# Statements issued by write paths, checked directly so the probe never writes
+STATEMENTS = (
+    ("refresh_ticket_counts", "SELECT count(*) FROM service_mechanic WHERE service_mechanic.mechanic_id = :id", {"id": 1}),
+    ("delete inventory FK check", "SELECT 1 FROM service_part WHERE service_part.inventory_id = :id", {"id": 1}),
+)
+
+EXPLAIN_DIALECTS = ('sqlite', 'postgresql', 'mysql', 'mariadb')
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+class UnsupportedDialect(ValueError):
+    """The database has no EXPLAIN support here."""
+
+
+def full_scans(connection, statement, params):
+    """Tables the database would read in full to run the statement."""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params).all()
+        return {m.group(1) for m in (_SQLITE_SCAN.match(row[-1]) for row in rows) if m}
+    if dialect == 'postgresql':
+        # Tiny or empty tables make a seq scan the cheapest plan even when an
+        # index exists; disabling it shows whether an index *could* be used
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", params).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        scans, nodes = set(), [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            if node.get('Node Type') == 'Seq Scan':
+                scans.add(node['Relation Name'])
+            nodes.extend(node.get('Plans', ()))
+        return scans
+    if dialect in ('mysql', 'mariadb'):
+        result = connection.exec_driver_sql(f"EXPLAIN {statement}", params)
+        return {row['table'] for row in result.mappings() if row['type'] == 'ALL'}
+    raise UnsupportedDialect(f"No EXPLAIN support for {dialect}")
+
+
+def explain_plan(connection, statement, params):
+    """The database's plan for a statement as plain text lines, for logging."""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params).all()
+        return [row[-1] for row in rows]
+    if dialect == 'postgresql':
+        return list(connection.exec_driver_sql(f"EXPLAIN {statement}", params).scalars())
+    if dialect in ('mysql', 'mariadb'):
+        result = connection.exec_driver_sql(f"EXPLAIN {statement}", params)
+        return [", ".join(f"{k}={v}" for k, v in row.items() if v is not None) for row in result.mappings()]
+    raise UnsupportedDialect(f"No EXPLAIN support for {dialect}")
+
+
+def _capture(app, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        headers = {'Authorization': "Bearer " + encode_token(1)}
+        # Skip the response cache so a warm entry can't hide the queries, and
+        # read the body so streamed responses run theirs
+        response = app.test_client().get(url, headers=headers, environ_overrides={CACHE_BYPASS: True})
+        response.get_data()
+        response.close()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+def check_query_plans(app):
+    """
+    EXPLAIN every SELECT the probes issue and return a list of
+    (probe, table, statement) for each unexpected full table scan, plus
+    (probe, None, None) for each probe that issued no SELECT at all.
+    """
+    dialect = db.engine.dialect.name
+    if dialect not in EXPLAIN_DIALECTS:
+        raise UnsupportedDialect(f"No EXPLAIN support for {dialect}")
+    failures = []
+    checks = []
+    for url, allowed in PROBES:
+        statements = _capture(app, url)
+        if not statements:
+            failures.append((url, None, None))
+        for statement, params in statements:
+            checks.append((url, allowed, statement, params))
+    for name, statement, params in STATEMENTS:
+        compiled = text(statement).compile(dialect=db.engine.dialect)
+        positional = tuple(params[key] for key in compiled.positiontup) if compiled.positional else params
+        checks.append((name, set(), str(compiled), positional))
+
+    for probe, allowed, statement, params in checks:
+        with db.engine.connect() as connection:
+            with connection.begin():
+                for table in sorted(full_scans(connection, statement, params) - allowed):
+                    failures.append((probe, table, statement))
+    return failures
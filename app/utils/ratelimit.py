@@ -0,0 +1,128 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from limits.storage import Storage
+
+# One slot per rate-limit key: 8-byte key hash, 8-byte counter, 8-byte expiry timestamp
+SLOT = struct.Struct('<Qqd')
+DEFAULT_SLOTS = 8192
+MAX_PROBE = 16
+
+
+class MmapStorage(Storage):
+    """
+    Fixed-window rate-limit counters in a memory-mapped file.
+
+    Every gunicorn worker on the host maps the same file, so a limit like
+    "6 per hour" is enforced once per host instead of once per worker. Keys are
+    hashed into a fixed-size open-addressing table; writes are serialised with
+    flock on the file. Point it at tmpfs (``mmap:///dev/shm/<name>``) so the
+    counters never touch disk.
+    """
+
+    STORAGE_SCHEME = ["mmap"]
+
+    def __init__(self, uri=None, wrap_exceptions=False, slots=DEFAULT_SLOTS, **options):
+        self.path = urlparse(uri).path if uri else '/dev/shm/mechanic-shop-ratelimit'
+        self.slots = int(slots)
+        self._pid = None
+        self._local_lock = threading.Lock()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return OSError
+
+    def _open(self):
+        # A flock held through a descriptor inherited across fork() does not
+        # exclude the sibling workers, so each process opens its own
+        if self._pid == os.getpid():
+            return
+        size = self.slots * SLOT.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._fd = fd
+        self._map = mmap.mmap(fd, size)
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self):
+        with self._local_lock:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _hash(key):
+        # 0 marks an empty slot, so never hand it out as a key hash
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+
+    def _find(self, key_hash, now):
+        """Return (offset, count, expiry) for the key's slot, claiming a free one if absent."""
+        start = key_hash % self.slots
+        free = None
+        oldest = None
+        for probe in range(MAX_PROBE):
+            offset = ((start + probe) % self.slots) * SLOT.size
+            slot_hash, count, expiry = SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash:
+                if expiry <= now:
+                    return offset, 0, 0.0
+                return offset, count, expiry
+            if free is None and (slot_hash == 0 or expiry <= now):
+                free = offset
+            if oldest is None or expiry < oldest[1]:
+                oldest = (offset, expiry)
+        # Table window is full of live keys: evict the one closest to expiring
+        return (free if free is not None else oldest[0]), 0, 0.0
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        key_hash = self._hash(key)
+        with self._locked():
+            offset, count, expires_at = self._find(key_hash, now)
+            if not count:
+                expires_at = now + expiry
+            count += amount
+            SLOT.pack_into(self._map, offset, key_hash, count, expires_at)
+        return count
+
+    def get(self, key):
+        with self._locked():
+            _, count, _ = self._find(self._hash(key), time.time())
+        return count
+
+    def get_expiry(self, key):
+        now = time.time()
+        with self._locked():
+            _, _, expires_at = self._find(self._hash(key), now)
+        return expires_at or now
+
+    def check(self):
+        try:
+            with self._locked():
+                return True
+        except OSError:
+            return False
+
+    def reset(self):
+        with self._locked():
+            self._map[:] = bytes(len(self._map))
+        return None
+
+    def clear(self, key):
+        key_hash = self._hash(key)
+        with self._locked():
+            offset, count, _ = self._find(key_hash, time.time())
+            if count:
+                SLOT.pack_into(self._map, offset, 0, 0, 0.0)
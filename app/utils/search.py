@@ -0,0 +1,210 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from math import log
+from flask import current_app
+from sqlalchemy import event, select, text
+from app.models import Customer, ServiceTicket, Inventory, TableVersion
+
+# Indexed text per result type; the type is also the URL prefix of the record
+SOURCES = {
+    'customers': (Customer.__table__, ('name', 'email', 'phone')),
+    'service_tickets': (ServiceTicket.__table__, ('service_desc',)),
+    'inventory': (Inventory.__table__, ('name',)),
+}
+MAX_TERMS = 10
+# Letters and digits make words, anything else separates them, so emails and
+# phone numbers are searchable by their parts. Matches SQLite's unicode61
+# tokenizer and the regexp_replace() in the Postgres document below.
+_WORD = re.compile(r'[^\W_]+')
+
+
+def tokenize(value):
+    return _WORD.findall(value.lower())
+
+
+def parse_query(value):
+    """Words of ?q=, each matched as a prefix; ValueError when there are none or too many."""
+    terms = list(dict.fromkeys(tokenize(value or '')))
+    if not terms:
+        raise ValueError("q must contain at least one letter or digit")
+    if len(terms) > MAX_TERMS:
+        raise ValueError(f"q may contain at most {MAX_TERMS} words")
+    return terms
+
+
+# --- Index DDL ---
+# SQLite: an external-content FTS5 table per source, kept current by triggers
+# on the source table, so ORM writes, bulk Core inserts and deletes are all
+# indexed in the same transaction. Postgres: a generated tsvector column with
+# a GIN index. Created with the tables here and by migration 0005.
+
+def _fts5_available(connection):
+    return bool(connection.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def fts5_ddl(table, columns):
+    fts, names = f"{table}_fts", ", ".join(columns)
+    new, old = (", ".join(f"{row}.{column}" for column in columns) for row in ('new', 'old'))
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 0', prefix='2 3')",
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def tsvector_ddl(table, columns):
+    document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    return [
+        f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+        f"(to_tsvector('simple', regexp_replace(lower({document}), '[^[:alnum:]]+', ' ', 'g'))) STORED",
+        f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)",
+    ]
+
+
+def _create_index(target, connection, **kw):
+    columns = next(columns for table, columns in SOURCES.values() if table is target)
+    if connection.dialect.name == 'sqlite' and _fts5_available(connection):
+        statements = fts5_ddl(target.name, columns)
+    elif connection.dialect.name == 'postgresql':
+        statements = tsvector_ddl(target.name, columns)
+    else:
+        return
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def _drop_index(target, connection, **kw):
+    # The triggers and the Postgres column go with the table itself
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {target.name}_fts")
+
+
+for _table, _ in SOURCES.values():
+    event.listen(_table, 'after_create', _create_index)
+    event.listen(_table, 'before_drop', _drop_index)
+
+
+# --- Backends ---
+# Each returns [(type, id, rank)], best first, rows matching every term as a
+# prefix. Ranks are BM25-style scores, higher is better.
+
+def _search_fts5(session, terms, types, limit):
+    match = " ".join(f'"{term}"*' for term in terms)
+    selects = [f"SELECT '{kind}' AS type, rowid AS id, -bm25({table.name}_fts) AS rank "
+               f"FROM {table.name}_fts WHERE {table.name}_fts MATCH :match"
+               for kind, (table, _) in SOURCES.items() if kind in types]
+    query = text(" UNION ALL ".join(selects) + " ORDER BY rank DESC, type, id LIMIT :limit")
+    return session.execute(query, {"match": match, "limit": limit}).all()
+
+
+def _search_tsvector(session, terms, types, limit):
+    selects = [f"SELECT '{kind}' AS type, id, ts_rank(search_vector, query) AS rank "
+               f"FROM {table.name}, to_tsquery('simple', :query) query WHERE search_vector @@ query"
+               for kind, (table, _) in SOURCES.items() if kind in types]
+    query = text(" UNION ALL ".join(selects) + " ORDER BY rank DESC, type, id LIMIT :limit")
+    return session.execute(query, {"query": " & ".join(f"{term}:*" for term in terms), "limit": limit}).all()
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index over one source, for databases without a
+    full-text index of their own. Terms are kept sorted so a prefix is a
+    bisect plus a short walk; rows are scored with BM25.
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, rows):
+        self.postings = defaultdict(dict)  # term -> {id: occurrences}
+        self.lengths = {}
+        for row_id, *values in rows:
+            words = tokenize(" ".join(value for value in values if value))
+            self.lengths[row_id] = len(words)
+            for word in words:
+                self.postings[word][row_id] = self.postings[word].get(row_id, 0) + 1
+        self.terms = sorted(self.postings)
+        self.average_length = sum(self.lengths.values()) / len(self.lengths) if self.lengths else 1
+
+    def _expand(self, prefix):
+        index = bisect_left(self.terms, prefix)
+        while index < len(self.terms) and self.terms[index].startswith(prefix):
+            yield self.terms[index]
+            index += 1
+
+    def search(self, terms):
+        """{id: score} for rows with a word starting with each of `terms`."""
+        total = len(self.lengths)
+        scores = None
+        for prefix in terms:
+            matched = {}
+            for term in self._expand(prefix):
+                rows = self.postings[term]
+                idf = log(1 + (total - len(rows) + 0.5) / (len(rows) + 0.5))
+                for row_id, count in rows.items():
+                    length = self.lengths[row_id] / self.average_length
+                    score = idf * count * (self.K1 + 1) / (count + self.K1 * (1 - self.B + self.B * length))
+                    matched[row_id] = matched.get(row_id, 0) + score
+            scores = matched if scores is None else {i: scores[i] + s for i, s in matched.items() if i in scores}
+            if not scores:
+                break
+        return scores or {}
+
+
+def _python_indexes(session, types):
+    """
+    This worker's InvertedIndex per type, rebuilt from the table whenever its
+    table_version has moved since the last build. The versions cost one
+    primary-key query per search.
+    """
+    indexes = current_app.extensions.setdefault('search_indexes', {})
+    tables = {SOURCES[kind][0].name: kind for kind in types}
+    versions = dict(session.execute(
+        select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(sorted(tables)))).all())
+    current = {}
+    for name, kind in tables.items():
+        built = indexes.get(kind)
+        if built is None or built[0] != versions.get(name):
+            table, columns = SOURCES[kind]
+            rows = session.execute(select(table.c.id, *(table.c[column] for column in columns)))
+            built = indexes[kind] = (versions.get(name), InvertedIndex(rows))
+        current[kind] = built[1]
+    return current
+
+
+def _search_python(session, terms, types, limit):
+    hits = [(kind, row_id, rank)
+            for kind, index in _python_indexes(session, types).items()
+            for row_id, rank in index.search(terms).items()]
+    hits.sort(key=lambda hit: (-hit[2], hit[0], hit[1]))
+    return hits[:limit]
+
+
+_SEARCHES = {'fts5': _search_fts5, 'tsvector': _search_tsvector, 'python': _search_python}
+
+
+def search_backend(session):
+    """SEARCH_BACKEND from config, otherwise the database's own full-text index if it has one."""
+    backend = current_app.config.get('SEARCH_BACKEND') or current_app.extensions.get('search_backend')
+    if backend:
+        return backend
+    connection = session.connection()
+    if connection.dialect.name == 'sqlite' and _fts5_available(connection):
+        backend = 'fts5'
+    elif connection.dialect.name == 'postgresql':
+        backend = 'tsvector'
+    else:
+        backend = 'python'
+    current_app.extensions['search_backend'] = backend
+    return backend
+
+
+def search(session, terms, types, limit):
+    """Up to `limit` (type, id, rank) hits for `terms` across `types`, best first."""
+    return [(kind, row_id, float(rank))
+            for kind, row_id, rank in _SEARCHES[search_backend(session)](session, terms, types, limit)]
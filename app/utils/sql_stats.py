@@ -0,0 +1,98 @@
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from app.utils.query_plans import explain_plan
+
+MAX_LOGGED_PARAMS = 500
+
+
+class SQLStats:
+    """
+    Per-request statement count and database time, plus a slow-query log.
+
+    Listeners are only attached when SQL_STATS or SLOW_QUERY_MS is set, so with
+    both off the engine runs with no extra work per statement.
+    """
+
+    def __init__(self, app, engine):
+        self.headers = bool(app.config.get('SQL_STATS'))
+        self.slow_ms = app.config.get('SLOW_QUERY_MS')
+        self.explain = bool(app.config.get('SLOW_QUERY_EXPLAIN'))
+        self.engine = engine
+        self.logger = app.logger.getChild('slow_query')
+
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+        app.before_request(self._start_request)
+        app.after_request(self._add_headers)
+        app.teardown_request(self._flush_slow)
+
+    # The start time lives on the statement's execution context, which is
+    # dropped with it, so a statement that raises leaves nothing behind
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._query_start) * 1000
+        if conn.info.get('explaining'):
+            return
+        stats = g.get('sql_stats') if has_request_context() else None
+        if stats is not None:
+            stats['count'] += 1
+            stats['ms'] += elapsed_ms
+        if self.slow_ms is not None and elapsed_ms >= self.slow_ms:
+            query = {'ms': elapsed_ms, 'statement': statement,
+                     'parameters': parameters, 'executemany': executemany}
+            if stats is not None:
+                # EXPLAIN on a second connection once the request is done, so the
+                # statement's own cursor and transaction are left alone
+                stats['slow'].append(query)
+            else:
+                self._log(query, endpoint=None)
+
+    def _start_request(self):
+        g.sql_stats = {'count': 0, 'ms': 0.0, 'slow': []}
+
+    def _add_headers(self, response):
+        stats = g.get('sql_stats')
+        # A streamed body runs its queries after the headers are sent, so any
+        # count here would be wrong; leave the headers off rather than report 0
+        if self.headers and stats is not None and not response.is_streamed:
+            response.headers['X-Query-Count'] = str(stats['count'])
+            response.headers.add('Server-Timing', f'db;dur={stats["ms"]:.2f};desc="{stats["count"]} queries"')
+        return response
+
+    def _flush_slow(self, exc=None):
+        stats = g.pop('sql_stats', None)
+        if not stats:
+            return
+        for query in stats['slow']:
+            if self.explain and not query['executemany'] and query['statement'].lstrip().upper().startswith('SELECT'):
+                query['plan'] = self._explain(query['statement'], query['parameters'])
+            self._log(query, endpoint=request.endpoint)
+
+    def _explain(self, statement, parameters):
+        try:
+            with self.engine.connect() as connection:
+                connection.info['explaining'] = True
+                try:
+                    return explain_plan(connection, statement, parameters)
+                finally:
+                    connection.info.pop('explaining')
+        except Exception as e:  # a failed EXPLAIN must never fail the request
+            return [f"EXPLAIN failed: {e}"]
+
+    def _log(self, query, endpoint):
+        parameters = repr(query['parameters'])
+        if len(parameters) > MAX_LOGGED_PARAMS:
+            parameters = parameters[:MAX_LOGGED_PARAMS] + '...'
+        lines = [f"{query['ms']:.1f}ms endpoint={endpoint} {' '.join(query['statement'].split())}",
+                 f"  parameters: {parameters}"]
+        lines.extend(f"  plan: {line}" for line in query.get('plan', ()))
+        self.logger.warning("\n".join(lines))
+
+
+def init_sql_stats(app, engine):
+    """Attach SQL instrumentation to the engine when the config asks for it."""
+    if app.config.get('SQL_STATS') or app.config.get('SLOW_QUERY_MS') is not None:
+        app.extensions['sql_stats'] = SQLStats(app, engine)
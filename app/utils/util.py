@@ -2,7 +2,9 @@ from datetime import datetime, timedelta, timezone
 from jose import jwt
 import jose
 from functools import wraps
-from flask import request, jsonify
+from flask import abort, current_app, request, jsonify
+from flask_limiter.util import get_remote_address
+import hmac
 import os
 
 SECRET_KEY = os.environ.get('SECRET_KEY') or "super secret secrets"
@@ -30,8 +32,46 @@ def token_required(f):
         # Pass customer_id to the wrapped function
         return f(*args, customer_id_from_token=customer_id, **kwargs)
 
+    # Lets rate_limit_key() tell authenticated routes apart
+    decorated.token_required = True
     return decorated
 
+def internal_only(f):
+    """
+    For operational endpoints: a 404 unless INTERNAL_ENDPOINTS is on, and a
+    401 without `Authorization: Bearer <INTERNAL_TOKEN>` when a token is set.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not current_app.config.get('INTERNAL_ENDPOINTS'):
+            abort(404)
+        token = current_app.config.get('INTERNAL_TOKEN')
+        if token:
+            sent = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(sent.encode(), f"Bearer {token}".encode()):
+                return jsonify({'message': 'Invalid token!'}), 401
+        return f(*args, **kwargs)
+
+    return decorated
+
+def rate_limit_key():
+    """
+    Rate-limit key for the current request: the JWT subject on @token_required
+    routes when a valid bearer token is present, otherwise the client address.
+    Behind the load balancer all clients share an IP, so authenticated callers
+    get their own bucket. Anonymous routes such as account creation stay keyed
+    on the address, or every new account's token would bring a fresh bucket.
+    """
+    view = current_app.view_functions.get(request.endpoint)
+    auth = request.headers.get('Authorization', '')
+    if getattr(view, 'token_required', False) and auth.startswith('Bearer '):
+        try:
+            data = jwt.decode(auth.split(" ")[1], SECRET_KEY, algorithms=['HS256'])
+            return f"customer:{data['sub']}"
+        except (jose.exceptions.JWTError, KeyError):
+            pass
+    return f"ip:{get_remote_address()}"
+
 def encode_token(customer_id):
     payload = {
         "exp": datetime.now(timezone.utc) + timedelta(days=0, hours=1),
@@ -0,0 +1,63 @@
+from collections import Counter
+from sqlalchemy import select, update, func, case
+from app.models import Mechanic, ServiceMechanic
+
+
+def refresh_ticket_counts(session, mechanic_ids=None):
+    """
+    Recompute Mechanic.ticket_count from service_mechanic in one UPDATE.
+
+    With no ids every mechanic is rebuilt (the reconcile command). The count(*)
+    reads the statement's snapshot, so under concurrent writes to the same
+    mechanic it can miss another transaction's rows; routes use
+    adjust_ticket_counts() and only recount where the database can't tell
+    which rows a statement wrote.
+    """
+    if mechanic_ids is not None:
+        mechanic_ids = set(mechanic_ids)
+        if not mechanic_ids:
+            return
+    assigned = (
+        select(func.count())
+        .select_from(ServiceMechanic)
+        .where(ServiceMechanic.mechanic_id == Mechanic.id)
+        .scalar_subquery()
+    )
+    stmt = update(Mechanic).values(ticket_count=assigned).execution_options(synchronize_session=False)
+    if mechanic_ids is not None:
+        stmt = stmt.where(Mechanic.id.in_(mechanic_ids))
+    session.execute(stmt)
+
+
+def adjust_ticket_counts(session, deltas):
+    """
+    Add {mechanic_id: n} to Mechanic.ticket_count in one UPDATE, n being the
+    service_mechanic rows this transaction inserted (or, negative, deleted)
+    as reported by the statements themselves. ticket_count + n is applied to
+    the latest row version under its row lock, so concurrent assignments to
+    the same mechanic all count.
+    """
+    deltas = {mechanic_id: n for mechanic_id, n in deltas.items() if n}
+    if not deltas:
+        return
+    session.execute(
+        update(Mechanic)
+        .where(Mechanic.id.in_(deltas))
+        .values(ticket_count=Mechanic.ticket_count + case(deltas, value=Mechanic.id, else_=0))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def count_assignments(session, inserted, deleted, mechanic_ids):
+    """
+    Update ticket counts after a transaction's service_mechanic writes.
+    `inserted` and `deleted` list the mechanic id of each row actually written
+    (from RETURNING), or are None when the database can't report them (MySQL),
+    in which case the `mechanic_ids` touched are recounted instead.
+    """
+    if inserted is None or deleted is None:
+        refresh_ticket_counts(session, mechanic_ids)
+        return
+    deltas = Counter(inserted)
+    deltas.subtract(deleted)
+    adjust_ticket_counts(session, deltas)
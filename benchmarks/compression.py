@@ -0,0 +1,85 @@
+"""
+CPU versus bytes for response compression at each level.
+
+Generates the dataset (see benchmarks.dataset), fetches a few list responses
+uncompressed, then compresses each body at every gzip level and a range of
+brotli qualities. Reports the median encode time, throughput, compressed
+size and ratio as JSON, so COMPRESS_LEVEL / COMPRESS_BROTLI_QUALITY can be
+picked from measured numbers.
+
+Run with:  python -m benchmarks.compression [--repeat 20] [--output results.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from benchmarks.dataset import add_size_arguments, generate
+from app.utils import compression
+
+PATHS = (
+    "/service_tickets/?per_page=100",
+    "/service_tickets/?include=customer,mechanics,parts&per_page=100",
+    "/customers/?per_page=100",
+    "/inventory/",
+)
+LEVELS = {"gzip": range(1, 10), "br": (0, 1, 2, 4, 5, 6, 9, 11)}
+
+
+def measure(body, encoding, level, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encoded = compression.encode(body, encoding, level)
+        timings.append(time.perf_counter() - start)
+    seconds = statistics.median(timings)
+    return {
+        "encoding": encoding,
+        "level": level,
+        "encode_ms": round(seconds * 1000, 3),
+        "mb_per_s": round(len(body) / seconds / 1e6, 1),
+        "bytes": len(encoded),
+        "ratio": round(len(body) / len(encoded), 2),
+    }
+
+
+def run(args):
+    from app import create_app
+    app = create_app("BenchmarkConfig")
+    sizes = {"customers": args.customers, "mechanics": args.mechanics, "parts": args.parts, "tickets": args.tickets}
+    with app.app_context():
+        dataset = generate(**sizes, seed=args.seed)
+    client = app.test_client()
+
+    results = {}
+    for path in PATHS:
+        body = client.get(path).data
+        rows = []
+        for encoding in compression.available_encodings():
+            for level in LEVELS[encoding]:
+                stats = measure(body, encoding, level, args.repeat)
+                rows.append(stats)
+                print(f"{path:<52} {encoding:>4} {level:>2}  {stats['encode_ms']:>9.3f}ms  "
+                      f"{stats['mb_per_s']:>7.1f} MB/s  {stats['bytes']:>9} bytes  x{stats['ratio']:.2f}",
+                      file=sys.stderr)
+        results[path] = {"bytes": len(body), "levels": rows}
+
+    output = json.dumps({"dataset": dataset, "repeat": args.repeat, "responses": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_size_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=20, help="encodes per level; the median is reported")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Page latency of GET /customers/ as the customer table grows.
+
+Run with:  python -m benchmarks.customers_pagination
+"""
+import sys
+import time
+from app import create_app
+from app.models import db, Customer
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 50
+
+
+def seed(n):
+    db.drop_all()
+    db.create_all()
+    rows = [
+        {"name": f"Customer {i}", "email": f"customer{i}@email.com",
+         "phone": "555-000-0000", "password": "password"}
+        for i in range(n)
+    ]
+    db.session.execute(Customer.__table__.insert(), rows)
+    db.session.commit()
+
+
+def timed(client, url):
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        # Unique query string per call so the response cache never answers
+        response = client.get(f"{url}&_={i}")
+    elapsed = (time.perf_counter() - start) / REPEAT
+    assert response.status_code == 200, response.status_code
+    return elapsed * 1000, response
+
+
+def main():
+    app = create_app('BenchmarkConfig')
+    client = app.test_client()
+    print(f"{'rows':>8} {'first page':>12} {'last page (offset)':>20} {'last page (cursor)':>20}")
+    for n in SIZES:
+        with app.app_context():
+            seed(n)
+        per_page = 10
+        last_page = n // per_page
+        first_ms, _ = timed(client, f"/customers/?per_page={per_page}")
+        offset_ms, _ = timed(client, f"/customers/?page={last_page - 1}&per_page={per_page}")
+        # Cursor pointing at the second-to-last page, as a client walking pages would hold
+        _, response = timed(client, f"/customers/?page={last_page - 2}&per_page={per_page}")
+        cursor = response.headers["X-Next-Cursor"]
+        cursor_ms, _ = timed(client, f"/customers/?after={cursor}&per_page={per_page}")
+        print(f"{n:>8} {first_ms:>10.2f}ms {offset_ms:>18.2f}ms {cursor_ms:>18.2f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Synthetic shop dataset for benchmarks.
+
+Rows are generated from a seeded RNG, so the same sizes always produce the
+same data and ids, and inserted with executemany in chunks. Tickets get 1-3
+mechanics and 0-4 parts each; customers are picked with a skew so a few
+regulars own many tickets, like a real shop.
+
+Run with:  python -m benchmarks.dataset --tickets 50000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.models import db, Customer, Mechanic, Inventory, ServiceTicket, ServiceMechanic, ServicePart
+from app.utils.workload import refresh_ticket_counts
+
+DEFAULT_SIZES = {"customers": 1_000, "mechanics": 50, "parts": 200, "tickets": 5_000}
+CHUNK_SIZE = 10_000
+START_DATE = datetime(2023, 1, 1)
+DATE_RANGE_DAYS = 730
+
+_FIRST = ("Alex", "Sam", "Jordan", "Taylor", "Casey", "Riley", "Morgan", "Jamie", "Drew", "Quinn")
+_LAST = ("Smith", "Garcia", "Nguyen", "Patel", "Kim", "Brown", "Lopez", "Okafor", "Rossi", "Novak")
+_PARTS = ("Brake Pad", "Oil Filter", "Air Filter", "Spark Plug", "Wiper Blade", "Timing Belt",
+          "Alternator", "Battery", "Radiator Hose", "Headlight Bulb")
+_JOBS = ("Brake repair", "Oil change", "Tire rotation", "Engine diagnostics", "Transmission flush",
+         "Battery replacement", "Coolant service", "Alignment", "Timing belt replacement", "AC recharge")
+_VIN_CHARS = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+
+def _phone(rng):
+    return f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}"
+
+
+def generate(customers, mechanics, parts, tickets, seed=0):
+    """Drop and recreate every table, then fill it. Needs an app context."""
+    rng = random.Random(seed)
+    db.drop_all()
+    db.create_all()
+
+    _insert(Customer, [
+        {"name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}", "email": f"customer{i}@example.com",
+         "phone": _phone(rng), "password": f"password{i}"}
+        for i in range(1, customers + 1)
+    ])
+    _insert(Mechanic, [
+        {"name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}", "email": f"mechanic{i}@example.com",
+         "phone": _phone(rng), "salary": float(rng.randrange(40_000, 90_000, 500))}
+        for i in range(1, mechanics + 1)
+    ])
+    _insert(Inventory, [
+        {"name": f"{rng.choice(_PARTS)} #{i}", "price": round(rng.uniform(5, 500), 2)}
+        for i in range(1, parts + 1)
+    ])
+
+    ticket_rows, mechanic_rows, part_rows = [], [], []
+    for ticket_id in range(1, tickets + 1):
+        ticket_rows.append({
+            "VIN": "".join(rng.choices(_VIN_CHARS, k=17)),
+            "service_date": START_DATE + timedelta(minutes=rng.randrange(DATE_RANGE_DAYS * 24 * 60)),
+            "service_desc": f"{rng.choice(_JOBS)}: {rng.choice(_JOBS).lower()} recommended",
+            # 80/20 skew: a fifth of the customers bring in most of the tickets
+            "customer_id": rng.randint(1, max(customers // 5, 1) if rng.random() < 0.8 else customers),
+        })
+        for mechanic_id in rng.sample(range(1, mechanics + 1), min(rng.randint(1, 3), mechanics)):
+            mechanic_rows.append({"ticket_id": ticket_id, "mechanic_id": mechanic_id})
+        for part_id in rng.sample(range(1, parts + 1), min(rng.randint(0, 4), parts)):
+            part_rows.append({"service_ticket_id": ticket_id, "inventory_id": part_id})
+    _insert(ServiceTicket, ticket_rows)
+    _insert(ServiceMechanic, mechanic_rows)
+    _insert(ServicePart, part_rows)
+    refresh_ticket_counts(db.session)
+    db.session.commit()
+    return {"customers": customers, "mechanics": mechanics, "parts": parts, "tickets": tickets,
+            "service_mechanic": len(mechanic_rows), "service_part": len(part_rows)}
+
+
+def add_size_arguments(parser):
+    for name, default in DEFAULT_SIZES.items():
+        parser.add_argument(f"--{name}", type=int, default=default)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="BenchmarkConfig")
+    add_size_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    app = create_app(args.config)
+    with app.app_context():
+        start = time.perf_counter()
+        counts = generate(args.customers, args.mechanics, args.parts, args.tickets, args.seed)
+        elapsed = time.perf_counter() - start
+    rows = sum(counts.values())
+    print(", ".join(f"{n} {name}" for name, n in counts.items()))
+    print(f"{rows} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
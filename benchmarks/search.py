@@ -0,0 +1,99 @@
+"""
+Full-text search against LIKE '%q%'.
+
+Generates the dataset (see benchmarks.dataset), then runs each query through
+every available search backend and through the LIKE scan a client-side
+filter would replace: a substring match on every indexed column of
+customers, service tickets and parts. Reports the median time and hit count
+per query as JSON; the Python fallback's one-off index build is reported
+separately.
+
+Run with:  python -m benchmarks.search [--repeat 20] [--output results.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from sqlalchemy import and_, or_, select, union_all
+from benchmarks.dataset import add_size_arguments, generate
+from app.utils import search
+
+QUERIES = ("brake", "oil ch", "timing belt replacement", "smith", "customer42", "555-12", "gask")
+LIMIT = 20
+
+
+def like_query(terms, limit):
+    """Every row containing each term anywhere in an indexed column, unranked."""
+    selects = []
+    for kind, (table, columns) in search.SOURCES.items():
+        matches = [or_(*(table.c[column].ilike(f"%{term}%") for column in columns)) for term in terms]
+        selects.append(select(table.c.id).where(and_(*matches)))
+    return union_all(*selects).limit(limit)
+
+
+def timed(fn, repeat):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return round(statistics.median(timings) * 1000, 3), result
+
+
+def run(args):
+    from app import create_app
+    from app.models import db
+    app = create_app("BenchmarkConfig")
+    sizes = {"customers": args.customers, "mechanics": args.mechanics, "parts": args.parts, "tickets": args.tickets}
+    with app.app_context():
+        dataset = generate(**sizes, seed=args.seed)
+
+    backends = ['python']
+    with app.test_request_context():
+        native = search.search_backend(db.session)
+        if native != 'python':
+            backends.insert(0, native)
+        app.config['SEARCH_BACKEND'] = 'python'
+        build_ms, _ = timed(lambda: search._python_indexes(db.session, search.SOURCES), 1)
+        app.config['SEARCH_BACKEND'] = None
+
+    results = []
+    for query in QUERIES:
+        terms = search.parse_query(query)
+        row = {"query": query}
+        with app.test_request_context():
+            for backend in backends:
+                app.config['SEARCH_BACKEND'] = backend
+                ms, hits = timed(lambda: search.search(db.session, terms, search.SOURCES, LIMIT), args.repeat)
+                row[backend] = {"ms": ms, "hits": len(hits)}
+            app.config['SEARCH_BACKEND'] = None
+            ms, hits = timed(lambda: db.session.execute(like_query(terms, LIMIT)).all(), args.repeat)
+            row["like"] = {"ms": ms, "hits": len(hits)}
+            # What a client filtering a full dump pays: every match, not one page
+            ms, hits = timed(lambda: db.session.execute(like_query(terms, None)).all(), args.repeat)
+            row["like_all"] = {"ms": ms, "hits": len(hits)}
+        results.append(row)
+        print(f"{query:<26} " + "  ".join(f"{name} {stats['ms']:>8.3f}ms ({stats['hits']})"
+                                         for name, stats in row.items() if name != "query"), file=sys.stderr)
+
+    output = json.dumps({"dataset": dataset, "repeat": args.repeat, "limit": LIMIT,
+                         "python_index_build_ms": build_ms, "queries": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_size_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query; the median is reported")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Throughput of the marshmallow list path against the compiled row serializer
+for GET /service_tickets/-sized payloads.
+
+Run with:  python -m benchmarks.serializer_throughput
+"""
+import sys
+import time
+from datetime import datetime
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from app.models import db, Customer, ServiceTicket
+from app.blueprints.service_tickets.schemas import service_tickets_schema, service_tickets_serializer
+
+ROWS = 20_000
+REPEAT = 5
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(Customer.__table__.insert(), [
+        {"name": "Customer", "email": "customer@email.com", "phone": "555-000-0000", "password": "password"}
+    ])
+    db.session.execute(ServiceTicket.__table__.insert(), [
+        {"VIN": f"VIN{i:014d}", "service_date": datetime(2024, 1, 1, 9, i % 60),
+         "service_desc": "Oil change and tire rotation", "customer_id": 1}
+        for i in range(ROWS)
+    ])
+    db.session.commit()
+
+
+def rows_per_second(fn):
+    best = float('inf')
+    for _ in range(REPEAT):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return ROWS / best
+
+
+def main():
+    app = create_app('BenchmarkConfig')
+    stdlib = DefaultJSONProvider(app)
+    with app.app_context():
+        seed()
+
+        def marshmallow_path():
+            tickets = db.session.execute(db.select(ServiceTicket)).scalars().all()
+            return stdlib.dumps(service_tickets_schema.dump(tickets))
+
+        def fast_path_stdlib_json():
+            rows = db.session.execute(service_tickets_serializer.select()).all()
+            return stdlib.dumps(service_tickets_serializer.dump_rows(rows))
+
+        def fast_path():
+            rows = db.session.execute(service_tickets_serializer.select()).all()
+            return app.json.dumps(service_tickets_serializer.dump_rows(rows))
+
+        assert stdlib.loads(marshmallow_path()) == stdlib.loads(fast_path())
+        print(f"{ROWS} service tickets, best of {REPEAT}")
+        for label, fn in (("ORM + marshmallow + json", marshmallow_path),
+                          ("Core rows + field map + json", fast_path_stdlib_json),
+                          ("Core rows + field map + provider", fast_path)):
+            print(f"  {label:<34} {rows_per_second(fn):>12,.0f} rows/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
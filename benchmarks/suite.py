@@ -0,0 +1,366 @@
+"""
+HTTP benchmark for every blueprint route on a synthetic dataset.
+
+  run       generate the dataset (see benchmarks.dataset), call each route
+            --iterations times and write p50/p95/p99 latency, throughput and
+            peak RSS as JSON. Requests go through the Flask test client, or
+            with --gunicorn to a gunicorn server started for the run.
+  compare   read two result files and flag every scenario whose latency got
+            worse by more than --threshold; exits 1 if any did.
+
+Comparing two commits:
+  git checkout A && python -m benchmarks.suite run --output a.json
+  git checkout B && python -m benchmarks.suite run --output b.json
+  python -m benchmarks.suite compare a.json b.json
+
+Run with:  python -m benchmarks.suite run [--gunicorn] [--output results.json]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from benchmarks.dataset import add_size_arguments, generate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WARMUP = 5
+BULK_ROWS = 1000
+BATCH_TICKETS = 50
+
+# path, body and as_customer are values or functions of the call number, so
+# write scenarios can touch a different row on every call. as_customer is the
+# id to put in the bearer token, for routes that require one.
+Scenario = namedtuple("Scenario", "name method path body as_customer", defaults=(None, None))
+
+
+def scenarios(sizes):
+    """Scenarios in run order: creates run before the deletes that remove their rows."""
+    customers, mechanics, parts, tickets = (sizes[k] for k in ("customers", "mechanics", "parts", "tickets"))
+    # One spare mechanic and part, added after generation, for the link/unlink routes
+    bench_mechanic, bench_part = mechanics + 1, parts + 1
+    return [
+        Scenario("customers.add_customer", "POST", "/customers/", lambda i: {
+            "name": "Bench Customer", "email": f"bench{i}@example.com", "phone": "555-000-0000", "password": "pw"}),
+        Scenario("customers.get_customers", "GET", lambda i: f"/customers/?per_page=20&page={i % 50 + 1}"),
+        Scenario("customers.get_customers (cursor)", "GET", lambda i: f"/customers/?per_page=20&after={_cursor(customers // 2 + i)}"),
+        Scenario("customers.get_customer", "GET", lambda i: f"/customers/{i % customers + 1}"),
+        Scenario("customers.update_customer", "PUT", lambda i: f"/customers/{i % customers + 1}",
+                 {"phone": "555-111-2222"}, as_customer=lambda i: i % customers + 1),
+        Scenario("customers.login", "POST", "/customers/login", {"email": "customer1@example.com", "password": "password1"}),
+        Scenario("customers.get_my_tickets", "GET", "/customers/my-tickets", as_customer=1),
+        Scenario(f"customers.bulk_add_customers ({BULK_ROWS} rows)", "POST", "/customers/bulk", lambda i: [
+            {"name": "Bulk Customer", "email": f"bulk{i}-{n}@example.com", "phone": "555-000-0000", "password": "pw"}
+            for n in range(BULK_ROWS)]),
+        Scenario("customers.delete_customer", "DELETE", lambda i: f"/customers/{customers + i + 1}",
+                 as_customer=lambda i: customers + i + 1),
+
+        Scenario("mechanics.add_mechanic", "POST", "/mechanics/", lambda i: {
+            "name": "Bench Mechanic", "email": f"bench{i}@example.com", "phone": "555-000-0000", "salary": 50000.0}),
+        Scenario("mechanics.get_mechanics", "GET", "/mechanics/"),
+        Scenario("mechanics.get_mechanic", "GET", lambda i: f"/mechanics/{i % mechanics + 1}"),
+        Scenario("mechanics.update_mechanic", "PUT", lambda i: f"/mechanics/{i % mechanics + 1}", {"salary": 60000.0}),
+        Scenario("mechanics.most_active_mechanics", "GET", "/mechanics/most-active?limit=10"),
+        Scenario(f"mechanics.bulk_add_mechanics ({BULK_ROWS} rows)", "POST", "/mechanics/bulk", lambda i: [
+            {"name": "Bulk Mechanic", "email": f"bulk{i}-{n}@example.com", "phone": "555-000-0000", "salary": 50000.0}
+            for n in range(BULK_ROWS)]),
+        Scenario("mechanics.delete_mechanic", "DELETE", lambda i: f"/mechanics/{bench_mechanic + i + 1}"),
+
+        Scenario("inventory.add_inventory", "POST", "/inventory/", {"name": "Bench Part", "price": 9.99}),
+        Scenario("inventory.get_inventory", "GET", "/inventory/"),
+        Scenario("inventory.get_part", "GET", lambda i: f"/inventory/{i % parts + 1}"),
+        Scenario("inventory.update_part", "PUT", lambda i: f"/inventory/{i % parts + 1}", {"price": 19.99}),
+        Scenario(f"inventory.bulk_add_inventory ({BULK_ROWS} rows)", "POST", "/inventory/bulk",
+                 [{"name": f"Bulk Part {n}", "price": 9.99} for n in range(BULK_ROWS)]),
+        Scenario("inventory.delete_part", "DELETE", lambda i: f"/inventory/{bench_part + i + 1}"),
+
+        Scenario("service_tickets.add_service_ticket", "POST", "/service_tickets/", {
+            "VIN": "1HGCM82633A004352", "service_date": "2024-06-01T09:00:00",
+            "service_desc": "Bench ticket", "customer_id": 1}),
+        Scenario(f"service_tickets.add_service_tickets_batch ({BATCH_TICKETS} tickets)", "POST", "/service_tickets/batch", [
+            {"VIN": "1HGCM82633A004352", "service_date": "2024-06-01T09:00:00", "service_desc": "Bench intake",
+             "customer_id": n % customers + 1, "mechanic_ids": [n % mechanics + 1, (n + 1) % mechanics + 1],
+             "part_ids": [n % parts + 1, (n + 7) % parts + 1, (n + 13) % parts + 1]}
+            for n in range(BATCH_TICKETS)]),
+        Scenario("service_tickets.get_service_tickets", "GET", "/service_tickets/"),
+        Scenario("service_tickets.get_service_tickets (include)", "GET",
+                 "/service_tickets/?include=customer,mechanics,parts"),
+        Scenario("service_tickets.get_service_tickets (customer, newest first)", "GET",
+                 lambda i: f"/service_tickets/?customer_id={i % customers + 1}&sort=-service_date"),
+        Scenario("service_tickets.get_service_tickets (mechanic)", "GET",
+                 lambda i: f"/service_tickets/?mechanic_id={i % mechanics + 1}"),
+        Scenario("service_tickets.get_service_tickets (date range)", "GET",
+                 "/service_tickets/?from=2024-01-01&to=2024-01-31&sort=service_date&per_page=100"),
+        Scenario("service_tickets.get_service_ticket", "GET", lambda i: f"/service_tickets/{i % tickets + 1}"),
+        Scenario("service_tickets.export_service_tickets", "GET",
+                 "/service_tickets/export?format=ndjson&from=2024-01-01&to=2024-01-31"),
+        Scenario("service_tickets.assign_mechanic", "PUT",
+                 lambda i: f"/service_tickets/{i % tickets + 1}/assign-mechanic/{bench_mechanic}"),
+        Scenario("service_tickets.remove_mechanic", "PUT",
+                 lambda i: f"/service_tickets/{i % tickets + 1}/remove-mechanic/{bench_mechanic}"),
+        Scenario("service_tickets.add_part_to_ticket", "PUT",
+                 lambda i: f"/service_tickets/{i % tickets + 1}/add-part/{bench_part}"),
+        Scenario("service_tickets.edit_ticket_mechanics", "PUT", lambda i: f"/service_tickets/{i % tickets + 1}/edit",
+                 {"add_ids": [1, 2, 3], "remove_ids": [1, 2, 3]}),
+    ]
+
+
+def _cursor(last_id):
+    from app.utils.pagination import encode_cursor
+    return encode_cursor(last_id)
+
+
+def _add_bench_rows():
+    from app.models import db, Mechanic, Inventory
+    db.session.add(Mechanic(name="Bench Mechanic", email="bench-mechanic@example.com",
+                            phone="555-000-0000", salary=50000.0))
+    db.session.add(Inventory(name="Bench Part", price=1.0))
+    db.session.commit()
+
+
+class TestClientTarget:
+    """Calls the app in-process through the Flask test client."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body, headers):
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        response.get_data()  # drain streamed bodies so their cost is counted
+        return response.status_code
+
+    def peak_rss_mb(self):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def close(self):
+        pass
+
+
+class GunicornTarget:
+    """Starts gunicorn with the repo's gunicorn.conf.py and calls it over HTTP."""
+
+    def __init__(self, workers):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        env = dict(os.environ, WEB_CONCURRENCY=str(workers),
+                   PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(prefix="bench-metrics-"))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{self.port}", "benchmarks.wsgi:app"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                self.request("GET", "/", None, {})
+                break
+            except OSError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    raise RuntimeError("gunicorn did not start")
+                time.sleep(0.1)
+
+    def request(self, method, path, body, headers):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        try:
+            payload = None
+            if body is not None:
+                payload = json.dumps(body)
+                headers = dict(headers, **{"Content-Type": "application/json"})
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    def _worker_pids(self):
+        path = f"/proc/{self.process.pid}/task/{self.process.pid}/children"
+        try:
+            with open(path) as f:
+                return [int(pid) for pid in f.read().split()]
+        except OSError:
+            return []
+
+    def peak_rss_mb(self):
+        # Highest peak of any single worker, from the kernel's high-water mark
+        peaks = []
+        for pid in self._worker_pids():
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    peaks.extend(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+            except OSError:
+                pass
+        return max(peaks) / 1024 if peaks else None
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def _quantiles(latencies):
+    if len(latencies) < 2:
+        value = latencies[0] if latencies else None
+        return value, value, value
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def _value(field, i):
+    return field(i) if callable(field) else field
+
+
+def run_scenario(target, scenario, iterations, concurrency):
+    from app.utils.util import encode_token
+
+    def call(i):
+        path, body = _value(scenario.path, i), _value(scenario.body, i)
+        customer_id = _value(scenario.as_customer, i)
+        headers = {"Authorization": "Bearer " + encode_token(customer_id)} if customer_id else {}
+        start = time.perf_counter()
+        status = target.request(scenario.method, path, body, headers)
+        return (time.perf_counter() - start) * 1000, status
+
+    for i in range(WARMUP):
+        call(i)
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(call, range(WARMUP, WARMUP + iterations)))
+    else:
+        results = [call(i) for i in range(WARMUP, WARMUP + iterations)]
+    elapsed = time.perf_counter() - start
+
+    latencies = [ms for ms, _ in results]
+    p50, p95, p99 = _quantiles(latencies)
+    return {
+        "method": scenario.method,
+        "requests": iterations,
+        "errors": sum(1 for _, status in results if status >= 400),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "throughput_rps": round(iterations / elapsed, 1),
+    }
+
+
+def _git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    from app import create_app
+    app = create_app("BenchmarkConfig")
+    sizes = {"customers": args.customers, "mechanics": args.mechanics, "parts": args.parts, "tickets": args.tickets}
+    with app.app_context():
+        dataset = generate(**sizes, seed=args.seed)
+        _add_bench_rows()
+
+    target = GunicornTarget(args.workers) if args.gunicorn else TestClientTarget(app)
+    results = {}
+    try:
+        for scenario in scenarios(sizes):
+            if args.only and not any(name in scenario.name for name in args.only):
+                continue
+            results[scenario.name] = stats = run_scenario(target, scenario, args.iterations, args.concurrency)
+            print(f"{scenario.name:<48} p50 {stats['p50_ms']:>8.2f}ms  p95 {stats['p95_ms']:>8.2f}ms  "
+                  f"p99 {stats['p99_ms']:>8.2f}ms  {stats['throughput_rps']:>8.1f} req/s"
+                  + (f"  {stats['errors']} errors" if stats['errors'] else ""), file=sys.stderr)
+        peak_rss_mb = target.peak_rss_mb()
+    finally:
+        target.close()
+
+    report = {
+        "meta": {
+            "commit": _git_revision(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": f"gunicorn ({args.workers} workers)" if args.gunicorn else "test client",
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "dataset": dataset,
+        },
+        "peak_rss_mb": round(peak_rss_mb, 1) if peak_rss_mb else None,
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    metric = args.metric
+    print(f"base {base['meta'].get('commit')}  ->  head {head['meta'].get('commit')}  ({metric})")
+    regressions = []
+    for name, before in base["scenarios"].items():
+        after = head["scenarios"].get(name)
+        if after is None:
+            continue
+        change = (after[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+        # Sub-noise differences on very fast routes are not worth failing on
+        regressed = change > args.threshold and after[metric] - before[metric] > args.min_ms
+        errors = after["errors"] > before["errors"]
+        flag = "REGRESSION" if regressed else ("ERRORS" if errors else "")
+        if regressed or errors:
+            regressions.append(name)
+        print(f"{name:<48} {before[metric]:>9.2f}ms {after[metric]:>9.2f}ms {change:>+8.1%}  {flag}")
+    if base.get("peak_rss_mb") and head.get("peak_rss_mb"):
+        print(f"{'peak RSS':<48} {base['peak_rss_mb']:>9.1f}MB {head['peak_rss_mb']:>9.1f}MB")
+    if regressions:
+        print(f"{len(regressions)} scenario(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark every route")
+    add_size_arguments(run_parser)
+    run_parser.add_argument("--iterations", type=int, default=50)
+    run_parser.add_argument("--concurrency", type=int, default=1, help="parallel clients (most useful with --gunicorn)")
+    run_parser.add_argument("--gunicorn", action="store_true", help="benchmark a gunicorn server instead of the test client")
+    run_parser.add_argument("--workers", type=int, default=2)
+    run_parser.add_argument("--only", action="append", help="run scenarios whose name contains this (repeatable)")
+    run_parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two reports")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--metric", default="p95_ms", choices=("p50_ms", "p95_ms", "p99_ms", "mean_ms"))
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    compare_parser.add_argument("--min-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
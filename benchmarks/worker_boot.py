@@ -0,0 +1,87 @@
+"""
+Cold gunicorn worker boot time before and after moving schema setup out of
+the app import.
+
+  before   fresh interpreter: import app, create_app(), db.create_all()
+  after    fresh interpreter: import app, create_app()
+  preload  worker forked from a master that already imported the app
+
+Uses SQLALCHEMY_DATABASE_URI when set (point it at the real database to see
+the reflection round trips), otherwise a temporary SQLite file.
+
+Run with:  python -m benchmarks.worker_boot
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 5
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BEFORE = (
+    "from app import create_app\n"
+    "from app.models import db\n"
+    "app = create_app('ProductionConfig')\n"
+    "with app.app_context():\n"
+    "    db.create_all()\n"
+)
+AFTER = (
+    "from app import create_app\n"
+    "app = create_app('ProductionConfig')\n"
+)
+
+
+def fresh_interpreter_ms(source, env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-W", "ignore", "-c", source], cwd=ROOT, env=env, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def preloaded_fork_ms():
+    from app import create_app
+    from app.models import db
+    app = create_app('ProductionConfig')
+    timings = []
+    for _ in range(RUNS):
+        read_fd, write_fd = os.pipe()
+        start = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            # What gunicorn's post_fork hook does before the worker serves
+            with app.app_context():
+                db.engine.dispose(close=False)
+            os.write(write_fd, b"1")
+            os._exit(0)
+        os.read(read_fd, 1)
+        timings.append((time.perf_counter() - start) * 1000)
+        os.waitpid(pid, 0)
+        os.close(read_fd)
+        os.close(write_fd)
+    return min(timings)
+
+
+def main():
+    tmp = None
+    if not os.environ.get('SQLALCHEMY_DATABASE_URI'):
+        fd, tmp = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        os.environ['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp}"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    try:
+        before = min(fresh_interpreter_ms(BEFORE, env) for _ in range(RUNS))
+        after = min(fresh_interpreter_ms(AFTER, env) for _ in range(RUNS))
+        preload = preloaded_fork_ms()
+    finally:
+        if tmp:
+            os.remove(tmp)
+    print(f"worker boot, best of {RUNS}")
+    print(f"  {'before (import + create_all)':<32} {before:8.1f}ms")
+    print(f"  {'after (import only)':<32} {after:8.1f}ms")
+    print(f"  {'after, preloaded fork':<32} {preload:8.1f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
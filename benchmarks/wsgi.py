@@ -0,0 +1,4 @@
+"""WSGI entry point that serves the benchmark database, for `benchmarks.suite --gunicorn`."""
+from app import create_app
+
+app = create_app('BenchmarkConfig')
@@ -1,11 +1,5 @@
 from app import create_app
-from app.models import db
 
-app = create_app('ProductionConfig')
-
-try:
-    with app.app_context():
-        # db.drop_all()
-        db.create_all()
-except Exception as e:
-    print(f"Warning: Could not create database tables: {e}")
\ No newline at end of file
+# Importing the app never touches the database: the schema is set up once per
+# deploy with `flask --app flask_app db upgrade`, not in every gunicorn worker.
+app = create_app('ProductionConfig')
\ No newline at end of file
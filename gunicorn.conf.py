@@ -0,0 +1,34 @@
+import os
+import shutil
+import tempfile
+
+# Import the app once in the master and fork workers from it, so each worker
+# shares the loaded code copy-on-write instead of importing it again
+preload_app = True
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+# Set before the app (and prometheus_client) is imported so every worker writes
+# its metrics to shared files that /metrics can add up
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'mechanic-shop-metrics'))
+
+
+def on_starting(server):
+    # Counters from a previous run would otherwise be added to this one's
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def post_fork(server, worker):
+    # Connections must never be shared across processes; drop any the master
+    # may have pooled so each worker opens its own
+    from app.models import db
+    with worker.app.wsgi().app_context():
+        db.engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,77 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00
+
+Tables as they were before migrations were introduced. Databases created
+earlier by db.create_all() already have them, so each table is only created
+when missing and `flask db upgrade` works on both new and existing databases.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _missing(name):
+    return not sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if _missing('customer'):
+        op.create_table(
+            'customer',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('email', sa.String(length=100), nullable=False, unique=True),
+            sa.Column('phone', sa.String(length=15), nullable=False),
+            sa.Column('password', sa.String(length=255), nullable=False),
+        )
+    if _missing('mechanic'):
+        op.create_table(
+            'mechanic',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('email', sa.String(length=100), nullable=False, unique=True),
+            sa.Column('phone', sa.String(length=15), nullable=False),
+            sa.Column('salary', sa.Float(), nullable=False),
+        )
+    if _missing('inventory'):
+        op.create_table(
+            'inventory',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=120), nullable=False),
+            sa.Column('price', sa.Float(), nullable=False),
+        )
+    if _missing('service_ticket'):
+        op.create_table(
+            'service_ticket',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('VIN', sa.String(length=50), nullable=False),
+            sa.Column('service_date', sa.DateTime(), nullable=False),
+            sa.Column('service_desc', sa.String(length=255), nullable=False),
+            sa.Column('customer_id', sa.Integer(), sa.ForeignKey('customer.id'), nullable=False),
+        )
+    if _missing('service_mechanic'):
+        op.create_table(
+            'service_mechanic',
+            sa.Column('ticket_id', sa.Integer(), sa.ForeignKey('service_ticket.id'), primary_key=True),
+            sa.Column('mechanic_id', sa.Integer(), sa.ForeignKey('mechanic.id'), primary_key=True),
+        )
+    if _missing('service_part'):
+        op.create_table(
+            'service_part',
+            sa.Column('service_ticket_id', sa.Integer(), sa.ForeignKey('service_ticket.id'), primary_key=True),
+            sa.Column('inventory_id', sa.Integer(), sa.ForeignKey('inventory.id'), primary_key=True),
+        )
+
+
+def downgrade():
+    for table in ('service_part', 'service_mechanic', 'service_ticket', 'inventory', 'mechanic', 'customer'):
+        op.drop_table(table)
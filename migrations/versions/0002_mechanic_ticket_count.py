@@ -0,0 +1,33 @@
+"""mechanic ticket_count
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00
+
+Denormalized assignment count behind /mechanics/most-active, backfilled from
+service_mechanic.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('mechanic', sa.Column('ticket_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE mechanic SET ticket_count = "
+        "(SELECT count(*) FROM service_mechanic WHERE service_mechanic.mechanic_id = mechanic.id)"
+    )
+    op.create_index('ix_mechanic_ticket_count', 'mechanic', [sa.text('ticket_count DESC'), 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_mechanic_ticket_count', table_name='mechanic')
+    with op.batch_alter_table('mechanic') as batch_op:
+        batch_op.drop_column('ticket_count')
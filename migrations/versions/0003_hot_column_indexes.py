@@ -0,0 +1,41 @@
+"""secondary indexes on hot query columns
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00
+
+Built without blocking writes: CREATE INDEX CONCURRENTLY on Postgres (which
+must run outside a transaction), InnoDB's default online DDL on MySQL, and a
+plain CREATE INDEX on SQLite.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_service_ticket_customer_id', 'service_ticket', ['customer_id']),
+    ('ix_service_ticket_VIN', 'service_ticket', ['VIN']),
+    ('ix_service_ticket_service_date', 'service_ticket', ['service_date']),
+    ('ix_service_mechanic_mechanic_id', 'service_mechanic', ['mechanic_id']),
+    ('ix_service_part_inventory_id', 'service_part', ['inventory_id']),
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
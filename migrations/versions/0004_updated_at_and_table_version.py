@@ -0,0 +1,50 @@
+"""updated_at columns and table_version
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:30:00
+
+Validators for conditional GETs: an updated_at on every row for detail
+responses, and a per-table version counter bumped on each committed write
+for list responses. Existing rows are stamped with the migration time.
+"""
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+TABLES = ('customer', 'service_ticket', 'mechanic', 'service_mechanic', 'service_part', 'inventory')
+Timestamp = sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
+def upgrade():
+    # UTC like the app's own stamps; CURRENT_TIMESTAMP is in the session's
+    # time zone on MySQL and Postgres
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', Timestamp, nullable=True))
+        op.execute(sa.text(f"UPDATE {table} SET updated_at = :now").bindparams(now=now))
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=Timestamp, nullable=False)
+
+    table_version = op.create_table(
+        'table_version',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', Timestamp, nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(table_version, [{'name': name, 'version': 0, 'updated_at': now} for name in TABLES])
+
+def downgrade():
+    op.drop_table('table_version')
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
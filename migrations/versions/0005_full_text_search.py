@@ -0,0 +1,73 @@
+"""full-text search indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 09:40:00
+
+Indexes behind GET /search. On SQLite built with FTS5: an external-content
+FTS5 table per source table, filled from the existing rows and kept current
+by triggers. On Postgres: a generated search_vector tsvector column with a
+GIN index, built concurrently. Other databases use the in-process fallback
+and need nothing here.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+SOURCES = {
+    'customer': ('name', 'email', 'phone'),
+    'service_ticket': ('service_desc',),
+    'inventory': ('name',),
+}
+
+
+def _fts5_available(bind):
+    return bool(bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def _fts5_upgrade(table, columns):
+    fts, names = f"{table}_fts", ", ".join(columns)
+    new, old = (", ".join(f"{row}.{column}" for column in columns) for row in ('new', 'old'))
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table}', content_rowid='id', "
+               f"tokenize='unicode61 remove_diacritics 0', prefix='2 3')")
+    op.execute(f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END")
+    op.execute(f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END")
+    op.execute(f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END")
+    # Index the rows that are already there
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite' and _fts5_available(bind):
+        for table, columns in SOURCES.items():
+            _fts5_upgrade(table, columns)
+    elif bind.dialect.name == 'postgresql':
+        for table, columns in SOURCES.items():
+            document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+            op.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+                       f"(to_tsvector('simple', regexp_replace(lower({document}), '[^[:alnum:]]+', ' ', 'g'))) STORED")
+        with op.get_context().autocommit_block():
+            for table in SOURCES:
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_search_vector "
+                           f"ON {table} USING gin (search_vector)")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for table in SOURCES:
+            for action in ('insert', 'delete', 'update'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{action}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+    elif bind.dialect.name == 'postgresql':
+        for table in SOURCES:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
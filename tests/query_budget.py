@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.extensions import cache
+from app.models import db
+
+
+@contextmanager
+def count_queries(app):
+    """Collect every statement the app's engine executes inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+class QueryBudgetMixin:
+    """
+    Statement budgets for route tests. A route that starts issuing a query per
+    row (N+1) or an extra round trip fails here like a functional regression.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget):
+        with count_queries(self.app) as statements:
+            yield statements
+        if len(statements) > budget:
+            listing = "\n".join(f"  {i}. {' '.join(s.split())}" for i, s in enumerate(statements, 1))
+            self.fail(f"{len(statements)} queries, budget is {budget}:\n{listing}")
+
+    def assertConstantQueries(self, request, add_rows):
+        """
+        Run request() before and after add_rows() and check the statement
+        count did not grow with the data. The cache is cleared in between so
+        both runs reach the database.
+        """
+        with count_queries(self.app) as before:
+            request()
+        add_rows()
+        with self.app.app_context():
+            cache.clear()
+        with count_queries(self.app) as after:
+            request()
+        self.assertEqual(len(after), len(before),
+                         f"query count grew with the data: {len(before)} -> {len(after)}")
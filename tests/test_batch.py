@@ -0,0 +1,107 @@
+from app import create_app
+from app.models import db, Customer, Mechanic, Inventory
+from app.utils.util import encode_token
+from sqlalchemy import event
+from tests.query_budget import QueryBudgetMixin
+import unittest
+
+
+class TestBatch(QueryBudgetMixin, unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.add(Customer(name="Customer", email="customer@email.com",
+                                    phone="555-123-4567", password="testpassword"))
+            db.session.add(Mechanic(name="Mechanic", email="mechanic@email.com",
+                                    phone="555-000-0000", salary=50000.0))
+            db.session.add(Inventory(name="Brake Pad", price=45.99))
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def test_independent_gets(self):
+        """Test that GETs come back in order on one connection, one query each"""
+        batch = [{"method": "GET", "path": "/customers/1"},
+                 {"method": "GET", "path": "/mechanics/1?fields=name"},
+                 {"method": "GET", "path": "/inventory/1"},
+                 {"method": "GET", "path": "/inventory/99"}]
+        with self.app.app_context():
+            checkouts = []
+            event.listen(db.engine, 'checkout', lambda *args: checkouts.append(1))
+        with self.assertMaxQueries(4):
+            response = self.client.post('/batch', json=batch)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(checkouts), 1)
+
+        results = response.get_json()
+        self.assertEqual([r['status'] for r in results], [200, 200, 200, 404])
+        self.assertEqual(results[0]['body']['email'], "customer@email.com")
+        self.assertEqual(results[1]['body'], {"id": 1, "name": "Mechanic"})
+        self.assertEqual(results[2]['body']['name'], "Brake Pad")
+        self.assertIn('ETag', results[0]['headers'])
+
+    def test_writes_and_headers(self):
+        """Test that writes commit, later reads see them and the caller's token is passed on"""
+        headers = {'Authorization': "Bearer " + encode_token(1)}
+        batch = [{"method": "POST", "path": "/inventory/", "body": {"name": "Oil Filter", "price": 9.5}},
+                 {"method": "GET", "path": "/inventory/2"},
+                 {"method": "GET", "path": "/customers/my-tickets"},
+                 {"method": "GET", "path": "/customers/my-tickets", "headers": {"Authorization": "Bearer bad"}}]
+        results = self.client.post('/batch', json=batch, headers=headers).get_json()
+        self.assertEqual([r['status'] for r in results], [201, 200, 200, 401])
+        self.assertEqual(results[1]['body']['name'], "Oil Filter")
+
+        etag = results[1]['headers']['ETag']
+        results = self.client.post('/batch', json=[
+            {"method": "GET", "path": "/inventory/2", "headers": {"If-None-Match": etag}}]).get_json()
+        self.assertEqual(results[0]['status'], 304)
+        self.assertIsNone(results[0]['body'])
+
+    def test_sub_requests_not_compressed(self):
+        """Test that a sub-request asking for gzip still gets a JSON body in the batch"""
+        self.app.config['COMPRESS_MIN_SIZE'] = 1
+        batch = [{"method": "GET", "path": "/inventory/", "headers": {"Accept-Encoding": "gzip"}},
+                 {"method": "GET", "path": "/mechanics/", "headers": {"accept-encoding": "br, gzip"}}]
+        response = self.client.post('/batch', json=batch)
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()
+        self.assertEqual([r['status'] for r in results], [200, 200])
+        self.assertEqual(results[0]['body'][0]['name'], "Brake Pad")
+        self.assertEqual(results[1]['body'][0]['name'], "Mechanic")
+        self.assertNotIn('Content-Encoding', results[0]['headers'])
+
+    def test_rate_limits_apply_per_sub_request(self):
+        """Test that each sub-request is counted against the caller's limits"""
+        batch = [{"method": "POST", "path": "/customers/",
+                  "body": {"name": f"C{i}", "email": f"c{i}@email.com", "phone": "555", "password": "pw"}}
+                 for i in range(7)]
+        results = self.client.post('/batch', json=batch).get_json()
+        self.assertEqual([r['status'] for r in results], [201] * 6 + [429])
+        response = self.client.post('/customers/', json=batch[0]['body'])
+        self.assertEqual(response.status_code, 429)
+
+    def test_invalid_batches(self):
+        """Test the size limit, a non-array body and entries that can't be dispatched"""
+        self.app.config['BATCH_MAX_REQUESTS'] = 2
+        response = self.client.post('/batch', json=[{"path": "/inventory/1"}] * 3)
+        self.assertEqual(response.status_code, 413)
+        response = self.client.post('/batch', json={"path": "/inventory/1"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/batch', json=[{"method": "POST", "path": "/batch", "body": []},
+                                                    {"method": "GET", "path": "inventory/1"}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in response.get_json()], [400, 400])
+
+    def test_nested_batches_refused(self):
+        """Test that a batch can't run another batch, however its path is spelled"""
+        paths = ["/batch", "/batch?x=1", "/batch#x", "/%62atch", "/%62%61tch#x"]
+        batch = [{"method": "POST", "path": path, "body": [{"path": "/inventory/1"}]} for path in paths]
+        results = self.client.post('/batch', json=batch).get_json()
+        self.assertEqual([r['status'] for r in results], [400] * len(paths))
+        self.assertEqual({r['body']['error'] for r in results}, {"Batches can't be nested"})
+
+
+if __name__ == '__main__':
+    unittest.main()
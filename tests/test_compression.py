@@ -0,0 +1,90 @@
+from app import create_app
+from app.extensions import cache
+from app.models import db, Mechanic
+from app.utils import compression
+from tests.query_budget import QueryBudgetMixin
+from unittest import mock
+import gzip
+import json
+import unittest
+
+
+class TestCompression(QueryBudgetMixin, unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            for i in range(30):
+                db.session.add(Mechanic(name=f"Mechanic {i}", email=f"mechanic{i}@email.com",
+                                        phone="555-000-0000", salary=50000.0))
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def test_gzip_above_threshold(self):
+        """Test that a large list is gzipped and decodes to the plain body"""
+        plain = self.client.get('/mechanics/')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertIn('Accept-Encoding', plain.headers['Vary'])
+
+        response = self.client.get('/mechanics/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(json.loads(gzip.decompress(response.data)), plain.get_json())
+        self.assertEqual(response.headers['Content-Length'], str(len(response.data)))
+        # Each encoding is its own representation
+        self.assertEqual(response.headers['ETag'], plain.headers['ETag'][:-1] + '-gzip"')
+
+    @unittest.skipIf(compression.brotli is None, "brotli is not installed")
+    def test_brotli_preferred(self):
+        """Test that brotli wins when the client accepts both"""
+        response = self.client.get('/mechanics/', headers={'Accept-Encoding': 'gzip, deflate, br'})
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        response = self.client.get('/mechanics/', headers={'Accept-Encoding': 'gzip;q=1, br;q=0.5'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+
+    def test_below_threshold_not_compressed(self):
+        """Test that small bodies and a raised threshold skip compression"""
+        response = self.client.get('/mechanics/1', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+        self.app.config['COMPRESS_MIN_SIZE'] = 10 ** 6
+        response = self.client.get('/mechanics/', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_level_configurable(self):
+        """Test that COMPRESS_LEVEL is passed to the encoder"""
+        self.app.config['COMPRESS_LEVEL'] = 1
+        with mock.patch.object(compression, 'encode', wraps=compression.encode) as encode:
+            self.client.get('/mechanics/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(encode.call_args.args[1:], ('gzip', 1))
+
+    def test_cache_stores_compressed_bytes(self):
+        """Test that a cache hit serves the stored bytes without compressing again"""
+        with mock.patch.object(compression, 'encode', wraps=compression.encode) as encode:
+            first = self.client.get('/mechanics/', headers={'Accept-Encoding': 'gzip'})
+            with self.assertMaxQueries(0):
+                second = self.client.get('/mechanics/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(encode.call_count, 1)
+        self.assertEqual(second.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(second.data, first.data)
+
+        # Identity clients get their own entry, not the gzipped one
+        plain = self.client.get('/mechanics/')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertIsInstance(plain.get_json(), list)
+
+    def test_revalidate_compressed_copy(self):
+        """Test that the -gzip ETag revalidates from the cache and from table versions"""
+        etag = self.client.get('/mechanics/', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+        headers = {'Accept-Encoding': 'gzip', 'If-None-Match': etag}
+
+        response = self.client.get('/mechanics/', headers=headers)
+        self.assertEqual(response.status_code, 304)
+
+        with self.app.app_context():
+            cache.clear()
+        response = self.client.get('/mechanics/', headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
@@ -0,0 +1,99 @@
+from app import create_app
+from app.extensions import cache
+from app.models import db, Customer, Mechanic, ServiceTicket
+from datetime import datetime
+from tests.query_budget import QueryBudgetMixin
+import unittest
+
+
+class TestConditionalRequests(QueryBudgetMixin, unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.add(Customer(name="Customer", email="customer@email.com",
+                                    phone="555-123-4567", password="testpassword"))
+            db.session.add(Mechanic(name="Mechanic", email="mechanic@email.com",
+                                    phone="555-000-0000", salary=50000.0))
+            db.session.add(ServiceTicket(VIN="1234567890ABCDEFG", service_date=datetime(2024, 1, 15),
+                                         service_desc="Oil change", customer_id=1))
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def _clear_cache(self):
+        with self.app.app_context():
+            cache.clear()
+
+    def test_list_not_modified(self):
+        """Test that a list revalidates to a 304 without loading any rows"""
+        response = self.client.get('/mechanics/')
+        etag = response.headers['ETag']
+        self.assertIn('no-cache', response.headers['Cache-Control'])
+        self.assertIn('Last-Modified', response.headers)
+
+        # Served from the response cache
+        with self.assertMaxQueries(0):
+            response = self.client.get('/mechanics/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+        # Cache cold: only the table_version lookup runs
+        self._clear_cache()
+        with self.assertMaxQueries(1):
+            response = self.client.get('/mechanics/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+
+    def test_list_etag_changes_on_write(self):
+        """Test that updates, inserts and deletes all change the list ETag"""
+        etags = [self.client.get('/mechanics/').headers['ETag']]
+
+        self.client.put('/mechanics/1', json={"name": "Renamed", "email": "mechanic@email.com",
+                                              "phone": "555-000-0000", "salary": 50000.0})
+        etags.append(self.client.get('/mechanics/').headers['ETag'])
+
+        self.client.post('/mechanics/', json={"name": "Second", "email": "second@email.com",
+                                              "phone": "555-000-0001", "salary": 50000.0})
+        etags.append(self.client.get('/mechanics/').headers['ETag'])
+
+        self.client.delete('/mechanics/2')
+        etags.append(self.client.get('/mechanics/').headers['ETag'])
+
+        self.assertEqual(len(set(etags)), 4)
+        response = self.client.get('/mechanics/', headers={'If-None-Match': etags[0]})
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_included_tables(self):
+        """Test that an assignment only changes ticket ETags that include mechanics"""
+        plain = self.client.get('/service_tickets/').headers['ETag']
+        with_mechanics = self.client.get('/service_tickets/?include=mechanics').headers['ETag']
+        self.assertNotEqual(plain, with_mechanics)
+
+        self.client.put('/service_tickets/1/assign-mechanic/1')
+        self._clear_cache()
+
+        response = self.client.get('/service_tickets/?include=mechanics', headers={'If-None-Match': with_mechanics})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/service_tickets/', headers={'If-None-Match': plain})
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_not_modified(self):
+        """Test row validators on a detail route, by ETag and by date"""
+        response = self.client.get('/mechanics/1')
+        etag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+
+        with self.assertMaxQueries(1):
+            response = self.client.get('/mechanics/1', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get('/mechanics/1', headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+        # Another row never shares the ETag
+        self.assertNotEqual(self.client.get('/customers/1').headers['ETag'], etag)
+
+        self.client.put('/mechanics/1', json={"name": "Renamed", "email": "mechanic@email.com",
+                                              "phone": "555-000-0000", "salary": 50000.0})
+        response = self.client.get('/mechanics/1', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['name'], "Renamed")
+        self.assertIn('updated_at', response.get_json())
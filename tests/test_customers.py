@@ -1,11 +1,12 @@
 from app import create_app
-from app.models import db, Customer
+from app.models import db, Customer, ServiceTicket
 from app.utils.util import encode_token
 from datetime import datetime
+from tests.query_budget import QueryBudgetMixin
 import unittest
 
 
-class TestCustomers(unittest.TestCase):
+class TestCustomers(QueryBudgetMixin, unittest.TestCase):
     def setUp(self):
         self.app = create_app("TestingConfig")
         with self.app.app_context():
@@ -34,7 +35,8 @@ class TestCustomers(unittest.TestCase):
             "password": "password123"
         }
 
-        response = self.client.post('/customers/', json=customer_payload)
+        with self.assertMaxQueries(4):
+            response = self.client.post('/customers/', json=customer_payload)
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.get_json()['name'], "John Doe")
         self.assertEqual(response.get_json()['email'], "johndoe@email.com")
@@ -48,7 +50,8 @@ class TestCustomers(unittest.TestCase):
             # Missing email field
         }
 
-        response = self.client.post('/customers/', json=customer_payload)
+        with self.assertMaxQueries(0):
+            response = self.client.post('/customers/', json=customer_payload)
         self.assertEqual(response.status_code, 400)
 
     def test_duplicate_email_creation(self):
@@ -60,25 +63,74 @@ class TestCustomers(unittest.TestCase):
             "password": "password123"
         }
 
-        response = self.client.post('/customers/', json=customer_payload)
+        with self.assertMaxQueries(1):
+            response = self.client.post('/customers/', json=customer_payload)
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.get_json()['error'], "Email already exists")
 
     def test_get_customers(self):
         """Test retrieving all customers"""
-        response = self.client.get('/customers/')
+        with self.assertMaxQueries(2):
+            response = self.client.get('/customers/')
         self.assertEqual(response.status_code, 200)
         self.assertTrue(isinstance(response.get_json(), list))
 
+    def test_get_customers_keyset_pagination(self):
+        """Test walking customer pages with the next cursor"""
+        with self.app.app_context():
+            for i in range(3):
+                db.session.add(Customer(name=f"User {i}", email=f"user{i}@email.com",
+                                        phone="555-000-0000", password="password"))
+            db.session.commit()
+
+        with self.assertMaxQueries(2):
+            response = self.client.get('/customers/?per_page=3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['id'] for c in response.get_json()], [1, 2, 3])
+        cursor = response.headers['X-Next-Cursor']
+
+        with self.assertMaxQueries(2):
+            response = self.client.get(f'/customers/?per_page=3&after={cursor}')
+        self.assertEqual([c['id'] for c in response.get_json()], [4])
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_get_customers_invalid_cursor(self):
+        """Test retrieving customers with a malformed cursor"""
+        with self.assertMaxQueries(1):
+            response = self.client.get('/customers/?after=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_customers_cache_invalidated_on_write(self):
+        """Test that cached customer pages are keyed on the query string and dropped on writes"""
+        first = self.client.get('/customers/?per_page=1&page=1').get_json()
+        second = self.client.get('/customers/?per_page=1&page=2').get_json()
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second, [])
+        with self.assertMaxQueries(0):
+            self.client.get('/customers/?per_page=1&page=1')
+
+        customer_payload = {
+            "name": "John Doe",
+            "email": "johndoe@email.com",
+            "phone": "555-123-4567",
+            "password": "password123"
+        }
+        self.client.post('/customers/', json=customer_payload)
+
+        second = self.client.get('/customers/?page=2&per_page=1').get_json()
+        self.assertEqual(second[0]['name'], "John Doe")
+
     def test_get_customer_by_id(self):
         """Test retrieving a specific customer by ID"""
-        response = self.client.get('/customers/1')
+        with self.assertMaxQueries(1):
+            response = self.client.get('/customers/1')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['name'], "Test User")
 
     def test_get_nonexistent_customer(self):
         """Test retrieving a customer that doesn't exist"""
-        response = self.client.get('/customers/999')
+        with self.assertMaxQueries(1):
+            response = self.client.get('/customers/999')
         self.assertEqual(response.status_code, 404)
 
     def test_login_customer(self):
@@ -88,7 +140,8 @@ class TestCustomers(unittest.TestCase):
             "password": "testpassword"
         }
 
-        response = self.client.post('/customers/login', json=credentials)
+        with self.assertMaxQueries(1):
+            response = self.client.post('/customers/login', json=credentials)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['status'], 'success')
         self.assertIn('auth_token', response.get_json())
@@ -101,7 +154,8 @@ class TestCustomers(unittest.TestCase):
             "password": "wrongpassword"
         }
 
-        response = self.client.post('/customers/login', json=credentials)
+        with self.assertMaxQueries(1):
+            response = self.client.post('/customers/login', json=credentials)
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.get_json()['messages'], "Invalid username or password")
 
@@ -113,7 +167,8 @@ class TestCustomers(unittest.TestCase):
         }
 
         headers = {'Authorization': "Bearer " + self.test_login_customer()}
-        response = self.client.put('/customers/1', json=update_payload, headers=headers)
+        with self.assertMaxQueries(4):
+            response = self.client.put('/customers/1', json=update_payload, headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['name'], 'Updated Name')
         self.assertEqual(response.get_json()['phone'], '999-888-7777')
@@ -125,7 +180,8 @@ class TestCustomers(unittest.TestCase):
         }
 
         headers = {'Authorization': "Bearer " + self.test_login_customer()}
-        response = self.client.put('/customers/2', json=update_payload, headers=headers)
+        with self.assertMaxQueries(0):
+            response = self.client.put('/customers/2', json=update_payload, headers=headers)
         self.assertEqual(response.status_code, 403)
 
     def test_update_customer_no_token(self):
@@ -134,29 +190,76 @@ class TestCustomers(unittest.TestCase):
             "name": "Updated Name"
         }
 
-        response = self.client.put('/customers/1', json=update_payload)
+        with self.assertMaxQueries(0):
+            response = self.client.put('/customers/1', json=update_payload)
         self.assertEqual(response.status_code, 401)
 
     def test_delete_customer(self):
         """Test deleting a customer"""
         headers = {'Authorization': "Bearer " + self.test_login_customer()}
-        response = self.client.delete('/customers/1', headers=headers)
+        with self.assertMaxQueries(4):
+            response = self.client.delete('/customers/1', headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['message'], "Customer deleted successfully")
 
     def test_delete_customer_unauthorized(self):
         """Test deleting customer without proper authorization"""
         headers = {'Authorization': "Bearer " + self.test_login_customer()}
-        response = self.client.delete('/customers/2', headers=headers)
+        with self.assertMaxQueries(0):
+            response = self.client.delete('/customers/2', headers=headers)
         self.assertEqual(response.status_code, 403)
 
     def test_get_my_tickets(self):
         """Test retrieving customer's service tickets"""
         headers = {'Authorization': "Bearer " + self.test_login_customer()}
-        response = self.client.get('/customers/my-tickets', headers=headers)
+        with self.assertMaxQueries(1):
+            response = self.client.get('/customers/my-tickets', headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertTrue(isinstance(response.get_json(), list))
 
+    def _add_customers_with_tickets(self, count):
+        with self.app.app_context():
+            start = db.session.query(Customer).count()
+            for i in range(start, start + count):
+                db.session.add(Customer(name=f"User {i}", email=f"user{i}@email.com",
+                                        phone="555-000-0000", password="password"))
+                db.session.add(ServiceTicket(VIN="1234567890ABCDEFG", service_date=datetime(2024, 1, 15),
+                                             service_desc="Oil change", customer_id=1))
+            db.session.commit()
+
+    def test_list_query_counts_constant(self):
+        """Test that customer lists cost the same number of queries at any size"""
+        headers = {'Authorization': "Bearer " + self.token}
+        self.assertConstantQueries(lambda: self.client.get('/customers/?per_page=50'),
+                                   lambda: self._add_customers_with_tickets(20))
+        self.assertConstantQueries(lambda: self.client.get('/customers/my-tickets', headers=headers),
+                                   lambda: self._add_customers_with_tickets(20))
+
+    def test_bulk_import_csv(self):
+        """Test a CSV customer upload, including a taken email"""
+        body = ("name,email,phone,password\n"
+                "Ana,ana@email.com,555-000-0001,pw1\n"
+                "Dup,test@email.com,555-000-0002,pw2\n"
+                "Bo,bo@email.com,555-000-0003,pw3\n")
+        with self.assertMaxQueries(3):
+            response = self.client.post('/customers/bulk', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        report = response.get_json()
+        self.assertEqual((report['received'], report['inserted']), (3, 2))
+        self.assertEqual(report['errors'], [{"index": 1, "errors": {"email": ["Email already exists"]}}])
+        self.assertEqual(self.client.post('/customers/login', json={"email": "bo@email.com", "password": "pw3"}).status_code, 200)
+
+    def test_bulk_import_shares_create_limit(self):
+        """Test that single and bulk customer creates draw on one rate-limit bucket"""
+        for i in range(5):
+            body = {"name": f"C{i}", "email": f"c{i}@email.com", "phone": "555", "password": "pw"}
+            self.assertEqual(self.client.post('/customers/', json=body).status_code, 201)
+        rows = [{"name": "Ana", "email": "ana@email.com", "phone": "555", "password": "pw"}]
+        self.assertEqual(self.client.post('/customers/bulk', json=rows).status_code, 201)
+        self.assertEqual(self.client.post('/customers/bulk', json=rows).status_code, 429)
+        body = {"name": "Late", "email": "late@email.com", "phone": "555", "password": "pw"}
+        self.assertEqual(self.client.post('/customers/', json=body).status_code, 429)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,118 @@
+from app import create_app
+from app.models import db, Customer, Mechanic, Inventory, ServiceTicket, ServiceMechanic, ServicePart
+from app.utils.caching import reset_cache_stats
+from app.utils.db_pool import pool_metrics
+from app.utils import query_plans
+from app.utils.query_plans import UnsupportedDialect
+from datetime import datetime
+from unittest import mock
+import unittest
+
+
+class TestInternal(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+        reset_cache_stats()
+        self.client = self.app.test_client()
+
+    def test_cache_stats(self):
+        """Test that cache hits and misses are counted per endpoint"""
+        self.client.get('/mechanics/')
+        self.client.get('/mechanics/')
+
+        response = self.client.get('/internal/cache')
+        self.assertEqual(response.status_code, 200)
+        stats = response.get_json()
+        self.assertEqual(stats['backend'], 'SimpleCache')
+        self.assertEqual(stats['endpoints']['mechanics.get_mechanics'], {"hits": 1, "misses": 1})
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_internal_endpoints_gated(self):
+        """Test that operational endpoints are hidden unless enabled and need the token when one is set"""
+        for url in ('/internal/cache', '/internal/pool'):
+            self.app.config.update(INTERNAL_ENDPOINTS=False, INTERNAL_TOKEN=None)
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+            self.app.config.update(INTERNAL_ENDPOINTS=True, INTERNAL_TOKEN='s3cret')
+            self.assertEqual(self.client.get(url).status_code, 401, url)
+            response = self.client.get(url, headers={'Authorization': 'Bearer wrong'})
+            self.assertEqual(response.status_code, 401, url)
+            response = self.client.get(url, headers={'Authorization': 'Bearer s3cret'})
+            self.assertEqual(response.status_code, 200, url)
+
+    def test_pool_stats(self):
+        """Test that pool checkouts are counted and timed"""
+        pool_metrics.reset()
+        self.client.get('/mechanics/1')
+
+        response = self.client.get('/internal/pool')
+        self.assertEqual(response.status_code, 200)
+        stats = response.get_json()
+        self.assertEqual(stats['pool_class'], 'InstrumentedQueuePool')
+        self.assertGreaterEqual(stats['checkouts'], 1)
+        self.assertGreaterEqual(stats['checkout_ms']['count'], 1)
+        self.assertEqual(sum(stats['checkout_ms']['buckets'].values()), stats['checkout_ms']['count'])
+        self.assertEqual(stats['checked_out'], 0)
+
+    def _seed(self):
+        with self.app.app_context():
+            db.session.add(Customer(name="Customer", email="customer@email.com",
+                                    phone="555-000-0000", password="password"))
+            db.session.add(Mechanic(name="Mechanic", email="mechanic@email.com",
+                                    phone="555-000-0000", salary=50000.0))
+            db.session.add(Inventory(name="Brake Pad", price=45.99))
+            db.session.add(ServiceTicket(VIN="1234567890ABCDEFG", service_date=datetime(2024, 1, 15),
+                                         service_desc="Brake repair", customer_id=1))
+            db.session.flush()
+            db.session.add(ServiceMechanic(ticket_id=1, mechanic_id=1))
+            db.session.add(ServicePart(service_ticket_id=1, inventory_id=1))
+            db.session.commit()
+
+    def test_check_queries_passes(self):
+        """Test that every probed query is served from an index"""
+        self._seed()
+        result = self.app.test_cli_runner().invoke(args=['internal', 'check-queries'])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+    def test_check_queries_flags_missing_index(self):
+        """Test that dropping a hot index makes the check fail"""
+        self._seed()
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql("DROP INDEX ix_service_ticket_customer_id")
+        result = self.app.test_cli_runner().invoke(args=['internal', 'check-queries'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("FULL SCAN of service_ticket in /customers/my-tickets", result.output)
+
+    def test_check_queries_ignores_cached_responses(self):
+        """Test that a warm response cache doesn't hide a listing's queries from the check"""
+        self._seed()
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                connection.exec_driver_sql('DROP INDEX "ix_service_ticket_VIN"')
+        self.client.get('/service_tickets/?vin=1HGCM82633A004352')
+        result = self.app.test_cli_runner().invoke(args=['internal', 'check-queries'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("FULL SCAN of service_ticket in /service_tickets/?vin=1HGCM82633A004352", result.output)
+
+    def test_check_queries_flags_probe_without_queries(self):
+        """Test that a probe which issues no SELECT fails instead of passing vacuously"""
+        with mock.patch.object(query_plans, 'PROBES', (('/customers/abc', set()),)):
+            result = self.app.test_cli_runner().invoke(args=['internal', 'check-queries'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("NO QUERIES captured for /customers/abc", result.output)
+
+    def test_check_queries_unsupported_database(self):
+        """Test that a database without EXPLAIN support is reported without a traceback"""
+        with self.app.app_context(), mock.patch.object(db.engine.dialect, 'name', 'oracle'):
+            result = self.app.test_cli_runner().invoke(args=['internal', 'check-queries'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Error: No EXPLAIN support for oracle", result.output)
+        self.assertNotIsInstance(result.exception, UnsupportedDialect)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,10 @@
 from app import create_app
 from app.models import db, Inventory
+from tests.query_budget import QueryBudgetMixin
 import unittest
 
 
-class TestInventory(unittest.TestCase):
+class TestInventory(QueryBudgetMixin, unittest.TestCase):
     def setUp(self):
         self.app = create_app("TestingConfig")
         with self.app.app_context():
@@ -27,7 +28,8 @@ class TestInventory(unittest.TestCase):
             "price": 45.99
         }
 
-        response = self.client.post('/inventory/', json=part_payload)
+        with self.assertMaxQueries(3):
+            response = self.client.post('/inventory/', json=part_payload)
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.get_json()['name'], "Brake Pad")
         self.assertEqual(response.get_json()['price'], 45.99)
@@ -39,24 +41,28 @@ class TestInventory(unittest.TestCase):
             # Missing price field
         }
 
-        response = self.client.post('/inventory/', json=part_payload)
+        with self.assertMaxQueries(0):
+            response = self.client.post('/inventory/', json=part_payload)
         self.assertEqual(response.status_code, 400)
 
     def test_get_inventory(self):
         """Test retrieving all inventory parts"""
-        response = self.client.get('/inventory/')
+        with self.assertMaxQueries(2):
+            response = self.client.get('/inventory/')
         self.assertEqual(response.status_code, 200)
         self.assertTrue(isinstance(response.get_json(), list))
 
     def test_get_inventory_by_id(self):
         """Test retrieving a specific inventory part by ID"""
-        response = self.client.get('/inventory/1')
+        with self.assertMaxQueries(1):
+            response = self.client.get('/inventory/1')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['name'], "Test Part")
 
     def test_get_nonexistent_inventory(self):
         """Test retrieving an inventory part that doesn't exist"""
-        response = self.client.get('/inventory/999')
+        with self.assertMaxQueries(1):
+            response = self.client.get('/inventory/999')
         self.assertEqual(response.status_code, 404)
 
     def test_update_inventory(self):
@@ -66,7 +72,8 @@ class TestInventory(unittest.TestCase):
             "price": 35.99
         }
 
-        response = self.client.put('/inventory/1', json=update_payload)
+        with self.assertMaxQueries(4):
+            response = self.client.put('/inventory/1', json=update_payload)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['name'], 'Updated Part')
         self.assertEqual(response.get_json()['price'], 35.99)
@@ -77,20 +84,62 @@ class TestInventory(unittest.TestCase):
             "name": "Updated Part"
         }
 
-        response = self.client.put('/inventory/999', json=update_payload)
+        with self.assertMaxQueries(1):
+            response = self.client.put('/inventory/999', json=update_payload)
         self.assertEqual(response.status_code, 404)
 
     def test_delete_inventory(self):
         """Test deleting an inventory part"""
-        response = self.client.delete('/inventory/1')
+        with self.assertMaxQueries(4):
+            response = self.client.delete('/inventory/1')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['message'], "Part deleted successfully")
 
     def test_delete_nonexistent_inventory(self):
         """Test deleting an inventory part that doesn't exist"""
-        response = self.client.delete('/inventory/999')
+        with self.assertMaxQueries(1):
+            response = self.client.delete('/inventory/999')
         self.assertEqual(response.status_code, 404)
 
+    def test_list_query_counts_constant(self):
+        """Test that the inventory list costs the same number of queries at any size"""
+        def add_parts():
+            with self.app.app_context():
+                db.session.add_all(Inventory(name=f"Part {i}", price=9.99) for i in range(20))
+                db.session.commit()
+        self.assertConstantQueries(lambda: self.client.get('/inventory/'), add_parts)
+
+    def test_bulk_import_json(self):
+        """Test that valid rows go in and invalid ones come back by index"""
+        rows = [{"name": "Brake Pad", "price": 45.99}, {"name": "No Price"},
+                {"name": "Filter", "price": "cheap"}, "not an object", {"name": "Bolt", "price": 1}]
+        with self.assertMaxQueries(2):
+            response = self.client.post('/inventory/bulk', json=rows)
+        self.assertEqual(response.status_code, 200)
+        report = response.get_json()
+        self.assertEqual((report['received'], report['inserted']), (5, 2))
+        self.assertEqual([error['index'] for error in report['errors']], [1, 2, 3])
+        self.assertIn('price', report['errors'][0]['errors'])
+        names = [part['name'] for part in self.client.get('/inventory/').get_json()]
+        self.assertEqual(names, ["Test Part", "Brake Pad", "Bolt"])
+
+    def test_bulk_import_csv_chunked(self):
+        """Test a CSV upload larger than a chunk costs a fixed number of statements per chunk"""
+        self.app.config['BULK_CHUNK_SIZE'] = 100
+        body = "name,price\n" + "".join(f"Part {i},{i}.5\n" for i in range(250))
+        with self.assertMaxQueries(6):
+            response = self.client.post('/inventory/bulk', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json(), {"received": 250, "inserted": 250, "errors": []})
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Inventory, 251).price, 249.5)
+
+    def test_bulk_import_bad_body(self):
+        """Test that a body that isn't an array or CSV is rejected outright"""
+        with self.assertMaxQueries(0):
+            response = self.client.post('/inventory/bulk', json={"name": "Brake Pad", "price": 1})
+        self.assertEqual(response.status_code, 400)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,11 @@
 from app import create_app
-from app.models import db, Mechanic
+from app.models import db, Mechanic, Customer, ServiceTicket, ServiceMechanic
+from datetime import datetime
+from tests.query_budget import QueryBudgetMixin
 import unittest
 
 
-class TestMechanics(unittest.TestCase):
+class TestMechanics(QueryBudgetMixin, unittest.TestCase):
     def setUp(self):
         self.app = create_app("TestingConfig")
         with self.app.app_context():
@@ -31,7 +33,8 @@ class TestMechanics(unittest.TestCase):
             "salary": 55000.0
         }
 
-        response = self.client.post('/mechanics/', json=mechanic_payload)
+        with self.assertMaxQueries(3):
+            response = self.client.post('/mechanics/', json=mechanic_payload)
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.get_json()['name'], "Jane Smith")
 
@@ -44,24 +47,28 @@ class TestMechanics(unittest.TestCase):
             # Missing email field
         }
 
-        response = self.client.post('/mechanics/', json=mechanic_payload)
+        with self.assertMaxQueries(0):
+            response = self.client.post('/mechanics/', json=mechanic_payload)
         self.assertEqual(response.status_code, 400)
 
     def test_get_mechanics(self):
         """Test retrieving all mechanics"""
-        response = self.client.get('/mechanics/')
+        with self.assertMaxQueries(2):
+            response = self.client.get('/mechanics/')
         self.assertEqual(response.status_code, 200)
         self.assertTrue(isinstance(response.get_json(), list))
 
     def test_get_mechanic_by_id(self):
         """Test retrieving a specific mechanic by ID"""
-        response = self.client.get('/mechanics/1')
+        with self.assertMaxQueries(1):
+            response = self.client.get('/mechanics/1')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['name'], "Test Mechanic")
 
     def test_get_nonexistent_mechanic(self):
         """Test retrieving a mechanic that doesn't exist"""
-        response = self.client.get('/mechanics/999')
+        with self.assertMaxQueries(1):
+            response = self.client.get('/mechanics/999')
         self.assertEqual(response.status_code, 404)
 
     def test_update_mechanic(self):
@@ -71,7 +78,8 @@ class TestMechanics(unittest.TestCase):
             "salary": 60000.0
         }
 
-        response = self.client.put('/mechanics/1', json=update_payload)
+        with self.assertMaxQueries(4):
+            response = self.client.put('/mechanics/1', json=update_payload)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['name'], 'Updated Mechanic')
         self.assertEqual(response.get_json()['salary'], 60000.0)
@@ -82,26 +90,141 @@ class TestMechanics(unittest.TestCase):
             "name": "Updated Mechanic"
         }
 
-        response = self.client.put('/mechanics/999', json=update_payload)
+        with self.assertMaxQueries(1):
+            response = self.client.put('/mechanics/999', json=update_payload)
         self.assertEqual(response.status_code, 404)
 
     def test_delete_mechanic(self):
         """Test deleting a mechanic"""
-        response = self.client.delete('/mechanics/1')
+        with self.assertMaxQueries(4):
+            response = self.client.delete('/mechanics/1')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.get_json()['message'], "Mechanic deleted successfully")
 
     def test_delete_nonexistent_mechanic(self):
         """Test deleting a mechanic that doesn't exist"""
-        response = self.client.delete('/mechanics/999')
+        with self.assertMaxQueries(1):
+            response = self.client.delete('/mechanics/999')
         self.assertEqual(response.status_code, 404)
 
     def test_most_active_mechanics(self):
         """Test getting most active mechanics"""
-        response = self.client.get('/mechanics/most-active')
+        with self.assertMaxQueries(2):
+            response = self.client.get('/mechanics/most-active')
         self.assertEqual(response.status_code, 200)
         self.assertTrue(isinstance(response.get_json(), list))
 
+    def _add_ticket(self):
+        ticket_payload = {
+            "VIN": "1234567890ABCDEFG",
+            "service_date": "2024-01-15T10:00:00",
+            "service_desc": "Oil change",
+            "customer_id": 1
+        }
+        return self.client.post('/service_tickets/', json=ticket_payload).get_json()['id']
+
+    def test_most_active_mechanics_counts_maintained(self):
+        """Test that assignment changes reorder most-active and limit trims it"""
+        with self.app.app_context():
+            db.session.add(Customer(name="Customer", email="customer@email.com",
+                                    phone="555-000-0000", password="password"))
+            db.session.add(Mechanic(name="Busy Mechanic", email="busy@email.com",
+                                    phone="555-000-0000", salary=45000.0))
+            db.session.commit()
+        first, second = self._add_ticket(), self._add_ticket()
+        self.client.put(f'/service_tickets/{first}/assign-mechanic/2')
+        self.client.put(f'/service_tickets/{second}/edit', json={"add_ids": [1, 2]})
+
+        with self.assertMaxQueries(2):
+            response = self.client.get('/mechanics/most-active?limit=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([m['id'] for m in response.get_json()], [2])
+
+        self.client.put(f'/service_tickets/{first}/remove-mechanic/2')
+        self.client.put(f'/service_tickets/{second}/edit', json={"remove_ids": [2]})
+        self.client.put(f'/service_tickets/{first}/assign-mechanic/1')
+        response = self.client.get('/mechanics/most-active')
+        self.assertEqual([m['id'] for m in response.get_json()], [1, 2])
+        self.assertEqual(self.client.get('/mechanics/most-active?limit=0').status_code, 400)
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Mechanic, 1).ticket_count, 2)
+            self.assertEqual(db.session.get(Mechanic, 2).ticket_count, 0)
+
+    def test_ticket_counts_applied_as_deltas(self):
+        """Test that counts move by the rows each write changed, so repeats and no-ops add nothing"""
+        with self.app.app_context():
+            db.session.add(Customer(name="Customer", email="customer@email.com",
+                                    phone="555-000-0000", password="password"))
+            # An offset a recount would erase; deltas keep it
+            db.session.get(Mechanic, 1).ticket_count = 10
+            db.session.commit()
+        ticket = self._add_ticket()
+
+        def count():
+            with self.app.app_context():
+                return db.session.get(Mechanic, 1).ticket_count
+
+        self.client.put(f'/service_tickets/{ticket}/assign-mechanic/1')
+        self.client.put(f'/service_tickets/{ticket}/assign-mechanic/1')
+        self.assertEqual(count(), 11)
+        self.client.put(f'/service_tickets/{ticket}/edit', json={"add_ids": [1]})
+        self.assertEqual(count(), 11)
+        self.client.put(f'/service_tickets/{ticket}/edit', json={"remove_ids": [1, 1]})
+        self.assertEqual(count(), 10)
+        self.client.put(f'/service_tickets/{ticket}/remove-mechanic/1')
+        self.assertEqual(count(), 10)
+        self.client.put(f'/service_tickets/{ticket}/edit', json={"add_ids": [1]})
+        self.assertEqual(count(), 11)
+
+    def _add_assignments(self, count):
+        with self.app.app_context():
+            if not db.session.get(Customer, 1):
+                db.session.add(Customer(name="Customer", email="customer@email.com",
+                                        phone="555-000-0000", password="password"))
+            start = db.session.query(Mechanic).count()
+            for i in range(start, start + count):
+                mechanic = Mechanic(name=f"Mechanic {i}", email=f"mechanic{i}@email.com",
+                                    phone="555-000-0000", salary=50000.0, ticket_count=1)
+                ticket = ServiceTicket(VIN="1234567890ABCDEFG", service_date=datetime(2024, 1, 15),
+                                       service_desc="Oil change", customer_id=1)
+                db.session.add_all([mechanic, ticket])
+                db.session.flush()
+                db.session.add(ServiceMechanic(ticket_id=ticket.id, mechanic_id=mechanic.id))
+            db.session.commit()
+
+    def test_list_query_counts_constant(self):
+        """Test that mechanic lists cost the same number of queries at any size"""
+        self.assertConstantQueries(lambda: self.client.get('/mechanics/'),
+                                   lambda: self._add_assignments(20))
+        self.assertConstantQueries(lambda: self.client.get('/mechanics/most-active?limit=10'),
+                                   lambda: self._add_assignments(20))
+
+    def test_reconcile_counts_command(self):
+        """Test rebuilding ticket counts from the assignment table"""
+        with self.app.app_context():
+            db.session.get(Mechanic, 1).ticket_count = 42
+            db.session.commit()
+        result = self.app.test_cli_runner().invoke(args=['mechanics', 'reconcile-counts'])
+        self.assertEqual(result.exit_code, 0)
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Mechanic, 1).ticket_count, 0)
+
+    def test_bulk_import_duplicate_emails(self):
+        """Test that emails already taken, in the table or earlier in the upload, are per-row errors"""
+        self.app.config['BULK_CHUNK_SIZE'] = 2
+        rows = [{"name": f"Mechanic {i}", "email": email, "phone": "555-000-0000", "salary": 50000.0}
+                for i, email in enumerate(["new1@email.com", "mechanic@email.com", "new2@email.com", "new1@email.com"])]
+        response = self.client.post('/mechanics/bulk', json=rows)
+        self.assertEqual(response.status_code, 200)
+        report = response.get_json()
+        self.assertEqual(report['inserted'], 2)
+        self.assertEqual(report['errors'], [
+            {"index": 1, "errors": {"email": ["Email already exists"]}},
+            {"index": 3, "errors": {"email": ["Email already exists"]}},
+        ])
+        self.assertEqual(len(self.client.get('/mechanics/').get_json()), 3)
+
 
 if __name__ == '__main__':
     unittest.main()
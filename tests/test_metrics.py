@@ -0,0 +1,71 @@
+from app import create_app
+from app.models import db, Mechanic
+from prometheus_client import REGISTRY
+import unittest
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.add(Mechanic(name="Mechanic", email="mechanic@email.com",
+                                    phone="555-000-0000", salary=50000.0))
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def test_request_metrics(self):
+        """Test that requests are counted and timed per endpoint"""
+        labels = {'endpoint': 'mechanics.get_mechanic', 'method': 'GET'}
+        requests = sample('http_requests_total', status='200', **labels)
+        latencies = sample('http_request_duration_seconds_count', **labels)
+        sizes = sample('http_response_size_bytes_count', endpoint='mechanics.get_mechanic')
+
+        self.client.get('/mechanics/1')
+        self.client.get('/mechanics/1')
+        self.client.get('/mechanics/2')
+
+        self.assertEqual(sample('http_requests_total', status='200', **labels), requests + 2)
+        self.assertEqual(sample('http_request_duration_seconds_count', **labels), latencies + 3)
+        self.assertEqual(sample('http_response_size_bytes_count', endpoint='mechanics.get_mechanic'), sizes + 3)
+
+    def test_cache_and_rate_limit_metrics(self):
+        """Test that cache lookups and limiter rejections are counted"""
+        hits = sample('cache_requests_total', endpoint='mechanics.get_mechanics', result='hit')
+        misses = sample('cache_requests_total', endpoint='mechanics.get_mechanics', result='miss')
+        rejected = sample('rate_limit_rejections_total', endpoint='customers.add_customer')
+
+        self.client.get('/mechanics/')
+        self.client.get('/mechanics/')
+        for _ in range(7):
+            response = self.client.post('/customers/', json={})
+        self.assertEqual(response.status_code, 429)
+
+        self.assertEqual(sample('cache_requests_total', endpoint='mechanics.get_mechanics', result='hit'), hits + 1)
+        self.assertEqual(sample('cache_requests_total', endpoint='mechanics.get_mechanics', result='miss'), misses + 1)
+        self.assertEqual(sample('rate_limit_rejections_total', endpoint='customers.add_customer'), rejected + 1)
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics serves the Prometheus text format"""
+        self.client.get('/mechanics/1')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        body = response.get_data(as_text=True)
+        self.assertIn('http_request_duration_seconds_bucket{endpoint="mechanics.get_mechanic",le="0.005",method="GET"}', body)
+        self.assertIn('# TYPE http_requests_total counter', body)
+
+    def test_metrics_endpoint_gated(self):
+        """Test that /metrics is hidden unless enabled and needs the internal token when one is set"""
+        self.app.config['INTERNAL_ENDPOINTS'] = False
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+        self.app.config.update(INTERNAL_ENDPOINTS=True, INTERNAL_TOKEN='s3cret')
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
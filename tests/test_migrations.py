@@ -0,0 +1,62 @@
+from app import create_app
+from app.models import db, utcnow
+from datetime import datetime, timedelta
+from flask_migrate import upgrade, downgrade
+from sqlalchemy import text
+from unittest import mock
+import config
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        # A database of its own, built by the migrations instead of create_all()
+        self.directory = tempfile.mkdtemp()
+        uri = f"sqlite:///{os.path.join(self.directory, 'migrations.db')}"
+        with mock.patch.object(config.TestingConfig, 'SQLALCHEMY_DATABASE_URI', uri):
+            self.app = create_app("TestingConfig")
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def _execute(self, statement):
+        return db.session.execute(text(statement))
+
+    def test_upgrade_populated_database(self):
+        """Test that a database with rows at 0003 upgrades to head and back"""
+        with self.app.app_context():
+            upgrade(revision='0003')
+            self._execute("INSERT INTO customer (name, email, phone, password) "
+                          "VALUES ('Alex Brakeman', 'alex@email.com', '555-123-4567', 'x')")
+            self._execute("INSERT INTO mechanic (name, email, phone, salary, ticket_count) "
+                          "VALUES ('Sam', 'sam@email.com', '555-987-6543', 50000, 1)")
+            self._execute("INSERT INTO inventory (name, price) VALUES ('Brake Pad', 45.99)")
+            self._execute('INSERT INTO service_ticket ("VIN", service_date, service_desc, customer_id) '
+                          "VALUES ('1234567890ABCDEFG', '2024-01-15 00:00:00', 'Brake repair', 1)")
+            self._execute("INSERT INTO service_mechanic (ticket_id, mechanic_id) VALUES (1, 1)")
+            self._execute("INSERT INTO service_part (service_ticket_id, inventory_id) VALUES (1, 1)")
+            db.session.commit()
+
+            upgrade()
+            self.assertEqual(self._execute("SELECT version_num FROM alembic_version").scalar(), '0005')
+            for table in ('customer', 'service_ticket', 'mechanic', 'service_mechanic', 'service_part', 'inventory'):
+                stamps = self._execute(f"SELECT updated_at FROM {table}").scalars().all()
+                self.assertEqual(len(stamps), 1, table)
+                self.assertIsNotNone(stamps[0], table)
+            # The backfill is in UTC, like updated_at_column()
+            stamp = self._execute("SELECT updated_at FROM customer").scalar()
+            self.assertLess(abs(utcnow() - datetime.fromisoformat(stamp)), timedelta(minutes=1))
+            # Existing rows are searchable and the connections enforce foreign keys again
+            self.assertEqual(self._execute("SELECT rowid FROM customer_fts WHERE customer_fts MATCH 'brake*'")
+                             .scalars().all(), [1])
+            self.assertEqual(self._execute("PRAGMA foreign_keys").scalar(), 1)
+            db.session.commit()
+
+            downgrade(revision='0003')
+            self.assertEqual(self._execute("SELECT count(*) FROM service_part").scalar(), 1)
+            self.assertEqual(self._execute("SELECT version_num FROM alembic_version").scalar(), '0003')
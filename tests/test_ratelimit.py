@@ -0,0 +1,95 @@
+from app import create_app
+from app.models import db
+from app.utils.ratelimit import MmapStorage
+from app.utils.util import encode_token, rate_limit_key
+from limits.storage import storage_from_string
+import os
+import tempfile
+import time
+import unittest
+
+
+class TestMmapStorage(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.storage = storage_from_string(f"mmap://{self.path}")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_scheme_registered(self):
+        """Test that mmap:// URIs resolve to the shared storage"""
+        self.assertIsInstance(self.storage, MmapStorage)
+        self.assertTrue(self.storage.check())
+
+    def test_incr_and_get(self):
+        """Test counting hits per key"""
+        self.assertEqual(self.storage.incr("a", 60), 1)
+        self.assertEqual(self.storage.incr("a", 60), 2)
+        self.assertEqual(self.storage.incr("b", 60), 1)
+        self.assertEqual(self.storage.get("a"), 2)
+        self.assertEqual(self.storage.get("missing"), 0)
+
+    def test_counters_shared_between_instances(self):
+        """Test that two workers mapping the same file see one counter"""
+        other = MmapStorage(f"mmap://{self.path}")
+        self.storage.incr("shared", 60)
+        other.incr("shared", 60)
+        self.assertEqual(self.storage.get("shared"), 2)
+
+    def test_window_expiry(self):
+        """Test that a counter restarts once its window has passed"""
+        self.storage.incr("short", 0.05)
+        time.sleep(0.1)
+        self.assertEqual(self.storage.get("short"), 0)
+        self.assertEqual(self.storage.incr("short", 60), 1)
+
+    def test_clear(self):
+        """Test clearing one key and resetting all of them"""
+        self.storage.incr("a", 60)
+        self.storage.incr("b", 60)
+        self.storage.clear("a")
+        self.assertEqual(self.storage.get("a"), 0)
+        self.storage.reset()
+        self.assertEqual(self.storage.get("b"), 0)
+
+
+class TestRateLimitKey(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+
+    def test_key_uses_token_subject(self):
+        """Test that authenticated requests are limited per customer"""
+        headers = {'Authorization': "Bearer " + encode_token(7)}
+        with self.app.test_request_context('/customers/my-tickets', headers=headers):
+            self.assertEqual(rate_limit_key(), "customer:7")
+
+    def test_anonymous_routes_keyed_on_address(self):
+        """Test that a token doesn't buy a fresh bucket on routes that don't need one"""
+        headers = {'Authorization': "Bearer " + encode_token(7)}
+        with self.app.test_request_context('/customers/', method='POST', headers=headers,
+                                           environ_base={'REMOTE_ADDR': '10.0.0.5'}):
+            self.assertEqual(rate_limit_key(), "ip:10.0.0.5")
+
+        # Logging in as each new account doesn't lift the creation limit
+        client = self.app.test_client()
+        statuses = []
+        for i in range(7):
+            body = {"name": f"C{i}", "email": f"c{i}@email.com", "phone": "555", "password": "pw"}
+            headers = {'Authorization': "Bearer " + encode_token(i + 1)}
+            statuses.append(client.post('/customers/', json=body, headers=headers).status_code)
+        self.assertEqual(statuses, [201] * 6 + [429])
+
+    def test_key_falls_back_to_address(self):
+        """Test that anonymous or invalid-token requests are limited per address"""
+        headers = {'Authorization': "Bearer not-a-token"}
+        with self.app.test_request_context('/', headers=headers, environ_base={'REMOTE_ADDR': '10.0.0.5'}):
+            self.assertEqual(rate_limit_key(), "ip:10.0.0.5")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+from app import create_app
+from app.models import db, Customer, Inventory, ServiceTicket
+from app.utils.util import encode_token
+from datetime import datetime
+from tests.query_budget import QueryBudgetMixin
+import unittest
+
+
+class TestSearch(QueryBudgetMixin, unittest.TestCase):
+    backend = 'fts5'
+
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        self.app.config['SEARCH_BACKEND'] = self.backend
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.add(Customer(name="Alex Brakeman", email="alex.smith@email.com",
+                                    phone="555-123-4567", password="testpassword"))
+            db.session.add(Customer(name="Sam Patel", email="sam@email.com",
+                                    phone="555-987-6543", password="testpassword"))
+            db.session.add_all([Inventory(name="Brake Pad", price=45.99), Inventory(name="Oil Filter", price=9.99)])
+            db.session.add_all([
+                ServiceTicket(VIN="1234567890ABCDEFG", service_date=datetime(2024, 1, 15),
+                              service_desc="Brake repair, brake fluid flush", customer_id=1),
+                ServiceTicket(VIN="1234567890ABCDEFG", service_date=datetime(2024, 2, 1),
+                              service_desc="Oil change and brake check", customer_id=2),
+            ])
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def _search(self, query):
+        response = self.client.get(f'/search?{query}')
+        self.assertEqual(response.status_code, 200, query)
+        return [(hit['type'], hit['id']) for hit in response.get_json()]
+
+    def test_ranked_prefix_search(self):
+        """Test that word prefixes match across types and better matches rank first"""
+        self.client.get('/search?q=warm')  # the Python fallback builds its index on first use
+        # Versions, the search and one query per type to load the matching rows
+        with self.assertMaxQueries(5):
+            response = self.client.get('/search?q=bra')
+        hits = response.get_json()
+        self.assertEqual({(hit['type'], hit['id']) for hit in hits},
+                         {('service_tickets', 1), ('service_tickets', 2), ('inventory', 1), ('customers', 1)})
+        # "brake" twice in a short description beats once in a longer one
+        tickets = [hit['id'] for hit in hits if hit['type'] == 'service_tickets']
+        self.assertEqual(tickets, [1, 2])
+        self.assertEqual(hits, sorted(hits, key=lambda hit: -hit['rank']))
+        self.assertEqual(hits[0]['record']['id'], hits[0]['id'])
+        customer = next(hit['record'] for hit in hits if hit['type'] == 'customers')
+        self.assertEqual(customer['email'], "alex.smith@email.com")
+        self.assertNotIn('password', customer)
+
+    def test_terms_and_filters(self):
+        """Test that every word must match, emails and phones match by part, and ?type= narrows"""
+        self.assertEqual(self._search('q=oil+fil'), [('inventory', 2)])
+        self.assertEqual(self._search('q=smith'), [('customers', 1)])
+        self.assertEqual(self._search('q=987'), [('customers', 2)])
+        self.assertEqual(self._search('q=BRAKE&type=service_tickets&limit=1'), [('service_tickets', 1)])
+        self.assertEqual(self._search('q=brake+zebra'), [])
+
+    def test_index_follows_writes(self):
+        """Test that inserts, updates, deletes and bulk imports through the routes are searchable at once"""
+        self.assertEqual(self._search('q=gasket'), [])
+        self.client.post('/inventory/', json={"name": "Head Gasket", "price": 120.0})
+        self.client.post('/inventory/bulk', json=[{"name": "Exhaust Gasket", "price": 20.0}])
+        self.client.post('/service_tickets/batch', json=[{"VIN": "1234567890ABCDEFG", "service_date": "2024-03-01T09:00:00",
+                                                          "service_desc": "Replace gasket", "customer_id": 1}])
+        self.assertEqual(sorted(self._search('q=gasket')), [('inventory', 3), ('inventory', 4), ('service_tickets', 3)])
+
+        self.client.put('/inventory/1', json={"name": "Ceramic Pad", "price": 45.99})
+        self.assertEqual(self._search('q=ceramic'), [('inventory', 1)])
+        self.assertNotIn(('inventory', 1), self._search('q=brake'))
+
+        self.client.post('/customers/', json={"name": "Jordan Okafor", "email": "jordan@email.com",
+                                              "phone": "555-000-0000", "password": "testpassword"})
+        self.assertEqual(self._search('q=okafor'), [('customers', 3)])
+        headers = {'Authorization': "Bearer " + encode_token(3)}
+        self.client.delete('/customers/3', headers=headers)
+        self.assertEqual(self._search('q=okafor'), [])
+
+    def test_invalid_search(self):
+        """Test that a query without words, an unknown type or a bad limit is rejected"""
+        for query in ('', 'q=', 'q=%20-%20', 'q=brake&type=mechanics', 'q=brake&limit=0'):
+            response = self.client.get(f'/search?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+
+
+class TestPythonSearch(TestSearch):
+    """The same behaviour from the in-process index used without FTS5 or tsvector."""
+    backend = 'python'
+
+
+if __name__ == '__main__':
+    unittest.main()
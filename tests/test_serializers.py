@@ -0,0 +1,97 @@
+from app import create_app
+from app.models import db, Customer, Mechanic, Inventory, ServiceTicket
+from app.blueprints.customers.schemas import customer_schema, customers_schema, customers_serializer
+from app.blueprints.mechanics.schemas import mechanics_schema, mechanics_serializer
+from app.blueprints.inventory.schemas import inventories_schema, inventories_serializer
+from app.blueprints.service_tickets.schemas import service_tickets_schema, service_tickets_serializer
+from app.utils.serializers import parse_fields, only_fields
+from datetime import datetime
+from tests.query_budget import count_queries
+import json
+import unittest
+
+
+class TestRowSerializers(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            customer = Customer(name="Zoë Ünicode", email="zoe@email.com", phone="555-123-4567", password="pw")
+            db.session.add(customer)
+            db.session.add(Mechanic(name="Test Mechanic", email="mechanic@email.com", phone="555-987-6543", salary=50000))
+            db.session.add(Inventory(name="Brake Pad", price=45.99))
+            db.session.add(Inventory(name="Bolt", price=1))
+            db.session.flush()
+            db.session.add(ServiceTicket(VIN="1234567890ABCDEFG", service_date=datetime(2024, 1, 15, 10, 30, 5, 120),
+                                         service_desc="Oil change", customer_id=customer.id))
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def test_parity_with_marshmallow(self):
+        """Test that the row serializers produce exactly what the schemas dump"""
+        pairs = [
+            (Customer, customers_schema, customers_serializer),
+            (Mechanic, mechanics_schema, mechanics_serializer),
+            (Inventory, inventories_schema, inventories_serializer),
+            (ServiceTicket, service_tickets_schema, service_tickets_serializer),
+        ]
+        with self.app.app_context():
+            for model, schema, serializer in pairs:
+                expected = schema.dump(db.session.execute(db.select(model).order_by(model.id)).scalars().all())
+                rows = db.session.execute(serializer.select().order_by(model.id)).all()
+                actual = serializer.dump_rows(rows)
+                self.assertEqual(actual, expected)
+                self.assertEqual(json.dumps(actual, sort_keys=True), json.dumps(expected, sort_keys=True))
+
+    def test_endpoint_parity(self):
+        """Test that list endpoints return the same JSON as the schemas"""
+        with self.app.app_context():
+            tickets = db.session.execute(db.select(ServiceTicket)).scalars().all()
+            expected = json.loads(service_tickets_schema.jsonify(tickets).get_data())
+        response = self.client.get('/service_tickets/')
+        self.assertEqual(response.get_json(), expected)
+        self.assertEqual(self.client.get('/customers/').get_json()[0]['name'], "Zoë Ünicode")
+
+    def test_sparse_fieldsets(self):
+        """Test that ?fields= narrows both the response and the SELECT"""
+        for path in ('/customers/?fields=name', '/customers/1?fields=name',
+                     '/mechanics/?fields=name', '/mechanics/most-active?fields=name', '/mechanics/1?fields=name',
+                     '/inventory/?fields=name', '/inventory/1?fields=name'):
+            with count_queries(self.app) as statements:
+                response = self.client.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            body = response.get_json()
+            for item in body if isinstance(body, list) else [body]:
+                self.assertEqual(set(item), {'id', 'name'}, path)
+            row_query = statements[-1]
+            for column in ('password', 'phone', 'salary', 'price'):
+                self.assertNotIn(column, row_query, path)
+
+        response = self.client.get('/service_tickets/?fields=VIN,service_date')
+        self.assertEqual(set(response.get_json()[0]), {'id', 'VIN', 'service_date'})
+        response = self.client.get('/service_tickets/1?fields=VIN&include=customer')
+        self.assertEqual(set(response.get_json()), {'id', 'VIN', 'customer'})
+
+    def test_sparse_fieldsets_validated(self):
+        """Test that unknown fields are rejected and relations are not fields"""
+        for path in ('/customers/?fields=name,nope', '/mechanics/1?fields=ticket_count',
+                     '/service_tickets/?fields=customer', '/inventory/?fields=,bogus'):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 400, path)
+            self.assertIn('Unknown field', response.get_json()['error'])
+        # Empty means every field, like no parameter at all
+        self.assertEqual(self.client.get('/customers/1?fields=').get_json()['name'], "Zoë Ünicode")
+
+    def test_field_set_schemas_cached(self):
+        """Test that each field set builds its schema and serializer once"""
+        fields = parse_fields(customer_schema, 'email,name')
+        self.assertEqual(fields, {'id', 'name', 'email'})
+        self.assertIs(only_fields(customers_schema, fields), only_fields(customers_schema, frozenset(fields)))
+        self.assertIs(customers_serializer.only(fields), customers_serializer.only(fields))
+        self.assertIs(customers_serializer.only(None), customers_serializer)
+        self.assertIsNone(parse_fields(customer_schema, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,15 @@
 from app import create_app
-from app.models import db, ServiceTicket, Customer, Mechanic
+from app.models import db, ServiceTicket, Customer, Mechanic, Inventory, ServiceMechanic, ServicePart
 from datetime import datetime
+import csv
+import io
+import json
+from app.utils.util import encode_token
+from tests.query_budget import QueryBudgetMixin
 import unittest
 
 
-class TestServiceTickets(unittest.TestCase):
+class TestServiceTickets(QueryBudgetMixin, unittest.TestCase):
     def setUp(self):
         self.app = create_app("TestingConfig")
         
@@ -41,7 +46,8 @@ class TestServiceTickets(unittest.TestCase):
             "customer_id": 1
         }
 
-        response = self.client.post('/service_tickets/', json=ticket_payload)
+        with self.assertMaxQueries(3):
+            response = self.client.post('/service_tickets/', json=ticket_payload)
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.get_json()['VIN'], "1234567890ABCDEFG")
 
@@ -53,12 +59,14 @@ class TestServiceTickets(unittest.TestCase):
             # Missing service_date and customer_id
         }
 
-        response = self.client.post('/service_tickets/', json=ticket_payload)
+        with self.assertMaxQueries(0):
+            response = self.client.post('/service_tickets/', json=ticket_payload)
         self.assertEqual(response.status_code, 400)
 
     def test_get_service_tickets(self):
         """Test retrieving all service tickets"""
-        response = self.client.get('/service_tickets/')
+        with self.assertMaxQueries(2):
+            response = self.client.get('/service_tickets/')
         self.assertEqual(response.status_code, 200)
         self.assertTrue(isinstance(response.get_json(), list))
 
@@ -75,7 +83,8 @@ class TestServiceTickets(unittest.TestCase):
         ticket_id = ticket_response.get_json()['id']
 
         # Then assign mechanic
-        response = self.client.put(f'/service_tickets/{ticket_id}/assign-mechanic/1')
+        with self.assertMaxQueries(4):
+            response = self.client.put(f'/service_tickets/{ticket_id}/assign-mechanic/1')
         self.assertEqual(response.status_code, 200)
 
     def test_assign_nonexistent_mechanic(self):
@@ -91,7 +100,8 @@ class TestServiceTickets(unittest.TestCase):
         ticket_id = ticket_response.get_json()['id']
 
         # Try to assign non-existent mechanic
-        response = self.client.put(f'/service_tickets/{ticket_id}/assign-mechanic/999')
+        with self.assertMaxQueries(1):
+            response = self.client.put(f'/service_tickets/{ticket_id}/assign-mechanic/999')
         self.assertEqual(response.status_code, 404)
 
     def test_remove_mechanic_from_ticket(self):
@@ -109,7 +119,8 @@ class TestServiceTickets(unittest.TestCase):
         self.client.put(f'/service_tickets/{ticket_id}/assign-mechanic/1')
 
         # Then remove mechanic
-        response = self.client.put(f'/service_tickets/{ticket_id}/remove-mechanic/1')
+        with self.assertMaxQueries(4):
+            response = self.client.put(f'/service_tickets/{ticket_id}/remove-mechanic/1')
         self.assertEqual(response.status_code, 200)
 
     def test_edit_ticket_mechanics(self):
@@ -130,9 +141,36 @@ class TestServiceTickets(unittest.TestCase):
             "remove_ids": []
         }
 
-        response = self.client.put(f'/service_tickets/{ticket_id}/edit', json=edit_payload)
+        with self.assertMaxQueries(5):
+            response = self.client.put(f'/service_tickets/{ticket_id}/edit', json=edit_payload)
         self.assertEqual(response.status_code, 200)
 
+    def test_edit_ticket_mechanics_report(self):
+        """Test that the edit response reports added, skipped, removed and unknown ids"""
+        ticket_payload = {
+            "VIN": "1234567890ABCDEFG",
+            "service_date": "2024-01-15T10:00:00",
+            "service_desc": "Major repair",
+            "customer_id": 1
+        }
+        ticket_id = self.client.post('/service_tickets/', json=ticket_payload).get_json()['id']
+
+        with self.assertMaxQueries(5):
+            response = self.client.put(f'/service_tickets/{ticket_id}/edit', json={"add_ids": [1, 999, 1]})
+        self.assertEqual(response.get_json()['added'], [1])
+        self.assertEqual(response.get_json()['unknown'], [999])
+
+        response = self.client.put(f'/service_tickets/{ticket_id}/edit', json={"add_ids": [1]})
+        self.assertEqual(response.get_json()['added'], [])
+        self.assertEqual(response.get_json()['skipped'], [1])
+
+        with self.assertMaxQueries(5):
+            response = self.client.put(f'/service_tickets/{ticket_id}/edit', json={"remove_ids": [1, 999]})
+        self.assertEqual(response.get_json()['removed'], [1])
+
+        response = self.client.put(f'/service_tickets/{ticket_id}/edit', json={"add_ids": ["1"]})
+        self.assertEqual(response.status_code, 400)
+
     def test_add_part_to_ticket(self):
         """Test adding a part to a service ticket"""
         # Create ticket first
@@ -146,10 +184,296 @@ class TestServiceTickets(unittest.TestCase):
         ticket_id = ticket_response.get_json()['id']
 
         # Add part (assuming part ID 1 exists)
-        response = self.client.put(f'/service_tickets/{ticket_id}/add-part/1')
+        with self.assertMaxQueries(1):
+            response = self.client.put(f'/service_tickets/{ticket_id}/add-part/1')
         # This might return 404 if no inventory exists, which is expected
         self.assertIn(response.status_code, [200, 404])
 
+    def test_junction_endpoints_idempotent(self):
+        """Test that repeating assign/add-part succeeds and missing parents return 404"""
+        with self.app.app_context():
+            db.session.add(Inventory(name="Brake Pad", price=45.99))
+            db.session.commit()
+        ticket_payload = {
+            "VIN": "1234567890ABCDEFG",
+            "service_date": "2024-01-15T10:00:00",
+            "service_desc": "Brake repair",
+            "customer_id": 1
+        }
+        ticket_id = self.client.post('/service_tickets/', json=ticket_payload).get_json()['id']
+
+        for _ in range(2):
+            with self.assertMaxQueries(4):
+                response = self.client.put(f'/service_tickets/{ticket_id}/assign-mechanic/1')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['id'], ticket_id)
+            self.assertEqual(self.client.put(f'/service_tickets/{ticket_id}/add-part/1').status_code, 200)
+        with self.app.app_context():
+            self.assertEqual(db.session.query(ServiceMechanic).count(), 1)
+            self.assertEqual(db.session.query(ServicePart).count(), 1)
+
+        self.assertEqual(self.client.put('/service_tickets/999/assign-mechanic/1').status_code, 404)
+        self.assertEqual(self.client.put(f'/service_tickets/{ticket_id}/add-part/999').status_code, 404)
+
+        self.assertEqual(self.client.put(f'/service_tickets/{ticket_id}/remove-mechanic/1').status_code, 200)
+        with self.assertMaxQueries(3):
+            response = self.client.put(f'/service_tickets/{ticket_id}/remove-mechanic/1')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json()['error'], "Mechanic not assigned to this ticket")
+        response = self.client.put('/service_tickets/999/remove-mechanic/1')
+        self.assertEqual(response.get_json()['error'], "Ticket not found")
+
+    def _seed_tickets_with_relations(self, count):
+        with self.app.app_context():
+            db.session.add(Mechanic(name="Second Mechanic", email="second@email.com",
+                                    phone="555-000-0000", salary=40000.0))
+            db.session.add_all([Inventory(name="Oil Filter", price=9.99), Inventory(name="Brake Pad", price=45.99)])
+            db.session.flush()
+            for i in range(count):
+                ticket = ServiceTicket(VIN=f"VIN{i:014d}", service_date=datetime(2024, 1, 15),
+                                       service_desc="Service", customer_id=1)
+                db.session.add(ticket)
+                db.session.flush()
+                db.session.add_all([ServiceMechanic(ticket_id=ticket.id, mechanic_id=1),
+                                    ServiceMechanic(ticket_id=ticket.id, mechanic_id=2),
+                                    ServicePart(service_ticket_id=ticket.id, inventory_id=1),
+                                    ServicePart(service_ticket_id=ticket.id, inventory_id=2)])
+            db.session.commit()
+
+    def test_get_service_ticket_detail(self):
+        """Test retrieving one ticket with its customer, mechanics and parts"""
+        self._seed_tickets_with_relations(1)
+        with self.assertMaxQueries(4):
+            response = self.client.get('/service_tickets/1')
+        self.assertEqual(response.status_code, 200)
+        ticket = response.get_json()
+        self.assertEqual(ticket['customer']['name'], "Test Customer")
+        self.assertNotIn('password', ticket['customer'])
+        self.assertEqual(sorted(m['id'] for m in ticket['mechanics']), [1, 2])
+        self.assertEqual(sorted(p['name'] for p in ticket['parts']), ["Brake Pad", "Oil Filter"])
+
+        self.assertEqual(self.client.get('/service_tickets/999').status_code, 404)
+        self.assertEqual(self.client.get('/service_tickets/1?include=owner').status_code, 400)
+
+    def test_get_service_tickets_include_query_count(self):
+        """Test that including relations on 100 tickets costs a fixed number of queries"""
+        self._seed_tickets_with_relations(100)
+        # tickets + customer (joined), assignments + mechanics (joined), parts
+        with self.assertMaxQueries(4):
+            response = self.client.get('/service_tickets/?include=customer,mechanics,parts&per_page=100')
+        self.assertEqual(response.status_code, 200)
+        tickets = response.get_json()
+        self.assertEqual(len(tickets), 100)
+        self.assertEqual(len(tickets[-1]['mechanics']), 2)
+        self.assertEqual(len(tickets[-1]['parts']), 2)
+
+        response = self.client.get('/service_tickets/?include=parts')
+        self.assertNotIn('customer', response.get_json()[0])
+
+    def test_included_relations_invalidate_cached_list(self):
+        """Test that writes to an included customer, mechanic or part reach the cached ticket list"""
+        self._seed_tickets_with_relations(1)
+        url = '/service_tickets/?include=customer,mechanics,parts'
+        self.client.get(url)
+        self.assertEqual(self._ids('/service_tickets/?part_id=2'), [1])
+
+        headers = {'Authorization': "Bearer " + encode_token(1)}
+        self.client.put('/customers/1', json={"name": "Renamed"}, headers=headers)
+        self.client.put('/mechanics/1', json={"name": "Renamed Mechanic"})
+        self.client.put('/inventory/1', json={"price": 99.0})
+        ticket = self.client.get(url).get_json()[0]
+        self.assertEqual(ticket['customer']['name'], "Renamed")
+        self.assertIn("Renamed Mechanic", [m['name'] for m in ticket['mechanics']])
+        self.assertIn(99.0, [p['price'] for p in ticket['parts']])
+
+        # Deleting a part removes its service_part rows, so ?part_id= stops matching
+        self.client.delete('/inventory/2')
+        self.assertEqual(self._ids('/service_tickets/?part_id=2'), [])
+
+    def _seed_filter_tickets(self):
+        with self.app.app_context():
+            db.session.add(Customer(name="Second Customer", email="second@email.com",
+                                    phone="555-000-0000", password="testpassword"))
+            db.session.add(Inventory(name="Oil Filter", price=9.99))
+            db.session.flush()
+            for i, (vin, day, customer_id) in enumerate([("AAA", 3, 1), ("BBB", 1, 2), ("AAA", 2, 1),
+                                                         ("CCC", 2, 2), ("DDD", 5, 1)]):
+                db.session.add(ServiceTicket(VIN=vin, service_date=datetime(2024, 1, day),
+                                             service_desc="Service", customer_id=customer_id))
+            db.session.flush()
+            db.session.add_all([ServiceMechanic(ticket_id=2, mechanic_id=1), ServiceMechanic(ticket_id=4, mechanic_id=1),
+                                ServicePart(service_ticket_id=4, inventory_id=1)])
+            db.session.commit()
+
+    def _ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return [ticket['id'] for ticket in response.get_json()]
+
+    def test_filter_service_tickets(self):
+        """Test each filter on its own and combined, in a fixed number of queries"""
+        self._seed_filter_tickets()
+        with self.assertMaxQueries(2):
+            self.assertEqual(self._ids('/service_tickets/?customer_id=1'), [1, 3, 5])
+        self.assertEqual(self._ids('/service_tickets/?vin=AAA'), [1, 3])
+        self.assertEqual(self._ids('/service_tickets/?from=2024-01-02&to=2024-01-03'), [1, 3, 4])
+        self.assertEqual(self._ids('/service_tickets/?from=2024-01-02T12:00:00'), [1, 5])
+        self.assertEqual(self._ids('/service_tickets/?mechanic_id=1'), [2, 4])
+        self.assertEqual(self._ids('/service_tickets/?part_id=1&include=parts'), [4])
+        self.assertEqual(self._ids('/service_tickets/?customer_id=2&mechanic_id=1&to=2024-01-01'), [2])
+
+        # Assigning a mechanic changes what ?mechanic_id= matches, and its ETag
+        etag = self.client.get('/service_tickets/?mechanic_id=1').headers['ETag']
+        self.client.put('/service_tickets/5/assign-mechanic/1')
+        response = self.client.get('/service_tickets/?mechanic_id=1', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([ticket['id'] for ticket in response.get_json()], [2, 4, 5])
+
+    def test_sort_and_paginate_service_tickets(self):
+        """Test walking tickets by date with keyset cursors, ties broken by id"""
+        self._seed_filter_tickets()
+        self.assertEqual(self._ids('/service_tickets/?sort=service_date&fields=VIN'), [2, 3, 4, 1, 5])
+        self.assertEqual(self._ids('/service_tickets/?sort=-id'), [5, 4, 3, 2, 1])
+
+        seen, cursors, url = [], [], '/service_tickets/?sort=-service_date&per_page=2&include=customer'
+        while True:
+            with self.assertMaxQueries(2):
+                response = self.client.get(url)
+            seen.extend(ticket['id'] for ticket in response.get_json())
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+            cursors.append(cursor)
+            url = f'/service_tickets/?sort=-service_date&per_page=2&include=customer&after={cursor}'
+        self.assertEqual(seen, [5, 1, 4, 3, 2])
+
+        # A cursor only continues the ordering it came from
+        response = self.client.get(f'/service_tickets/?sort=service_date&after={cursors[0]}')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._ids('/service_tickets/?page=2&per_page=2&sort=service_date'), [4, 1])
+
+    def test_filter_service_tickets_invalid(self):
+        """Test that malformed filters and sorts without an index are rejected"""
+        for query in ('sort=service_desc', 'sort=-VIN', 'customer_id=abc', 'mechanic_id=1.5',
+                      'from=yesterday', 'to=2024-13-01', 'per_page=0'):
+            response = self.client.get(f'/service_tickets/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+
+    def test_export_service_tickets(self):
+        """Test streaming tickets as NDJSON and CSV within a date range"""
+        for date in ("2024-01-15T10:00:00", "2024-01-31T16:30:00", "2024-02-01T09:00:00"):
+            self.client.post('/service_tickets/', json={
+                "VIN": "1234567890ABCDEFG",
+                "service_date": date,
+                "service_desc": "Oil change, filter",
+                "customer_id": 1
+            })
+
+        with self.assertMaxQueries(1):
+            response = self.client.get('/service_tickets/export?format=ndjson&from=2024-01-01&to=2024-01-31')
+            response.get_data()  # the body streams, so its queries run as it is read
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [1, 2])
+        self.assertEqual(rows[1]['service_date'], "2024-01-31T16:30:00")
+
+        response = self.client.get('/service_tickets/export?format=csv')
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(rows[0], ['id', 'VIN', 'service_date', 'service_desc', 'customer_id'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][3], "Oil change, filter")
+
+    def test_export_invalid_parameters(self):
+        """Test exporting with an unknown format or malformed date"""
+        with self.assertMaxQueries(0):
+            self.assertEqual(self.client.get('/service_tickets/export?format=xml').status_code, 400)
+            self.assertEqual(self.client.get('/service_tickets/export?from=yesterday').status_code, 400)
+
+    def test_list_query_counts_constant(self):
+        """Test that ticket lists, detail and export cost the same number of queries at any size"""
+        self._seed_tickets_with_relations(1)
+        for url in ('/service_tickets/', '/service_tickets/?include=customer,mechanics,parts',
+                    '/service_tickets/1', '/service_tickets/export?format=csv'):
+            self.assertConstantQueries(lambda: self.client.get(url).get_data(),
+                                       lambda: self._add_tickets_with_relations(20))
+
+    def _add_tickets_with_relations(self, count):
+        with self.app.app_context():
+            start = db.session.query(Mechanic).count()
+            mechanics = [Mechanic(name=f"Mechanic {i}", email=f"mechanic{i}@email.com",
+                                  phone="555-000-0000", salary=40000.0) for i in range(start, start + 3)]
+            db.session.add_all(mechanics)
+            db.session.flush()
+            for i in range(count):
+                ticket = ServiceTicket(VIN=f"VIN{i:014d}", service_date=datetime(2024, 1, 15),
+                                       service_desc="Service", customer_id=1)
+                db.session.add(ticket)
+                db.session.flush()
+                db.session.add_all([ServiceMechanic(ticket_id=ticket.id, mechanic_id=m.id) for m in mechanics]
+                                   + [ServicePart(service_ticket_id=ticket.id, inventory_id=2)])
+            # Ticket 1 gains assignments too, so the detail route has more to load
+            db.session.add_all(ServiceMechanic(ticket_id=1, mechanic_id=m.id) for m in mechanics)
+            db.session.commit()
+
+    def _batch_entry(self, vin, **links):
+        return dict({"VIN": vin, "service_date": "2024-01-15T10:00:00",
+                     "service_desc": "Intake", "customer_id": 1}, **links)
+
+    def test_create_service_tickets_batch(self):
+        """Test that a batch creates tickets and their links in a fixed number of statements"""
+        with self.app.app_context():
+            db.session.add(Inventory(name="Oil Filter", price=9.99))
+            db.session.commit()
+        entries = [self._batch_entry(f"VIN{i:014d}", mechanic_ids=[1, 1], part_ids=[1]) for i in range(20)]
+        entries.append(self._batch_entry("NOLINKS0000000000"))
+
+        with self.assertMaxQueries(8):
+            response = self.client.post('/service_tickets/batch', json=entries)
+        self.assertEqual(response.status_code, 201)
+        ids = response.get_json()['ids']
+        self.assertEqual(len(ids), 21)
+
+        first = self.client.get(f'/service_tickets/{ids[0]}').get_json()
+        self.assertEqual(first['VIN'], "VIN00000000000000")
+        self.assertEqual([m['id'] for m in first['mechanics']], [1])
+        self.assertEqual([p['id'] for p in first['parts']], [1])
+        last = self.client.get(f'/service_tickets/{ids[-1]}').get_json()
+        self.assertEqual((last['VIN'], last['mechanics'], last['parts']), ("NOLINKS0000000000", [], []))
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Mechanic, 1).ticket_count, 20)
+
+    def test_create_service_tickets_batch_all_or_nothing(self):
+        """Test that one bad ticket rejects the whole batch with per-ticket errors"""
+        entries = [
+            self._batch_entry("GOOD0000000000000", mechanic_ids=[1]),
+            self._batch_entry("BADMECHANIC000000", mechanic_ids=[1, 99]),
+            self._batch_entry("BADCUSTOMER000000", customer_id=42),
+            self._batch_entry("BADPARTS000000000", part_ids="1"),
+            {"VIN": "MISSINGFIELDS0000"},
+        ]
+        with self.assertMaxQueries(2):
+            response = self.client.post('/service_tickets/batch', json=entries)
+        self.assertEqual(response.status_code, 400)
+        errors = {error['index']: error['errors'] for error in response.get_json()['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertEqual(errors[1], {"mechanic_ids": ["Not found: 99"]})
+        self.assertEqual(errors[2], {"customer_id": ["Customer not found"]})
+        self.assertIn('part_ids', errors[3])
+        self.assertIn('service_date', errors[4])
+        self.assertEqual(self.client.get('/service_tickets/').get_json(), [])
+
+    def test_create_service_tickets_batch_limits(self):
+        """Test the body shape and size checks"""
+        self.assertEqual(self.client.post('/service_tickets/batch', json={"VIN": "x"}).status_code, 400)
+        response = self.client.post('/service_tickets/batch', json=[])
+        self.assertEqual((response.status_code, response.get_json()), (201, {"ids": []}))
+        self.app.config['BATCH_MAX_TICKETS'] = 2
+        entries = [self._batch_entry(f"VIN{i:014d}") for i in range(3)]
+        self.assertEqual(self.client.post('/service_tickets/batch', json=entries).status_code, 413)
+
 
 if __name__ == '__main__':
     unittest.main()
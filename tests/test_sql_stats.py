@@ -0,0 +1,65 @@
+from app import create_app
+from app.models import db, Mechanic
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+import unittest
+
+
+class TestSQLStats(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.add(Mechanic(name="Mechanic", email="mechanic@email.com",
+                                    phone="555-000-0000", salary=50000.0))
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def test_query_count_headers(self):
+        """Test that each response reports its statement count and DB time"""
+        response = self.client.get('/mechanics/1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-Query-Count'], '1')
+        self.assertRegex(response.headers['Server-Timing'], r'^db;dur=\d+\.\d{2};desc="1 queries"$')
+
+        response = self.client.get('/')
+        self.assertEqual(response.headers['X-Query-Count'], '0')
+
+    def test_streamed_responses_omit_headers(self):
+        """Test that a streamed export doesn't report the queries it hasn't run yet"""
+        response = self.client.get('/service_tickets/export?format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertNotIn('X-Query-Count', response.headers)
+        self.assertNotIn('Server-Timing', response.headers)
+        response.close()
+
+    def test_slow_query_log(self):
+        """Test that statements over the threshold are logged with their plan"""
+        stats = self.app.extensions['sql_stats']
+        stats.slow_ms = 0
+        stats.explain = True
+
+        with self.assertLogs(stats.logger, level='WARNING') as logs:
+            self.client.get('/mechanics/1')
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('endpoint=mechanics.get_mechanic', logs.output[0])
+        self.assertIn('FROM mechanic WHERE mechanic.id = ?', logs.output[0])
+        self.assertIn('parameters: (1,)', logs.output[0])
+        self.assertIn('plan: SEARCH mechanic USING INTEGER PRIMARY KEY', logs.output[0])
+
+    def test_failed_statement(self):
+        """Test that a statement that raises leaves no timing state on its pooled connection"""
+        with self.app.app_context(), db.engine.connect() as connection:
+            with self.assertRaises(IntegrityError):
+                connection.execute(insert(Mechanic).values(id=1, name="Duplicate", email="d@email.com",
+                                                           phone="555", salary=1.0))
+            connection.rollback()
+            self.assertNotIn('query_start', connection.info)
+            self.assertEqual(connection.execute(select(Mechanic.name)).scalar(), "Mechanic")
+
+    def test_disabled(self):
+        """Test that nothing is attached to the engine when instrumentation is off"""
+        app = create_app("BenchmarkConfig")
+        self.assertNotIn('sql_stats', app.extensions)